@@ -0,0 +1,3 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
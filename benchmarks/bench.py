@@ -0,0 +1,268 @@
+# coding: utf-8
+
+"""
+Formatting time of each engine, value by value and by column, and time and memory of the compile
+stages.
+
+Run with ``python -m benchmarks.bench`` for everything, or with the names of some engines and
+stages, as ``python -m benchmarks.bench dates lexer``. The formats and value columns of the engines
+are in ``benchmarks.corpus``.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+import random
+import sys
+import tracemalloc
+from threading import Barrier, Thread
+from timeit import Timer, default_timer
+
+from benchmarks.corpus import COLUMNS, ENGINES, FORMATS, custom_formats
+from formatcode.convert.cache import CompileCache
+from formatcode.convert.canonical import collapse_stats
+from formatcode.convert.fc import FormatCode
+from formatcode.lexer.errors import LexerError
+from formatcode.lexer.lexer import to_tokens_line
+from formatcode.lexer.tokens import ColorToken, LocaleCurrencyToken, SingleSymbolToken, StringSymbol
+
+VALUES = [0, 1, -1, 0.5, 1234.5678, -1234.5678, 99.995, 123456789, 0.004, -7]
+SECTION = r'[Red]\-"£"#,##0.00_);'
+LINE = (r'[$£-809]* #,##0.00" units in stock"_);[Red]\([$£-809]* #,##0.00" units short"\);'
+        r'" "[$£-809]"-"??" no units"_);"Stock note: "@" (checked)"')
+
+
+def timed(function, values):
+    """
+    Microseconds per value of a function formatting a column.
+    """
+    start = default_timer()
+    function(values)
+    return (default_timer() - start) * 1e6 / len(values)
+
+
+def bench_engine(name, formats, columns, count=100000):
+    rnd = random.Random(0)
+    for column in columns:
+        values = [COLUMNS[column](rnd) for _ in range(count)]
+        for line in formats:
+            fc = FormatCode(line)
+            one_by_one = timed(lambda values: [fc.format(value) for value in values], values)
+            print('%-10s %-12s %-52s %-10s %6.2f us/value, column %6.2f us/value'
+                  % (name, column, line, fc.pos_part.kernel, one_by_one, timed(fc.format_many, values)))
+
+
+def bench_lexer(repeat=5):
+    # Block delimiters reset the unique tokens, so the line stays valid at any length.
+    for n in (1, 10, 100, 1000):
+        line = SECTION * n
+        number = max(1, 2000 // n)
+        best = min(Timer(lambda: to_tokens_line(line)).repeat(repeat=repeat, number=number)) / number
+        print('lexer %6d chars: %10.1f us/line %8.3f us/char' % (len(line), best * 1e6, best * 1e6 / len(line)))
+
+
+def bench_tokens(count=20000):
+    corpus = custom_formats(count)
+
+    tracemalloc.start()
+    lines = [to_tokens_line(line) for line in corpus]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('tokens %d formats, %d tokens: %.1f MiB' % (count, sum(map(len, lines)), size / 2 ** 20))
+
+    tokens = [t for line in lines for t in line if not isinstance(t, (SingleSymbolToken, LocaleCurrencyToken))]
+    best = min(Timer(lambda: [t.value for t in tokens]).repeat(repeat=5, number=5)) / 5
+    print('tokens %d value reads: %.1f ns/read' % (len(tokens), best * 1e9 / len(tokens)))
+
+
+def respell(line, rnd):
+    """
+    An equivalent spelling of the line, the ways workbooks write it.
+
+    :rtype: str
+    """
+    try:
+        tokens = to_tokens_line(line)
+    except LexerError:
+        return line
+    if len(line) < 30 and ';' not in line and rnd.random() < 0.3:
+        return line + ';-' + line
+
+    out = []
+    for token in tokens:
+        spelled = token.render()
+        if isinstance(token, StringSymbol) and len(token.value) == 1 and token.value != '"':
+            spelled = rnd.choice((spelled,) * 4 + ('\\' + token.value, '"%s"' % token.value))
+        elif isinstance(token, ColorToken):
+            spelled = rnd.choice((spelled, spelled.upper(), spelled.lower()))
+        elif isinstance(token, LocaleCurrencyToken) and token.info is not None:
+            spelled = rnd.choice((spelled, spelled.lower(), '[$%s-%04X]' % (token.curr, token.info)))
+        out.append(spelled)
+    return ''.join(out)
+
+
+def bench_canonical(cells=50000):
+    rnd = random.Random(0)
+    formats = FORMATS + custom_formats(2000)
+    lines = [respell(rnd.choice(formats), rnd) for _ in range(cells)]
+
+    stats = collapse_stats(lines)
+    print('canonical %d cells, %d distinct spellings, %d canonical codes, largest group %d'
+          % (stats.lines, stats.distinct, stats.canonical, stats.largest))
+
+    cache = FormatCode.cache
+    for name, canonical in (('raw', False), ('canonical', True)):
+        FormatCode.cache = CompileCache(max_entries=4096, errors=cache.errors)
+        FormatCode.canonical_lines.clear()
+        for line in lines:
+            try:
+                if canonical:
+                    FormatCode.get(line)
+                else:
+                    FormatCode.cache.get(line, lambda: FormatCode(line))
+            except Exception:
+                pass
+        info = FormatCode.cache.info()
+        print('canonical %-9s compiles: %6d, hit rate: %5.1f%%'
+              % (name, info.misses, 100.0 - 100.0 * info.misses / len(lines)))
+    FormatCode.cache = cache
+
+
+def bench_incremental(repeat=20):
+    def type_full(pos, typed):
+        for i in range(1, len(typed) + 1):
+            FormatCode(LINE[:pos] + typed[:i] + LINE[pos:])
+
+    def type_edit(fc, pos, typed):
+        for i, char in enumerate(typed):
+            fc = fc.edit(pos + i, pos + i, char)
+
+    fc = FormatCode(LINE)
+    # The positive section is the most expensive one to configure.
+    for name, pos, typed in (('positive', LINE.index('.00') + 3, '0000 ()'), ('string', LINE.index('@'), ' ()- ()-')):
+        full = min(Timer(lambda: type_full(pos, typed)).repeat(repeat=repeat, number=1)) / len(typed)
+        edit = min(Timer(lambda: type_edit(fc, pos, typed)).repeat(repeat=repeat, number=1)) / len(typed)
+        print('incremental %-8s full: %6.1f us/keystroke, edit: %6.1f us/keystroke' % (name, full * 1e6, edit * 1e6))
+
+
+def compiled_size(corpus, **options):
+    """
+    Format codes of the corpus and the memory traced while compiling them.
+
+    :rtype: (list[FormatCode], int)
+    """
+    tracemalloc.start()
+    codes = [FormatCode(line, **options) for line in corpus]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return codes, size
+
+
+def bench_lazy(count=5000):
+    corpus = custom_formats(count)
+    # Lex once so both modes start from the same shared sections
+    [FormatCode.lex_sections(line) for line in corpus]
+
+    for lazy in (False, True):
+        FormatCode.shared_handlers.clear()
+        _, size = compiled_size(corpus, lazy=lazy)
+
+        FormatCode.shared_handlers.clear()
+        start = default_timer()
+        codes = [FormatCode(line, lazy=lazy) for line in corpus]
+        compiled = default_timer() - start
+
+        # Only positive numbers are formatted, the way most cells use a format code
+        start = default_timer()
+        for fc in codes:
+            fc.format(1234.5)
+        first_use = default_timer() - start
+
+        print('lazy %-5s compile: %6.1f us/format, first format: %6.1f us/format, traced %.1f MiB'
+              % ('lazy' if lazy else 'eager', compiled * 1e6 / count, first_use * 1e6 / count, size / 2 ** 20))
+
+
+def bench_sharing(count=50000):
+    corpus = custom_formats(count)
+    max_entries = FormatCode.shared_handlers.max_entries
+    # Lex once so both modes start from the same shared sections
+    [FormatCode.lex_sections(line) for line in corpus]
+
+    for shared in (False, True):
+        FormatCode.shared_handlers.clear()
+        FormatCode.shared_handlers.resize(max_entries=max_entries if shared else 0)
+        codes, size = compiled_size(corpus)
+        handlers = len(set(id(part.handler) for fc in codes for part in fc.parts))
+        print('sharing %-8s %d formats, %d handlers: traced %.1f MiB'
+              % ('shared' if shared else 'separate', len(codes), handlers, size / 2 ** 20))
+
+
+def bench_threads(count=500, rounds=5):
+    """
+    Every thread formats the same format codes, the outputs are checked against a single-threaded
+    run. Throughput only scales with the threads on a free-threaded interpreter.
+    """
+    def format_all(codes):
+        return [fc.format(value) for fc in codes for value in VALUES]
+
+    codes = []
+    for line in FORMATS + custom_formats(count):
+        try:
+            fc = FormatCode.get(line, lazy=True)
+            format_all([fc])
+        except Exception:
+            continue
+        codes.append(fc)
+    expected = format_all(codes)
+    calls = len(expected) * rounds
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    for threads in (1, 2, 4, 8):
+        barrier = Barrier(threads + 1)
+        results = [None] * threads
+
+        def worker(i):
+            barrier.wait()
+            for _ in range(rounds):
+                results[i] = format_all(codes)
+
+        workers = [Thread(target=worker, args=(i,)) for i in range(threads)]
+        for worker_thread in workers:
+            worker_thread.start()
+        barrier.wait()
+        start = default_timer()
+        for worker_thread in workers:
+            worker_thread.join()
+        elapsed = default_timer() - start
+
+        assert all(result == expected for result in results)
+        print('threads %d %s: %8.0f formats/s'
+              % (threads, 'with GIL' if gil else 'free-threaded', threads * calls / elapsed))
+
+
+# Compile stages and other benchmarks of the format codes themselves
+STAGES = {
+    'lexer': bench_lexer,
+    'tokens': bench_tokens,
+    'canonical': bench_canonical,
+    'incremental': bench_incremental,
+    'lazy': bench_lazy,
+    'sharing': bench_sharing,
+    'threads': bench_threads,
+}
+
+
+def bench(names=()):
+    """
+    :param names: Engines and stages to run, all of them if empty
+    :type names: list[str]
+    """
+    for name, formats, columns in ENGINES:
+        if not names or name in names:
+            bench_engine(name, formats, columns)
+    for name, stage in STAGES.items():
+        if not names or name in names:
+            stage()
+
+
+if __name__ == '__main__':
+    bench(sys.argv[1:])
@@ -0,0 +1,97 @@
+# coding: utf-8
+
+"""
+Format strings and value columns shared by the benchmarks.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from tests.examples import examples
+
+FORMATS = sorted(set(fc for _, _, fc in examples)) + [
+    'General',
+    '0',
+    '0.00',
+    '#,##0',
+    '#,##0.00',
+    '0%',
+    '0.00%',
+    '0.00E+00',
+    '# ?/?',
+    '# ??/??',
+    'm/d/yyyy',
+    'd-mmm-yy',
+    'h:mm AM/PM',
+    'h:mm:ss',
+    '[h]:mm:ss',
+    'mm:ss.0',
+    '@',
+    r'"£"#,##0.00',
+    r'"£"#,##0.00;[Red]\-"£"#,##0.00',
+    r'"$"#,##0.00_);[Red]\("$"#,##0.00\)',
+    r'" "[$£-809]* #,##0.00" ";"-"[$£-809]* #,##0.00" ";" "',
+    r'" "#,##0.00" "[$€-401]" ";"-"#,##0.00" "[$€-401]" ";" -"00" "[$€-401]" "',
+]
+
+CURRENCIES = ('"£"', '"$"', '[$€-401]', '[$£-809]', '[$$-409]')
+COLORS = ('', '[Red]', '[Blue]')
+
+
+def custom_formats(count, seed=0):
+    """
+    Distinct custom number formats, the way workbooks spell them.
+
+    :rtype: list[str]
+    """
+    rnd = random.Random(seed)
+    out = set()
+    while len(out) < count:
+        decimals = '.' + '0' * rnd.randint(1, 6) if rnd.random() < 0.8 else ''
+        curr = rnd.choice(CURRENCIES)
+        unit = '" %s%d"' % (rnd.choice('kmu'), rnd.randint(0, 99)) if rnd.random() < 0.5 else ''
+        pos = '%s#,##0%s%s_)' % (curr, decimals, unit)
+        neg = '%s\\(%s#,##0%s%s\\)' % (rnd.choice(COLORS), curr, decimals, unit)
+        zero = '"-"%s' % ('?' * rnd.randint(0, 3))
+        out.add(';'.join((pos, neg, zero, '@' * rnd.randint(1, 2))))
+    return sorted(out)
+
+
+# Value of each column, from a seeded random generator
+COLUMNS = {
+    'numbers': lambda rnd: rnd.uniform(-10 ** 7, 10 ** 7),
+    'prices': lambda rnd: rnd.randint(-1000, 1000) + rnd.randint(0, 99) / 100,
+    'integers': lambda rnd: rnd.randint(-10 ** 12, 10 ** 12),
+    'decimals': lambda rnd: Decimal(rnd.randint(-10 ** 9, 10 ** 9)).scaleb(-rnd.randint(0, 6)),
+    'text numbers': lambda rnd: '%d.%02d' % (rnd.randint(-10 ** 6, 10 ** 6), rnd.randint(0, 99)),
+    # Measurements over thirty orders of magnitude
+    'magnitudes': lambda rnd: rnd.choice((1, -1)) * rnd.random() * 10 ** rnd.randint(-15, 15),
+    # Serials of the 1900 date system from 1950 to 2050
+    'serials': lambda rnd: rnd.randint(18264, 54789) + rnd.randint(0, 86399) / 86400,
+    'datetimes': lambda rnd: datetime(1950, 1, 1) + timedelta(seconds=rnd.randint(0, 100 * 365 * 86400)),
+    'dates': lambda rnd: date(1950, 1, 1) + timedelta(days=rnd.randint(0, 36500)),
+    'times': lambda rnd: time(rnd.randint(0, 23), rnd.randint(0, 59), rnd.randint(0, 59)),
+    # Durations of up to a week, in days
+    'durations': lambda rnd: rnd.randint(0, 7 * 86400) / 86400,
+    'timedeltas': lambda rnd: timedelta(seconds=rnd.randint(0, 7 * 86400)),
+}
+
+# Formats of each engine and the columns they are timed on
+ENGINES = [
+    ('digits', ['0', '0.00', '#,##0', '#,##0.00', '0.0%', '#,##0.00_);(#,##0.00)', '$#,##0.00'],
+     ['numbers', 'integers', 'decimals', 'text numbers']),
+    # Paddings, zeros or literals between the digits, placed by the general formatter
+    ('placement', [r'_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)', r'"$"#,##0_);[Red]\("$"#,##0\)',
+                   r'$ ?,??0.00', r'$0,000.00', r'(000) 000-0000'],
+     ['prices']),
+    ('fractions', ['# ?/?', '# ??/??', '# ???/???', '# ?/8', '# ??/16', '?/?'], ['prices']),
+    ('scientific', ['0.00E+00', '0.0E+0', '##0.0E+0', '0.000E-00', '0.00E+00;[Red]-0.00E+00'], ['magnitudes']),
+    ('general', ['General'], ['numbers', 'magnitudes', 'integers', 'text numbers']),
+    ('locales', ['[$-407]#,##0.00', '[$-40C]#,##0', '[$-2010401]0.0%', '[$-4000439]#,##0.00'], ['numbers']),
+    ('dates', ['yyyy-mm-dd', 'dd/mm/yyyy hh:mm:ss', 'm/d/yyyy h:mm AM/PM', 'ddd d mmm yy', 'h:mm:ss.00'],
+     ['serials', 'datetimes', 'dates', 'times']),
+    ('elapsed', ['[h]:mm', '[h]:mm:ss', '[mm]:ss', '[ss].00', '[h]:mm:ss.000'], ['durations', 'timedeltas']),
+]
@@ -2,6 +2,7 @@
 
 from __future__ import division, print_function, unicode_literals
 
+import re
 from abc import ABCMeta
 
 
@@ -36,3 +37,18 @@ def is_digit(value):
         return True
     except (ValueError, TypeError):
         return False
+
+
+# Numbers as written by spreadsheet files and exports: "-2751.59", "1.5E-3"
+NUMBER_STRING = re.compile(r'-?[0-9]+(\.[0-9]+)?([Ee][-+]?[0-9]+)?\Z')
+
+
+def is_number_string(value):
+    """
+    Whether the string is a number in canonical notation, without thousands separators,
+    spaces or plus sign.
+
+    :type value: str
+    :rtype: bool
+    """
+    return NUMBER_STRING.match(value) is not None
@@ -0,0 +1,128 @@
+# coding: utf-8
+
+"""
+Built-in number formats, referred to by id only in workbooks (ECMA-376, 18.8.30).
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+from formatcode.convert.errors import BuiltinFormatError
+
+# Built-in formats as written by Excel in the en-US locale
+BUILTIN_FORMATS = {
+    0: 'General',
+    1: '0',
+    2: '0.00',
+    3: '#,##0',
+    4: '#,##0.00',
+    5: '"$"#,##0_);\\("$"#,##0\\)',
+    6: '"$"#,##0_);[Red]\\("$"#,##0\\)',
+    7: '"$"#,##0.00_);\\("$"#,##0.00\\)',
+    8: '"$"#,##0.00_);[Red]\\("$"#,##0.00\\)',
+    9: '0%',
+    10: '0.00%',
+    11: '0.00E+00',
+    12: '# ?/?',
+    13: '# ??/??',
+    14: 'm/d/yyyy',
+    15: 'd-mmm-yy',
+    16: 'd-mmm',
+    17: 'mmm-yy',
+    18: 'h:mm AM/PM',
+    19: 'h:mm:ss AM/PM',
+    20: 'h:mm',
+    21: 'h:mm:ss',
+    22: 'm/d/yyyy h:mm',
+    37: '#,##0_);\\(#,##0\\)',
+    38: '#,##0_);[Red]\\(#,##0\\)',
+    39: '#,##0.00_);\\(#,##0.00\\)',
+    40: '#,##0.00_);[Red]\\(#,##0.00\\)',
+    41: '_(* #,##0_);_(* \\(#,##0\\);_(* "-"_);_(@_)',
+    42: '_("$"* #,##0_);_("$"* \\(#,##0\\);_("$"* "-"_);_(@_)',
+    43: '_(* #,##0.00_);_(* \\(#,##0.00\\);_(* "-"??_);_(@_)',
+    44: '_("$"* #,##0.00_);_("$"* \\(#,##0.00\\);_("$"* "-"??_);_(@_)',
+    45: 'mm:ss',
+    46: '[h]:mm:ss',
+    47: 'mm:ss.0',
+    48: '##0.0E+0',
+    49: '@',
+}
+
+# Locale-dependent built-in formats by language id (LCID), other ids are the same as in en-US
+LOCALE_BUILTIN_FORMATS = {
+    # en-GB
+    0x809: {
+        5: '"£"#,##0;\\-"£"#,##0',
+        6: '"£"#,##0;[Red]\\-"£"#,##0',
+        7: '"£"#,##0.00;\\-"£"#,##0.00',
+        8: '"£"#,##0.00;[Red]\\-"£"#,##0.00',
+        14: 'dd/mm/yyyy',
+        22: 'dd/mm/yyyy hh:mm',
+    },
+    # de-DE
+    0x407: {
+        5: '#,##0 "€";\\-#,##0 "€"',
+        6: '#,##0 "€";[Red]\\-#,##0 "€"',
+        7: '#,##0.00 "€";\\-#,##0.00 "€"',
+        8: '#,##0.00 "€";[Red]\\-#,##0.00 "€"',
+        14: 'dd.mm.yyyy',
+        22: 'dd.mm.yyyy hh:mm',
+    },
+    # fr-FR
+    0x40C: {
+        5: '#,##0 "€";\\-#,##0 "€"',
+        6: '#,##0 "€";[Red]\\-#,##0 "€"',
+        7: '#,##0.00 "€";\\-#,##0.00 "€"',
+        8: '#,##0.00 "€";[Red]\\-#,##0.00 "€"',
+        14: 'dd/mm/yyyy',
+        22: 'dd/mm/yyyy hh:mm',
+    },
+    # ja-JP
+    0x411: {
+        5: '"¥"#,##0;\\-"¥"#,##0',
+        6: '"¥"#,##0;[Red]\\-"¥"#,##0',
+        7: '"¥"#,##0.00;\\-"¥"#,##0.00',
+        8: '"¥"#,##0.00;[Red]\\-"¥"#,##0.00',
+        14: 'yyyy/m/d',
+        22: 'yyyy/m/d h:mm',
+        30: 'm/d/yy',
+        31: 'yyyy"年"m"月"d"日"',
+        32: 'h"時"mm"分"',
+        33: 'h"時"mm"分"ss"秒"',
+        34: 'yyyy"年"m"月"',
+        35: 'm"月"d"日"',
+    },
+    # zh-CN
+    0x804: {
+        5: '"¥"#,##0;\\-"¥"#,##0',
+        6: '"¥"#,##0;[Red]\\-"¥"#,##0',
+        7: '"¥"#,##0.00;\\-"¥"#,##0.00',
+        8: '"¥"#,##0.00;[Red]\\-"¥"#,##0.00',
+        14: 'yyyy/m/d',
+        22: 'yyyy/m/d h:mm',
+        27: 'yyyy"年"m"月"',
+        28: 'm"月"d"日"',
+        29: 'm"月"d"日"',
+        30: 'm-d-yy',
+        31: 'yyyy"年"m"月"d"日"',
+        32: 'h"时"mm"分"',
+        33: 'h"时"mm"分"ss"秒"',
+        36: 'yyyy"年"m"月"',
+    },
+}
+
+
+def builtin_format(num_fmt_id, language_id=None):
+    """
+    Format code of a built-in format.
+
+    :param int num_fmt_id: Built-in format id
+    :param int language_id: Locale id (LCID), en-US if None or unknown
+    :rtype: str
+    """
+    line = LOCALE_BUILTIN_FORMATS.get(language_id, {}).get(num_fmt_id)
+    if line is None:
+        line = BUILTIN_FORMATS.get(num_fmt_id)
+    if line is None:
+        raise BuiltinFormatError(num_fmt_id, language_id)
+    return line
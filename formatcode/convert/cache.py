@@ -0,0 +1,148 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+from collections import namedtuple, OrderedDict
+from threading import Lock
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'entries', 'size', 'max_entries', 'max_size',
+                                     'failure_hits', 'failures'])
+FailureInfo = namedtuple('FailureInfo', ['key', 'error', 'message', 'hits'])
+
+# Bound left as it is by ``CompileCache.resize``
+UNCHANGED = object()
+
+
+class CompileCache(object):
+    """
+    Thread-safe LRU cache of compiled values, bounded by entry count and approximate size.
+
+    Values are compiled outside of the lock, so a slow compile never blocks lookups of other keys.
+
+    Keys failing to compile with one of ``errors`` are remembered in a separate bounded LRU, later
+    lookups fail again with the same error class and arguments without compiling.
+    """
+
+    def __init__(self, max_entries=1024, max_size=None, sizeof=None, errors=(), max_failures=1024):
+        """
+        :param int max_entries: Maximum number of entries, None for no limit
+        :param int max_size: Maximum sum of entry sizes, None for no limit
+        :param sizeof: Approximate size of a value, in bytes
+        :param tuple errors: Exception classes remembered for failing keys
+        :param int max_failures: Maximum number of failing keys remembered
+        """
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof or (lambda value: 0)
+        self.errors = errors
+        self.max_failures = max_failures
+
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        # Failing keys, each with [error class, error args, hits]
+        self._failures = OrderedDict()
+        self._size = 0
+        self.hits = self.misses = self.evictions = self.failure_hits = 0
+
+    def get(self, key, factory, fallback=None):
+        """
+        Cached value for the key, ``factory()`` is compiled and stored on a miss.
+
+        Exceptions from the factory are propagated and nothing is stored. If ``fallback`` is given,
+        its result is returned instead of raising a remembered error.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            failure = self._failures.get(key)
+            if failure is not None:
+                self._failures.move_to_end(key)
+                failure[2] += 1
+                self.failure_hits += 1
+            else:
+                self.misses += 1
+
+        if failure is not None:
+            if fallback is not None:
+                return fallback()
+            raise failure[0](*failure[1])
+
+        try:
+            value = factory()
+        except self.errors as e:
+            with self._lock:
+                self._failures[key] = [e.__class__, e.args, 0]
+                while len(self._failures) > self.max_failures:
+                    self._failures.popitem(last=False)
+            if fallback is not None:
+                return fallback()
+            raise
+        size = self.sizeof(value)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Compiled by another thread meanwhile, keep a single shared value.
+                self._entries.move_to_end(key)
+                return entry[0]
+            self._entries[key] = (value, size)
+            self._size += size
+            self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and ((self.max_entries is not None and len(self._entries) > self.max_entries)
+                                 or (self.max_size is not None and self._size > self.max_size)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+
+    def resize(self, max_entries=UNCHANGED, max_size=UNCHANGED):
+        """
+        New bounds, entries over them are evicted. Bounds not given keep their current value.
+
+        :param int max_entries: Maximum number of entries, None for no limit
+        :param int max_size: Maximum sum of entry sizes, None for no limit
+        """
+        with self._lock:
+            if max_entries is not UNCHANGED:
+                self.max_entries = max_entries
+            if max_size is not UNCHANGED:
+                self.max_size = max_size
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._failures.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = self.failure_hits = 0
+
+    def info(self):
+        """
+        :rtype: CacheInfo
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self._entries), self._size,
+                             self.max_entries, self.max_size, self.failure_hits, len(self._failures))
+
+    def failures(self):
+        """
+        Remembered failing keys, most recently used last.
+
+        :rtype: list[FailureInfo]
+        """
+        with self._lock:
+            failures = [(key, error, args, hits) for key, (error, args, hits) in self._failures.items()]
+        return [FailureInfo(key, error, str(error(*args)), hits) for key, error, args, hits in failures]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
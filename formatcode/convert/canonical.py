@@ -0,0 +1,63 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+from collections import Counter, namedtuple
+
+from formatcode.base.utils import is_general
+from formatcode.convert.utils import expand_sections
+from formatcode.lexer.errors import LexerError
+from formatcode.lexer.lexer import to_tokens_line
+
+CollapseStats = namedtuple('CollapseStats', ['lines', 'distinct', 'canonical', 'largest'])
+
+
+def canonical_line(line):
+    """
+    Canonical spelling of a format code, equivalent spellings give the same string.
+
+    Every token is written back in its canonical spelling: ``\\-`` and ``"-"`` become ``-``, ``[RED]``
+    becomes ``[Red]``, and a single section is expanded the way ``FormatCode`` compiles it. Lines
+    failing to lex are their own canonical spelling.
+
+    :rtype: str
+    """
+    line = expand_sections(line)
+    try:
+        tokens = to_tokens_line(line)
+    except LexerError:
+        return line
+
+    canonical = ''.join(token.render() for token in tokens)
+
+    if canonical != line and not is_equivalent(canonical, line, tokens):
+        return line
+    return canonical
+
+
+def is_equivalent(canonical, line, tokens):
+    """
+    Whether the canonical spelling compiles to the same format code as the line.
+
+    :param list tokens: Tokens of the line
+    :rtype: bool
+    """
+    if expand_sections(canonical) != canonical or is_general(canonical.lower()) != is_general(line.lower()):
+        return False
+    try:
+        canonical_tokens = to_tokens_line(canonical)
+    except LexerError:
+        return False
+    return [(type(t), t.cleaned_data) for t in canonical_tokens] == [(type(t), t.cleaned_data) for t in tokens]
+
+
+def collapse_stats(lines):
+    """
+    How many distinct format codes collapse into the same canonical spelling.
+
+    :rtype: CollapseStats
+    :return: Number of lines, distinct lines, distinct canonical spellings and the size of the largest group
+    """
+    distinct = set(lines)
+    groups = Counter(canonical_line(line) for line in distinct)
+    return CollapseStats(len(lines), len(distinct), len(groups), max(groups.values()) if groups else 0)
@@ -0,0 +1,337 @@
+# coding: utf-8
+
+"""
+Dates and times in date sections, as ``yyyy-mm-dd`` or ``h:mm AM/PM``.
+
+The tokens of a section are compiled once into a template and the emitters of its fields. A value
+is formatted from its components, ``(year, month, day, hour, minute, second, weekday, microsecond)``
+with Monday as weekday 0, by a single ``%`` operation.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+import re
+from datetime import date, datetime, time
+from operator import itemgetter
+
+from formatcode.convert.errors import IllegalPartToken
+from formatcode.convert.locales import get_date_names
+from formatcode.convert.serials import MICROSECONDS, civil_from_days, days_from_civil
+from formatcode.lexer.tokens import (AmPmToken, ColorToken, CommaDelimiter, ConditionToken, DateTimeToken, DigitToken,
+                                     DotDelimiter, LocaleCurrencyToken, SlashSymbol, StringSymbol, TimeDeltaToken,
+                                     ZeroToken)
+
+YEAR, MONTH, DAY, HOUR, MINUTE, SECOND, WEEKDAY, MICROSECOND = range(8)
+# Fraction digits of the seconds a microsecond has
+MAX_PRECISION = 6
+
+# Unit and multiple of the dtype name of a datetime64, as "datetime64[ns]" or "datetime64[15m]"
+DATETIME64_DTYPE = re.compile(r'^datetime64\[(?P<multiple>\d*)(?P<unit>[a-zA-Z]+)\]$')
+# Integer of a datetime64 NaT
+NAT = -2 ** 63
+# Days in a datetime64 unit of whole days
+CALENDAR_DAYS = {'W': 7, 'D': 1}
+# Microseconds in a datetime64 unit below a day, as a fraction
+DATETIME64_MICROSECONDS = {
+    'h': (3600 * MICROSECONDS, 1),
+    'm': (60 * MICROSECONDS, 1),
+    's': (MICROSECONDS, 1),
+    'ms': (1000, 1),
+    'us': (1, 1),
+    'ns': (1, 10 ** 3),
+    'ps': (1, 10 ** 6),
+    'fs': (1, 10 ** 9),
+    'as': (1, 10 ** 12),
+}
+
+# Conversion and emitter of the numbers of each lowercase symbol, date codes are case insensitive.
+# "m", "mm", "h" and "hh" are resolved with the other tokens of the section
+SYMBOLS = {
+    'yyyy': ('%d', itemgetter(YEAR)),
+    'yy': ('%02d', lambda fields: fields[YEAR] % 100),
+    'dd': ('%02d', itemgetter(DAY)),
+    'd': ('%d', itemgetter(DAY)),
+    'ss': ('%02d', itemgetter(SECOND)),
+    's': ('%d', itemgetter(SECOND)),
+}
+# Component and table of the date names of each lowercase symbol, see
+# ``formatcode.convert.locales.DateNames``
+NAME_SYMBOLS = {
+    'mmmmm': (MONTH, 'month_letters'),
+    'mmmm': (MONTH, 'months'),
+    'mmm': (MONTH, 'month_abbreviations'),
+    'dddd': (WEEKDAY, 'days'),
+    'ddd': (WEEKDAY, 'day_abbreviations'),
+}
+
+
+def datetime_fields(value):
+    """
+    Components of a datetime.
+
+    :type value: datetime.datetime
+    :rtype: (int, int, int, int, int, int, int, int)
+    """
+    return (value.year, value.month, value.day, value.hour, value.minute, value.second, value.weekday(),
+            value.microsecond)
+
+
+def date_fields(value):
+    """
+    Components of a date, at midnight.
+
+    :type value: datetime.date
+    :rtype: (int, int, int, int, int, int, int, int)
+    """
+    return value.year, value.month, value.day, 0, 0, 0, value.weekday(), 0
+
+
+def time_fields(value, date_system):
+    """
+    Components of a time of day, on the day of serial 0 as spreadsheets show times without dates.
+
+    :type value: datetime.time
+    :type date_system: formatcode.convert.serials.DateSystem
+    :rtype: (int, int, int, int, int, int, int, int)
+    """
+    year, month, day, weekday = date_system.date_fields(0)
+    return year, month, day, value.hour, value.minute, value.second, weekday, value.microsecond
+
+
+def is_datetime64(value):
+    """
+    Whether the value is a numpy datetime64 scalar, numpy is not imported for it.
+
+    :rtype: bool
+    """
+    value_type = type(value)
+    return value_type.__name__ == 'datetime64' and value_type.__module__ == 'numpy'
+
+
+def datetime64_fields(value):
+    """
+    Components of a numpy datetime64 scalar from its integer count of units since 1970-01-01,
+    truncated to microseconds as datetimes.
+
+    :type value: numpy.datetime64
+    :rtype: (int, int, int, int, int, int, int, int)
+    :raises ValueError: If the value is NaT or has no unit
+    """
+    match = DATETIME64_DTYPE.match(value.dtype.name)
+    count = int(value.astype('int64'))
+    if match is None or count == NAT:
+        raise ValueError('invalid datetime64 %r' % (value,))
+    count *= int(match.group('multiple') or 1)
+    unit = match.group('unit')
+
+    if unit == 'Y':
+        days = days_from_civil(1970 + count, 1, 1)
+    elif unit == 'M':
+        years, month = divmod(count, 12)
+        days = days_from_civil(1970 + years, month + 1, 1)
+    elif unit in CALENDAR_DAYS:
+        days = count * CALENDAR_DAYS[unit]
+    else:
+        multiplier, divisor = DATETIME64_MICROSECONDS[unit]
+        days, microseconds = divmod(count * multiplier // divisor, 86400 * MICROSECONDS)
+        seconds, microsecond = divmod(microseconds, MICROSECONDS)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        return civil_from_days(days) + (hour, minute, second, (days + 3) % 7, microsecond)
+    return civil_from_days(days) + (0, 0, 0, (days + 3) % 7, 0)
+
+
+def temporal_fields(value, date_system):
+    """
+    Components of a datetime, date, time or numpy datetime64, None for other values.
+
+    :type date_system: formatcode.convert.serials.DateSystem
+    :rtype: (int, int, int, int, int, int, int, int) | None
+    :raises ValueError: If the value is NaT or has no unit
+    """
+    if isinstance(value, datetime):
+        return datetime_fields(value)
+    if isinstance(value, date):
+        return date_fields(value)
+    if isinstance(value, time):
+        return time_fields(value, date_system)
+    if is_datetime64(value):
+        return datetime64_fields(value)
+    return None
+
+
+def hour_12(fields):
+    return fields[HOUR] % 12 or 12
+
+
+def fraction_emitter(precision, field=MICROSECOND):
+    """
+    Emitter of the first ``precision`` fraction digits of the seconds.
+
+    :type precision: int
+    :param int field: Component of the microseconds
+    """
+    unit = 10 ** (MAX_PRECISION - precision)
+
+    def emit(fields):
+        return fields[field] // unit
+
+    return emit
+
+
+def name_emitter(field, names):
+    """
+    Emitter of the name of a component.
+
+    :type field: int
+    :param names: Names by value of the component
+    :type names: tuple[str]
+    """
+    def emit(fields):
+        return names[fields[field]]
+
+    return emit
+
+
+def am_pm_emitter(am, pm):
+    def emit(fields):
+        return am if fields[HOUR] < 12 else pm
+
+    return emit
+
+
+def is_minute(tokens, index):
+    """
+    Whether the ``m`` or ``mm`` token at ``index`` stands for minutes: the closest date token on
+    either side is an hour or a second.
+
+    :type tokens: list[formatcode.lexer.tokens.Token]
+    :type index: int
+    :rtype: bool
+    """
+    symbols = ''
+    for step in (-1, 1):
+        position = index + step
+        while 0 <= position < len(tokens):
+            if isinstance(tokens[position], DateTimeToken):
+                symbols += tokens[position].value
+                break
+            position += step
+    symbols = symbols.upper()
+    return 'H' in symbols or 'S' in symbols
+
+
+def seconds_fraction_size(tokens, index):
+    """
+    Number of fraction digits of the seconds the digit token at ``index`` is part of, zeros after
+    ``s.``, ``ss.`` or ``[ss].``, 0 if it is not a fraction of the seconds.
+
+    :type tokens: list[formatcode.lexer.tokens.Token]
+    :type index: int
+    :rtype: int
+    """
+    start = end = index
+    while start > 0 and isinstance(tokens[start - 1], ZeroToken):
+        start -= 1
+    while end < len(tokens) and isinstance(tokens[end], ZeroToken):
+        end += 1
+    if end > index and start >= 2 and isinstance(tokens[start - 1], DotDelimiter) \
+            and isinstance(tokens[start - 2], (DateTimeToken, TimeDeltaToken)) and tokens[start - 2].value[0] in 'sS':
+        return end - start
+    return 0
+
+
+class DateTimeFormatter(object):
+    """
+    Formatter of a date section, compiled once per section.
+
+    Month and minute tokens, and 12 or 24 hour clocks, are told apart here, not on every value.
+    Names are taken from the tables of the language of the first locale token, English without one.
+    """
+
+    def __init__(self, tokens):
+        """
+        :param tokens: Tokens of the section
+        :type tokens: list[formatcode.lexer.tokens.Token]
+        :raises IllegalPartToken: If a token has no meaning in a date section
+        """
+        has_am_pm = any(isinstance(token, AmPmToken) for token in tokens)
+        language_ids = [token.language_id for token in tokens
+                        if isinstance(token, LocaleCurrencyToken) and token.language_id is not None]
+        self.names = names = get_date_names(language_ids[0] if language_ids else None)
+        tables = names._asdict()
+        tables['month_letters'] = tuple(name[:1] for name in names.months)
+        if any(isinstance(token, DateTimeToken) and token.value.lower() in ('d', 'dd') for token in tokens):
+            tables['months'] = names.genitive_months
+        # Fraction digits of the seconds, as ``ss.00``, values are rounded to them
+        self.precision = 0
+
+        pieces = []
+        emitters = []
+        for index, token in enumerate(tokens):
+            if isinstance(token, DigitToken):
+                size = seconds_fraction_size(tokens, index)
+                if not size or size > MAX_PRECISION:
+                    raise IllegalPartToken(tokens)
+                # The digits are emitted at once by the first one
+                if not isinstance(tokens[index - 1], DigitToken):
+                    pieces.append('%%0%dd' % size)
+                    emitters.append(fraction_emitter(size))
+                    self.precision = max(self.precision, size)
+            elif isinstance(token, DateTimeToken):
+                symbol = token.value.lower()
+                if symbol in ('m', 'mm'):
+                    field = MINUTE if is_minute(tokens, index) else MONTH
+                    conversion, emitter = ('%02d' if symbol == 'mm' else '%d'), itemgetter(field)
+                elif symbol in ('h', 'hh'):
+                    conversion = '%02d' if len(symbol) == 2 else '%d'
+                    emitter = hour_12 if has_am_pm else itemgetter(HOUR)
+                elif symbol in SYMBOLS:
+                    conversion, emitter = SYMBOLS[symbol]
+                elif symbol in NAME_SYMBOLS:
+                    field, table = NAME_SYMBOLS[symbol]
+                    conversion, emitter = '%s', name_emitter(field, tables[table])
+                else:
+                    raise IllegalPartToken(tokens)
+                pieces.append(conversion)
+                emitters.append(emitter)
+            elif isinstance(token, AmPmToken):
+                pieces.append('%s')
+                emitters.append(am_pm_emitter(names.am, names.pm))
+            elif isinstance(token, SlashSymbol):
+                pieces.append('/')
+            elif isinstance(token, DotDelimiter):
+                pieces.append('.')
+            elif isinstance(token, CommaDelimiter):
+                pieces.append(',')
+            elif isinstance(token, StringSymbol):
+                pieces.append(token.value.replace('%', '%%'))
+            elif not isinstance(token, (LocaleCurrencyToken, ColorToken, ConditionToken)):
+                raise IllegalPartToken(tokens)
+
+        self.template = ''.join(pieces)
+        self.emitters = tuple(emitters)
+
+    def __call__(self, value):
+        """
+        :type value: datetime.datetime
+        :rtype: str
+        """
+        return self.format_fields(datetime_fields(value))
+
+    def many(self, values):
+        """
+        Format a sequence of datetimes.
+
+        :rtype: list[str]
+        """
+        format_fields = self.format_fields
+        return [format_fields(datetime_fields(value)) for value in values]
+
+    def format_fields(self, fields):
+        """
+        :param fields: Components of the value, see ``datetime_fields``
+        :type fields: (int, int, int, int, int, int, int, int)
+        :rtype: str
+        """
+        return self.template % tuple([emitter(fields) for emitter in self.emitters])
@@ -0,0 +1,149 @@
+# coding: utf-8
+
+"""
+Durations in elapsed time sections, as ``[h]:mm:ss``, ``[mm]:ss`` or ``[ss].00``.
+
+The bracketed token shows the whole duration in its unit, the other tokens the rest within the
+larger unit. A duration is a serial, a number of days, or a timedelta. It is rounded once to the
+shown precision of the seconds, then split with integer arithmetic into its components,
+``(hours, minutes, seconds, hour, minute, second, microsecond)`` with the totals first.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+from datetime import timedelta
+from fractions import Fraction
+from operator import itemgetter
+
+from formatcode.convert.dates import MAX_PRECISION, fraction_emitter, seconds_fraction_size
+from formatcode.convert.errors import IllegalPartToken
+from formatcode.convert.serials import MICROSECONDS, serial_units
+from formatcode.lexer.tokens import (ColorToken, CommaDelimiter, ConditionToken, DateTimeToken, DigitToken,
+                                     DotDelimiter, LocaleCurrencyToken, SlashSymbol, StringSymbol, TimeDeltaToken)
+
+HOURS, MINUTES, SECONDS, HOUR, MINUTE, SECOND, MICROSECOND = range(7)
+
+# Component of the whole duration of each unit of an elapsed token
+TOTALS = {'h': HOURS, 'm': MINUTES, 's': SECONDS}
+# Component of the rest of each unit of another token
+PARTS = {'h': HOUR, 'm': MINUTE, 's': SECOND}
+
+
+def timedelta_units(value, precision=0):
+    """
+    Sign and magnitude of a timedelta in units of the precision, rounded half away from zero.
+
+    :type value: datetime.timedelta
+    :param int precision: Fraction digits of the seconds
+    :rtype: (bool, int)
+    """
+    microseconds = (value.days * 86400 + value.seconds) * MICROSECONDS + value.microseconds
+    negative = microseconds < 0
+    unit = MICROSECONDS // 10 ** precision
+    units, rest = divmod(abs(microseconds), unit)
+    if rest * 2 >= unit:
+        units += 1
+    return negative, units
+
+
+def timedelta_days(value):
+    """
+    Exact number of days of a timedelta, the way its section is picked.
+
+    :type value: datetime.timedelta
+    :rtype: Fraction
+    """
+    return Fraction((value.days * 86400 + value.seconds) * MICROSECONDS + value.microseconds, 86400 * MICROSECONDS)
+
+
+class ElapsedTimeFormatter(object):
+    """
+    Formatter of an elapsed time section, compiled once per section.
+
+    Negative durations are shown with a minus sign, unless the section is the negative one and
+    formats the sign itself.
+    """
+
+    def __init__(self, tokens, strip_sign=False):
+        """
+        :param tokens: Tokens of the section
+        :type tokens: list[formatcode.lexer.tokens.Token]
+        :param bool strip_sign: Whether the sign is formatted by the section itself
+        :raises IllegalPartToken: If a token has no meaning in an elapsed time section
+        """
+        self.strip_sign = strip_sign
+        # Fraction digits of the seconds, values are rounded to them
+        self.precision = 0
+
+        pieces = []
+        emitters = []
+        for index, token in enumerate(tokens):
+            if isinstance(token, DigitToken):
+                size = seconds_fraction_size(tokens, index)
+                if not size or size > MAX_PRECISION:
+                    raise IllegalPartToken(tokens)
+                # The digits are emitted at once by the first one
+                if not isinstance(tokens[index - 1], DigitToken):
+                    pieces.append('%%0%dd' % size)
+                    emitters.append(fraction_emitter(size, MICROSECOND))
+                    self.precision = max(self.precision, size)
+            elif isinstance(token, TimeDeltaToken):
+                pieces.append('%%0%dd' % len(token.value))
+                emitters.append(itemgetter(TOTALS[token.value[0].lower()]))
+            elif isinstance(token, DateTimeToken):
+                symbol = token.value.lower()
+                if symbol not in ('h', 'hh', 'm', 'mm', 's', 'ss'):
+                    raise IllegalPartToken(tokens)
+                pieces.append('%02d' if len(symbol) == 2 else '%d')
+                emitters.append(itemgetter(PARTS[symbol[0]]))
+            elif isinstance(token, SlashSymbol):
+                pieces.append('/')
+            elif isinstance(token, DotDelimiter):
+                pieces.append('.')
+            elif isinstance(token, CommaDelimiter):
+                pieces.append(',')
+            elif isinstance(token, StringSymbol):
+                pieces.append(token.value.replace('%', '%%'))
+            elif not isinstance(token, (LocaleCurrencyToken, ColorToken, ConditionToken)):
+                raise IllegalPartToken(tokens)
+
+        self.template = ''.join(pieces)
+        self.emitters = tuple(emitters)
+        self.units_per_day = 86400 * 10 ** self.precision
+
+    def __call__(self, value):
+        """
+        :type value: int | float | Decimal | str | datetime.timedelta
+        :rtype: str
+        :raises ValueError: If the value is not a finite number
+        """
+        if isinstance(value, timedelta):
+            return self.format_units(*timedelta_units(value, self.precision))
+        return self.format_units(*serial_units(value, self.units_per_day))
+
+    def many(self, values):
+        """
+        Format a sequence of durations.
+
+        :rtype: list[str]
+        """
+        format_units = self.format_units
+        units_per_day = self.units_per_day
+        return [format_units(*serial_units(value, units_per_day)) if type(value) is float else self(value)
+                for value in values]
+
+    def format_units(self, negative, units):
+        """
+        :param bool negative: Whether the duration is negative
+        :param int units: Magnitude of the duration in units of the precision
+        :rtype: str
+        """
+        seconds, fraction = divmod(units, 10 ** self.precision)
+        minutes, second = divmod(seconds, 60)
+        hours, minute = divmod(minutes, 60)
+        fields = (hours, minutes, seconds, hours % 24, minute, second,
+                  fraction * (MICROSECONDS // 10 ** self.precision))
+        line = self.template % tuple([emitter(fields) for emitter in self.emitters])
+        if negative and units and not self.strip_sign:
+            return '-' + line
+        return line
@@ -31,3 +31,7 @@ class GeneralFormatError(ConverterError):
 
 class DuplicateFractionFormat(ConverterError):
     pass
+
+
+class BuiltinFormatError(ConverterError):
+    pass
@@ -1,227 +1,403 @@
 # coding: utf-8
 
 from __future__ import division, print_function, unicode_literals
-from sys import platform
+from bisect import bisect_right
+from decimal import Decimal
 from six.moves import zip_longest
 
+from formatcode.convert.builtin import LOCALE_BUILTIN_FORMATS, builtin_format
+from formatcode.convert.cache import CompileCache
+from formatcode.convert.canonical import canonical_line
+from formatcode.convert.dates import temporal_fields
+from formatcode.convert.elapsed import timedelta_days
 from formatcode.convert.errors import PartsCountError
+from formatcode.convert.general import GeneralFormatter
+from formatcode.convert.locales import LocalizedFormatter, get_number_translation
 from formatcode.convert.parts import NegativePart, PositivePart, StringPart, ZeroPart
-from formatcode.convert.utils import split_tokens
-from formatcode.base.utils import is_general
-from formatcode.lexer.lexer import to_tokens_line
+from formatcode.convert.serials import get_date_system
+from formatcode.convert.utils import expand_sections, split_tokens, tokens_key
+from formatcode.base.errors import FormatCodeError
+from formatcode.base.utils import cached_property, is_number_string
+from formatcode.lexer.lexer import to_tokens_block
+from formatcode.lexer.tokens import ConditionToken, ForceNumberToken, GeneralToken
 from formatcode.lexer.tokens import BlockDelimiter
-from datetime import datetime
-from formatcode.lexer.tokens import DateTimeToken
-from formatcode.lexer.tokens import SlashSymbol
-from formatcode.lexer.tokens import StringSymbol
-from formatcode.lexer.tokens import AmPmToken
-from formatcode.lexer.tokens import LocaleCurrencyToken
+from datetime import datetime, timedelta
 
 parts_types = (PositivePart, NegativePart, ZeroPart, StringPart)
+ONE_DAY = timedelta(days=1)
+ZERO_DURATION = timedelta(0)
+
+
+def approx_size(fc):
+    """
+    Rough memory footprint of a compiled format code in bytes, fitted with tracemalloc.
+    """
+    return 3500 + 220 * sum(len(tokens) for tokens in fc.sections)
 
 
 class FormatCode(object):
-    def __init__(self, line, asterisk_repeat_count=0):
+    # Process-wide cache of compiled format codes used by FormatCode.get
+    cache = CompileCache(max_entries=4096, max_size=64 * 2 ** 20, sizeof=approx_size, errors=(FormatCodeError,))
+    # Canonical spelling of the lines seen by FormatCode.get
+    canonical_lines = CompileCache(max_entries=16384)
+    # Tokens lines shared by identical sections
+    shared_sections = CompileCache(max_entries=16384)
+    # Configured handlers shared by structurally identical parts
+    shared_handlers = CompileCache(max_entries=16384)
+    # Built-in formats by (class, id, language id), compiled by FormatCode.builtin on first use
+    builtin_codes = {}
+
+    def __init__(self, line, asterisk_repeat_count=0, lazy=False, date1904=False):
+        """
+        :param bool lazy: Configure the handler of each part on first use, parts are still validated
+                          here. Errors from the configuration of a handler are raised on first use.
+        :param bool date1904: Numbers in date sections are serials of the 1904 date system, of the
+                              1900 one otherwise
+        """
         self.asterisk_repeat_count = asterisk_repeat_count
-        if ";" not in line and not is_general(line):
-            line = line + ";-" + line
-
-        self.format_string = line
-        tokens = to_tokens_line(line)
-        self.parts = self.parts_from_tokens(tokens)
+        self.lazy = lazy
+        self.date1904 = date1904
+        self.source_line = line
+        self.format_string = line = expand_sections(line)
+        self.section_starts, self.sections, _ = self.lex_sections(line)
+        self.parts = self.parts_from_sections(self.sections)
         self.pos_part, self.neg_part, self.else_part, self.str_part = self.parts
+        self.general = self.compile_general()
 
-        for part in self.parts:
-            part.handler.configure()
+        if not lazy:
+            for part in self.parts:
+                part.configure()
+
+    @classmethod
+    def get(cls, line, asterisk_repeat_count=0, fallback=None, lazy=False, date1904=False):
+        """
+        Shared compiled format code from the process-wide cache.
+
+        The returned object is shared between callers and threads, it must not be modified. It is
+        shared by all equivalent spellings of the line as well, and compiled from the canonical one.
+        Lines that failed to compile fail again with the same error without being compiled.
+
+        :param str fallback: Format code used instead of a line that fails to compile
+        :param bool lazy: Configure handlers on first use, see ``FormatCode``
+        :param bool date1904: Serials of the 1904 date system, see ``FormatCode``
+        :rtype: FormatCode
+        """
+        if fallback is not None:
+            fallback_factory = lambda: cls.get(fallback, asterisk_repeat_count, lazy=lazy, date1904=date1904)
+        else:
+            fallback_factory = None
+        line = cls.canonical_lines.get(line, lambda: canonical_line(line))
+        key = (cls, line, asterisk_repeat_count, lazy, date1904)
+        return cls.cache.get(key, lambda: cls(line, asterisk_repeat_count, lazy, date1904), fallback_factory)
+
+    @classmethod
+    def builtin(cls, num_fmt_id, language_id=None, date1904=False):
+        """
+        Shared compiled built-in format, the way workbooks refer to it by id.
+
+        :param int num_fmt_id: Built-in format id
+        :param int language_id: Locale id (LCID) for locale-dependent formats, en-US if None
+        :param bool date1904: Serials of the 1904 date system, see ``FormatCode``
+        :rtype: FormatCode
+        """
+        if language_id not in LOCALE_BUILTIN_FORMATS:
+            language_id = None
+        key = (cls, num_fmt_id, language_id, date1904)
+        fc = cls.builtin_codes.get(key)
+        if fc is None:
+            # Threads compiling the same format at once all return the first one stored.
+            line = builtin_format(num_fmt_id, language_id)
+            fc = cls.builtin_codes.setdefault(key, cls.get(line, date1904=date1904))
+        return fc
+
+    @classmethod
+    def lex_sections(cls, line, pos=0, stop_at=None):
+        """
+        Lex the line section by section, identical sections share their tokens line.
+
+        :param int pos: Start of the first section to lex
+        :param dict stop_at: Section indexes by start position, lexing stops before these sections
+        :rtype: (list[int], list[list[formatcode.lexer.tokens.Token]], int | None)
+        :return: Start positions and tokens of the lexed sections, index from ``stop_at`` if stopped
+        """
+        starts = [pos]
+        sections = [[]]
+        while pos < len(line):
+            tokens, pos = to_tokens_block(line, pos)
+            if tokens and isinstance(tokens[-1], BlockDelimiter):
+                sections[-1] = cls.share_section(tokens[:-1])
+                if stop_at and pos in stop_at:
+                    return starts, sections, stop_at[pos]
+                starts.append(pos)
+                sections.append([])
+            else:
+                sections[-1] = cls.share_section(tokens)
+        return starts, sections, None
+
+    @classmethod
+    def share_section(cls, tokens):
+        """
+        :rtype: list[formatcode.lexer.tokens.Token]
+        """
+        return cls.shared_sections.get(tokens_key(tokens), lambda: tokens)
 
     def parts_from_tokens(self, tokens):
         """
         :param list tokens: Tokens line
         :rtype: list[formatcode.convert.parts.FormatPart]
         """
-        tokens_by_part = split_tokens(tokens, BlockDelimiter)
-        
-        if len(tokens_by_part) > len(parts_types):
+        return self.parts_from_sections(split_tokens(tokens, BlockDelimiter))
+
+    def parts_from_sections(self, sections):
+        """
+        :param list sections: Tokens line of every section
+        :rtype: list[formatcode.convert.parts.FormatPart]
+        """
+        if len(sections) > len(parts_types):
             # There can be only 4 parts
-            raise PartsCountError(tokens)
+            raise PartsCountError([t for ts in sections for t in ts])
 
-        parts = [pt(fc=self, tokens=ts) for pt, ts in zip_longest(parts_types, tokens_by_part)]
+        parts = [pt(fc=self, tokens=ts) for pt, ts in zip_longest(parts_types, sections)]
         return parts
 
-    def format(self, value):
-        if value not in (None, ''):
+    def edit(self, start, end, text):
+        """
+        Compile the format with ``source_line[start:end]`` replaced by ``text``.
 
-            # Shortcut "General" format.
-            if is_general(self.format_string.lower()):
-               # Values above this amount are rounded.
-               if value < 1000000000 and value > -1000000000:
-                   return str(value)
-               else:
-                   return str(round(value))
+        Only the sections touched by the edit are lexed and configured again, the other parts are
+        shared with this format code, which stays usable.
 
-            # If datetime, use the custom formatter.
-            if (isinstance(value, datetime)):
-                return self.format_datetime(value)
+        :rtype: FormatCode
+        """
+        line = self.source_line[:start] + text + self.source_line[end:]
+        if self.format_string != self.source_line or expand_sections(line) != line:
+            # Single section codes are rewritten as a whole.
+            return FormatCode(line, asterisk_repeat_count=self.asterisk_repeat_count, lazy=self.lazy,
+                              date1904=self.date1904)
+
+        # First section the edit touches. A forced number token may have been matched after other
+        # tokens failed on text far ahead, so its section is lexed again as well.
+        first = bisect_right(self.section_starts, start) - 1
+        for idx, tokens in enumerate(self.sections[:first]):
+            if any(isinstance(t, ForceNumberToken) for t in tokens):
+                first = idx
+                break
+
+        # Lexing stops at the first untouched section, the following ones are only shifted.
+        shift = len(text) - (end - start)
+        stop_at = {s + shift: idx for idx, s in enumerate(self.section_starts) if s >= end}
+        starts, sections, kept = self.lex_sections(line, self.section_starts[first], stop_at)
+
+        starts = self.section_starts[:first] + starts
+        sections = self.sections[:first] + sections
+        if kept is not None:
+            starts += [s + shift for s in self.section_starts[kept:]]
+            sections += self.sections[kept:]
+
+        fc = self.__class__.__new__(self.__class__)
+        fc.asterisk_repeat_count = self.asterisk_repeat_count
+        fc.lazy = self.lazy
+        fc.date1904 = self.date1904
+        fc.source_line = fc.format_string = line
+        fc.section_starts, fc.sections = starts, sections
+
+        if len(sections) > len(parts_types):
+            # There can be only 4 parts
+            raise PartsCountError([t for ts in sections for t in ts])
 
-            for part in self.parts:
-                if part.checker(value):
-                    return part.format(value)
+        fc.parts = []
+        for part_type, tokens, part in zip_longest(parts_types, sections, self.parts):
+            if tokens is part.tokens:
+                fc.parts.append(part.bind(fc))
             else:
-                return self.else_part.format(value)
-        else:
-            return value
-
-    def format_datetime(self, value: datetime) -> str:
-        
-        # Excel to Python symbol map.
-        leading_zero_escape_char = '#' if platform == 'win32' else '-'
-        symbol_map = {
-            'yyyy' : '%Y',
-            'yy': '%y',
-            'YYYY' : '%Y',
-            'YY': '%y',
-            'mmmm': '%B',
-            'mmm': '%b',
-            'MMM': '%b',
-            'MM' : '%m',
-            'M' : f"%{leading_zero_escape_char}m",
-            # 'mm' and 'm' are special cases in code.
-            'dddd': '%A',
-            'ddd': '%a',
-            'DD': '%d',
-            "D":  f"%{leading_zero_escape_char}d",
-            'dd': '%d',
-            "d":  f"%{leading_zero_escape_char}d",
-            #'HH','H','hh''h' are special cases in code.
-            'ss': '%S',
-            's': f'%{leading_zero_escape_char}S',
-            'am/pm': '%p'  
-        }
-
-        # Look fr an MA/PM marker.
-        format_tokens = self.pos_part.tokens
-        has_ampm = False
-        for token in format_tokens:
-            if isinstance(token, AmPmToken):
-                has_ampm = True
-
-        # Start output as an empty string that may be appended to.
-        formatted = ''
-
-        # Loop through the token is turn.
-        for token_index, token in enumerate(format_tokens):
-            
-            # Is this a format placeholder?
-            if isinstance(token, DateTimeToken):
-
-                # Load the symbol and find its strftime quivalent.
-                symbol = token.cleaned_data['value']
-                symbol_format_string = None
-
-                # Special case of "m" or "mm", as could be month or minutes.
-                if (symbol == "m" or symbol == "mm"):
-                    
-                    # Look from current node for the next symbol in either direction.
-                    prev_symbol = self._find_date_token_symbol(token_index, -1, format_tokens)
-                    next_symbol = self._find_date_token_symbol(token_index, +1, format_tokens)
-
-                    # If the next adjacent token is hours or seconds, this means minutes.
-                    if self._is_hours_or_seconds(prev_symbol, next_symbol):
-                        if (symbol == "mm"):
-                            symbol_format_string = '%M'
-                        else:
-                            symbol_format_string = f'%{leading_zero_escape_char}M'
-
-                    # Otherwise, months.
-                    else:
-                        if (symbol == "mm"):
-                            symbol_format_string = '%m'
-                        else:
-                            symbol_format_string = f"%{leading_zero_escape_char}m"
-
-                # Special case of "h" or "hh". Use 12 hour if there is an AmPmToken in the string.
-                elif (symbol == "h" or symbol == "hh" or symbol == "H" or symbol == "HH"):
-
-                    # All strftime symbols start with "%"
-                    symbol_format_string = "%"
-
-                    # If "h", add the marker.
-                    if (len(symbol) == 1):
-                        symbol_format_string += leading_zero_escape_char
-                
-                    # If A</PM presetnt, use 12 hour, else 24.
-                    symbol_format_string += ("I" if has_ampm else "H")
-
-                # Not a special case, look in the map.
-                else:
-                    symbol_format_string = symbol_map[symbol]
+                fc.parts.append(part_type(fc=fc, tokens=tokens))
+        fc.pos_part, fc.neg_part, fc.else_part, fc.str_part = fc.parts
+        fc.general = fc.compile_general()
+
+        # Kept parts keep their position, their handlers are configured again if a new section
+        # changes what they depend on.
+        for part, old_part in zip(fc.parts, self.parts):
+            if part.tokens is not old_part.tokens:
+                if not fc.lazy:
+                    part.configure()
+            elif part.configured and part.siblings_changed():
+                part.configure_siblings()
+        return fc
+
+    def compile_general(self):
+        """
+        Formatter of every number for a format code with a single ``General`` section.
 
-                # Format this component.
-                formatted_per_token = value.strftime(symbol_format_string)
-                
-                # Add to over all string.
-                formatted += formatted_per_token
+        :rtype: formatcode.convert.general.GeneralFormatter | formatcode.convert.locales.LocalizedFormatter | None
+        """
+        if len(self.sections) == 1 and any(isinstance(token, GeneralToken) for token in self.sections[0]):
+            translation = get_number_translation(self.pos_part.language_id, self.pos_part.number_system)
+            if translation is not None:
+                return LocalizedFormatter(GeneralFormatter(), translation[0])
+            return GeneralFormatter()
+        return None
 
-            # Handle Slashes.
-            elif isinstance(token, SlashSymbol):
+    def kernels(self):
+        """
+        Name of the formatter picked for each part, for diagnostics.
 
-                # Insert a slash.
-                formatted += '/'
+        :rtype: list[str]
+        """
+        return [part.kernel for part in self.parts]
 
-            # Handle strings.
-            elif isinstance(token, StringSymbol):
+    def format(self, value):
+        if value not in (None, ''):
 
-                # Load string value and add to fomatted output.
-                symbol = token.cleaned_data['value']
-                formatted += symbol
+            # Shortcut "General" format, decided at compile time. Text is shown as it is.
+            general = self.general
+            if general is not None:
+                if type(value) in (int, float, Decimal):
+                    return general(value)
+                if isinstance(value, str):
+                    return general(value) if is_number_string(value) else value
+
+            # Numbers read as text: the part is picked by the exact value, the digits are
+            # formatted from the text itself, without a float conversion.
+            number = value
+            if isinstance(value, str):
+                if not is_number_string(value):
+                    # Text goes to the text section, shown as it is without one
+                    return self.str_part.format(value)
+                number = Decimal(value)
+            elif type(value) not in (int, float, Decimal):
+                # Dates and times are formatted from their components, durations by their section.
+                if isinstance(value, timedelta):
+                    return self.format_timedelta(value)
+                else:
+                    line = self.format_temporal(value)
+                    if line is not None:
+                        return line
 
-            # Handle AmPmToken
-            elif isinstance(token, AmPmToken):
-                
-                # Add either AM or PM.
-                formatted += "AM" if value.hour < 12 else "PM"
+            return self.select_part(number).format(value)
+        else:
+            return value
 
-            # Skip these.
-            elif isinstance(token, LocaleCurrencyToken):
-                pass
+    def format_timedelta(self, value):
+        """
+        Format a duration with the part picked by its exact number of days, from its components in
+        date and elapsed time sections and as a number of days in the others.
 
-            # Catch other tokens that may need to be coded as elif cases above.
-            else:
-                raise Exception('Unknown tokne.')
-        
-        # Return completed formatted string.
-        return formatted
+        :type value: timedelta
+        :rtype: str
+        """
+        part = self.select_part(self.timedelta_number(value))
+        if part.is_temporal:
+            return part.format(value)
+        return part.format(value / ONE_DAY)
 
-    def _find_date_token_symbol(self, start_index, direction, tokens):
+    def timedelta_number(self, value):
+        """
+        Number a duration is compared with to pick its part: its sign, or its exact number of days
+        if a part has a condition.
 
-        # Find limit. Either one past the end or one past the start.
-        stop = len(tokens) if (direction==+1) else -1
+        :type value: timedelta
+        :rtype: int | fractions.Fraction
+        """
+        if self.conditional:
+            return timedelta_days(value)
+        return (value > ZERO_DURATION) - (value < ZERO_DURATION)
 
-        # Loop from the next-to-start item until the end.
-        for index in range(start_index + direction, stop, direction):
+    @cached_property
+    def conditional(self):
+        """
+        Whether a part is picked by a condition, as ``[>=100]``.
 
-            # Pull out the current token.
-            curr_token = tokens[index]
+        :rtype: bool
+        """
+        return any(ConditionToken in part.token_types for part in self.parts)
 
-            # Is this a DateToken?
-            if isinstance(curr_token, DateTimeToken):
+    def format_temporal(self, value):
+        """
+        Format a datetime, date, time or numpy datetime64 with the part picked by its serial, from
+        its components in date sections and as its serial in the others. NaT is shown as an empty
+        string, None is returned for other values.
 
-                # Found it, return the symbol.
-                return curr_token.cleaned_data['value']
-        
-        # Reached the end of the sequence.
-        return None
+        :rtype: str | None
+        """
+        date_system = get_date_system(self.date1904)
+        try:
+            fields = temporal_fields(value, date_system)
+        except ValueError:
+            # NaT, a missing value
+            return ''
+        if fields is None:
+            return None
+
+        serial = date_system.serial(fields)
+        # Days before the date system are shown by the date section of its first day
+        part = self.select_part(max(serial, 0))
+        if part.kernel == 'date':
+            return part.format(value)
+        if serial < 0:
+            part = self.select_part(serial)
+        return part.format(serial)
+
+    def select_part(self, number):
+        """
+        Part formatting the number.
 
-    def _is_hours_or_seconds(self, prev_symbol, next_symbol):
+        :type number: int | float | Decimal
+        :rtype: formatcode.convert.parts.FormatPart
+        """
+        for part in self.parts:
+            if part.checker(number):
+                return part
+        return self.else_part
 
-        # Join both, as we're only doing a "contains" search.
-        symbols = ((prev_symbol or "") + (next_symbol or "")).upper()
+    def column_formatter(self, value):
+        """
+        Formatter of a sequence of values the value is formatted with, None for the values
+        formatted one by one.
 
-        # If the combined string contains H or S, return true.
-        if "H" in symbols or "S" in symbols:
-            return True
+        :rtype: ((list) -> list[str]) | None
+        """
+        if type(value) in (int, float, Decimal):
+            number = value
+        elif isinstance(value, str):
+            if not is_number_string(value):
+                return self.str_part.format_many
+            number = Decimal(value)
+        elif type(value) is timedelta and self.general is None:
+            part = self.select_part(self.timedelta_number(value))
+            return part.format_many if part.is_temporal else None
         else:
-            return False
+            return None
+        if self.general is not None:
+            return self.general.many
+        return self.select_part(number).format_many
+
+    def format_many(self, values):
+        """
+        Format every value with this format code.
+
+        Numbers and durations are passed to their part together, a whole column is formatted faster
+        than value by value.
 
+        :type values: collections.Iterable
+        :rtype: list
+        """
+        results = list(values)
+
+        # Indexes and values by formatter of a column
+        batches = {}
+        for index, value in enumerate(results):
+            many = self.column_formatter(value)
+            if many is None:
+                results[index] = self.format(value)
+                continue
+            indexes, batch = batches.setdefault(many, ([], []))
+            indexes.append(index)
+            batch.append(value)
+
+        for many, (indexes, batch) in batches.items():
+            for index, line in zip(indexes, many(batch)):
+                results[index] = line
+        return results
 
-        
\ No newline at end of file
+    def format_datetime(self, value: datetime) -> str:
+        return self.format_temporal(value)
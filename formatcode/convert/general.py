@@ -0,0 +1,153 @@
+# coding: utf-8
+
+"""
+Numbers in the ``General`` format, the way spreadsheets display them in a standard width column.
+
+A number is shown with as many digits as fit in the width, rounded half away from zero, without
+trailing zeros. Numbers too large or too small for the plain notation are shown in scientific
+notation, as ``1.23457E+11`` or ``1E-05``. The sign is not counted in the width.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+from formatcode.convert.rounding import decompose, round_fixed
+
+# Characters of a standard width column
+GENERAL_WIDTH = 11
+# Smallest power of ten shown in plain notation
+MIN_PLAIN_EXPONENT = -4
+
+
+class GeneralFormatter(object):
+    """
+    Formatter of the ``General`` format, compiled once per section.
+
+    Floats in plain notation are rounded on the digits of their shortest representation, the
+    other numbers from their decimal digits with integer arithmetic.
+    """
+
+    def __init__(self, width=GENERAL_WIDTH, strip_sign=False):
+        """
+        :param int width: Characters available for the number, without its sign
+        :param bool strip_sign: Whether the sign is formatted by the section itself
+        """
+        self.width = width
+        self.strip_sign = strip_sign
+
+    def __call__(self, value):
+        """
+        :type value: int | float | Decimal | str
+        :rtype: str
+        :raises ValueError: If the value is not a finite number
+        """
+        value_type = type(value)
+        if value_type is float:
+            line = repr(value)
+            # Plain shortest representation, as "-2751.59" or "12.0", rounded on its digits
+            if 'e' not in line and 'n' not in line:
+                negative = line[0] == '-'
+                int_digits, _, frac_digits = line[negative:].partition('.')
+                decimals = self.width - 1 - len(int_digits)
+                if len(frac_digits) > decimals >= -1:
+                    decimals = max(decimals, 0)
+                    digits = int_digits + frac_digits[:decimals]
+                    if frac_digits[decimals] >= '5':
+                        digits = str(int(digits) + 1).zfill(len(digits))
+                    size = len(digits) - decimals
+                    int_digits, frac_digits = digits[:size], digits[size:]
+                if len(int_digits) <= self.width:
+                    frac_digits = frac_digits.rstrip('0')
+                    line = int_digits + '.' + frac_digits if frac_digits else int_digits
+                    if negative and not self.strip_sign and line != '0':
+                        return '-' + line
+                    return line
+        elif value_type is int:
+            line = str(value)
+            if len(line) - (value < 0) <= self.width:
+                return line[1:] if value < 0 and self.strip_sign else line
+        return self.format(value)
+
+    def many(self, values):
+        """
+        Format a sequence of values.
+
+        Integers that fit in the width are shown as they are. A float whose shortest representation
+        fits in the width and has no exponent needs no rounding, it is shown as it is without a
+        trailing ``.0``. The other values are formatted one by one.
+
+        :rtype: list[str]
+        :raises ValueError: If a value is not a finite number
+        """
+        width = self.width
+        strip_sign = self.strip_sign
+        # Integers below it fit in the width
+        int_limit = 10 ** width
+        format = self.__call__
+
+        lines = []
+        append = lines.append
+        for value in values:
+            value_type = type(value)
+            if value_type is float:
+                line = repr(value)
+                negative = line[0] == '-'
+                # Not inf or nan, nor an exponent
+                if len(line) - negative <= width and 'e' not in line and 'n' not in line:
+                    if line.endswith('.0'):
+                        line = line[:-2]
+                    if negative and (strip_sign or line == '-0'):
+                        line = line[1:]
+                    append(line)
+                    continue
+            elif value_type is int and -int_limit < value < int_limit:
+                append(str(-value) if value < 0 and strip_sign else str(value))
+                continue
+            append(format(value))
+        return lines
+
+    def format(self, value):
+        """
+        :type value: int | float | Decimal | str
+        :rtype: str
+        """
+        negative, coefficient, exponent = decompose(value)
+        if not coefficient:
+            return '0'
+        sign = '-' if negative and not self.strip_sign else ''
+        adjusted = len(str(coefficient)) - 1 + exponent
+
+        if MIN_PLAIN_EXPONENT <= adjusted < self.width:
+            # Digits before the decimal point, a single zero below one
+            int_size = max(adjusted + 1, 1)
+            _, int_digits, frac_digits = round_fixed((negative, coefficient, exponent),
+                                                     max(self.width - int_size - 1, 0))
+            if len(int_digits) <= self.width:
+                frac_digits = frac_digits.rstrip('0')
+                if frac_digits:
+                    return sign + int_digits + '.' + frac_digits
+                return sign + int_digits
+
+        return sign + self.scientific(coefficient, exponent, adjusted)
+
+    def scientific(self, coefficient, exponent, adjusted):
+        """
+        Scientific notation of a nonzero number without sign, with at least two exponent digits.
+
+        :type coefficient: int
+        :type exponent: int
+        :param int adjusted: Power of ten of the first digit
+        :rtype: str
+        """
+        while True:
+            exponent_line = ('E+%02d' if adjusted >= 0 else 'E-%02d') % abs(adjusted)
+            decimals = max(self.width - 2 - len(exponent_line), 0)
+            _, int_digits, frac_digits = round_fixed((False, coefficient, exponent - adjusted), decimals)
+            if len(int_digits) == 1:
+                break
+            # Rounded up to the next power of ten
+            adjusted += 1
+
+        frac_digits = frac_digits.rstrip('0')
+        if frac_digits:
+            return int_digits + '.' + frac_digits + exponent_line
+        return int_digits + exponent_line
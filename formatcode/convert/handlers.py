@@ -3,14 +3,24 @@
 from __future__ import division, print_function, unicode_literals
 
 from abc import ABC
+from datetime import timedelta
 from decimal import Decimal
-from fractions import Fraction
 
-from sigfig import round
-from six import text_type
+from six import string_types, text_type
 
+from formatcode.base.utils import is_number_string
+from formatcode.convert.dates import DateTimeFormatter, temporal_fields
+from formatcode.convert.elapsed import ElapsedTimeFormatter, timedelta_units
 from formatcode.convert.errors import IllegalPartToken
-from formatcode.convert.mask import Mask
+from formatcode.convert.general import GeneralFormatter
+from formatcode.convert.kernels import classify, compile_kernel, no_negative_zero
+from formatcode.convert.locales import LocalizedFormatter, get_number_translation
+from formatcode.convert.mask import Mask, MaskToken
+from formatcode.convert.placement import PADDING_VALUES, compile_decimals, compile_placement
+from formatcode.convert.rational import FractionFormatter
+from formatcode.convert.rounding import decompose, fixed_string, round_fixed
+from formatcode.convert.scientific import ScientificFormatter
+from formatcode.convert.serials import DATE_1900, OUT_OF_RANGE, get_date_system
 from formatcode.convert.utils import split_tokens
 from formatcode.lexer.tokens import (AmPmToken, AsteriskSymbol, AtSymbol, ColorToken, CommaDelimiter, DigitToken,
                                      DotDelimiter, EToken, LocaleCurrencyToken, PercentageSymbol, SlashSymbol,
@@ -18,6 +28,10 @@ from formatcode.lexer.tokens import (AmPmToken, AsteriskSymbol, AtSymbol, ColorT
 
 
 class BaseHandler(ABC):
+    minutes_only = False
+    # Name of the formatter picked for the section, shown by FormatCode.kernels
+    kernel = 'default'
+
     def __init__(self, part):
         """
         :type part: formatcode.convert.parts.FormatPart
@@ -27,32 +41,77 @@ class BaseHandler(ABC):
         self.tokens = self.part.tokens
 
     def configure(self):
-        pass
+        self.configure_siblings()
+
+    def configure_siblings(self):
+        """
+        Configure what depends on the other parts of the format code.
+
+        Configured handlers are shared between format codes, ``format`` must only depend on the
+        other parts through what is configured here.
+        """
+        self.minutes_only = self.fc.format_string == '[m];-[m]'
+
+    def shared_key(self):
+        """
+        Configured handlers with the same key are interchangeable.
+
+        Identical sections share their tokens line (see ``FormatCode.share_section``), so lines are
+        compared by id. The handler keeps its line alive, the id is not reused while the key is in use.
+        """
+        return (self.__class__, self.part.__class__, id(self.tokens), self.fc.asterisk_repeat_count,
+                self.fc.date1904, self.siblings_key())
+
+    def siblings_key(self):
+        """
+        What ``configure_siblings`` depends on.
+        """
+        return self.fc.format_string == '[m];-[m]'
 
     def format(self, v):
         # Is this the [m] formatter with a number?
-        if self.fc.format_string == '[m];-[m]' and isinstance(v, float) and v >= 0 and v < 1:            
+        if self.minutes_only and isinstance(v, float) and v >= 0 and v < 1:            
             # Find number of minutes.
             return f'[{int(v * 1440)}]'
 
         # Apply general formatting.
         return str(v)
 
+    def format_many(self, values):
+        """
+        Format a sequence of values of the section.
+
+        :rtype: list[str]
+        """
+        format = self.format
+        return [format(value) for value in values]
+
 
 class GeneralHandler(BaseHandler):
+    kernel = 'general'
     remove_sign = False
+    # Localization tables of the numbers of the section, see get_number_translation
+    translation = None
+    formatter = GeneralFormatter()
 
     def configure(self):
-        if self.fc.neg_part == self.part:
-            self.remove_sign = True
+        self.translation = get_number_translation(self.part.language_id, self.part.number_system)
+        self.configure_siblings()
+
+    def configure_siblings(self):
+        self.remove_sign = self.fc.neg_part == self.part
+        self.formatter = GeneralFormatter(strip_sign=self.remove_sign)
+        if self.translation is not None:
+            self.formatter = LocalizedFormatter(self.formatter, self.translation[0])
+
+    def siblings_key(self):
+        return self.fc.neg_part == self.part
 
     def format(self, v):
-        if isinstance(v, Decimal):
-            if self.remove_sign:
-                v = abs(v)
-            return text_type(v)
-        else:
-            return v
+        # Numbers read as text are numbers as well
+        if type(v) in (int, float) or isinstance(v, Decimal) or isinstance(v, string_types) and is_number_string(v):
+            return self.formatter(v)
+        return v
 
 
 class DigitHandler(BaseHandler):
@@ -62,160 +121,135 @@ class DigitHandler(BaseHandler):
     fraction_divisor_size = None
     e_base = None
     divisor = 1.0
+    # Values are multiplied by 10 ** scale, the divisor as a power of ten
+    scale = 0
     left_mask = None
     right_mask = None
     zero_mask = None
     extension_mask = None
+    strip_sign = False
+    has_zero_part = False
+    zero_tokens = None
+    # Placeholders and strings of a fraction section, see prepare_fraction
+    fraction = None
+    # Localization tables of the numbers of the section, see get_number_translation
+    translation = None
+    formatter = None
 
     def format(self, value):
-        
-        if not isinstance(value, str):
-            value = str(value)
-        original_value = value
-
-        if len(self.right_mask.tokens) == 0:
-            value = round(value, decimals=0, type=str)
-
-        if self.fc.neg_part.tokens:
-            value = value.strip('-')
-       
-        if value == '0' and self.part.fc.else_part.tokens:           
-            new_value_array = []
-            next_value = iter(self.zero_mask.tokens)
-            for index, token in enumerate(self.zero_mask.tokens):
-                if token.value == '?' and next(next_value).value == '?' and len(new_value_array) < len(self.zero_mask.tokens):
-                    new_value_array.append('  ')
-                elif token.value == '#' or token.value == '?':
-                    pass
-                else:
-                    new_value_array.append(token.value)
-        elif self.part.fc.pos_part is not None:
-            left_value = value.split(".")[0]
-            left_token_count: int = len(left_value)
-            
-            if [token for token in self.left_mask.tokens if token.value == ',']:
-                left_value_array = list('{:,}'.format(int(left_value)))
-                left_value_array_static = list('{:,}'.format(int(left_value)))
+        return self.formatter(value)
+
+    def format_many(self, values):
+        many = getattr(self.formatter, 'many', None)
+        if many is None:
+            return super(DigitHandler, self).format_many(values)
+        return many(values)
+
+    def compile(self):
+        """
+        Specialized formatter of the configured masks.
+
+        Everything depending only on the masks is decided here, once, the formatter only does the
+        work depending on the value. The output is the same as formatting the masks token by token.
+
+        :rtype: (str | float | int | Decimal) -> str
+        """
+        no_right = not self.right_mask.tokens
+        scale = self.scale
+        strip_sign = self.strip_sign
+        has_zero_part = self.has_zero_part
+        zero_array = self.compile_zero_array() if has_zero_part else None
+
+        left_tokens = self.left_mask.tokens
+        # Commas only scaling the value do not group the digits
+        has_comma = self.by_thousand and any(token.type == Mask.COMMA for token in left_tokens)
+        place = compile_placement(left_tokens, has_comma)
+
+        if self.fraction is not None:
+            numerator, denominator, divisor, prefix, suffix = self.fraction
+            return FractionFormatter(place, numerator, denominator, divisor, prefix, suffix,
+                                     mixed=any(token.type == Mask.PH for token in left_tokens), scale=scale,
+                                     strip_sign=strip_sign,
+                                     zero_line=no_negative_zero(zero_array) if has_zero_part else None)
+
+        if self.e_base is not None:
+            exponent_sign, exponent, suffix = self.prepare_exponent()
+            right_tokens = self.right_mask.tokens
+            return ScientificFormatter(place, ''.join(token.value for token in left_tokens if token.type == Mask.PH),
+                                       decimals=''.join(token.value for token in right_tokens if token.type == Mask.PH),
+                                       dot=DotDelimiter in self.part.unique_tokens,
+                                       decimal_suffix=''.join(token.value for token in right_tokens
+                                                              if token.type == Mask.STRING),
+                                       exponent_sign=exponent_sign, exponent=exponent, suffix=suffix, scale=scale,
+                                       strip_sign=strip_sign,
+                                       zero_line=no_negative_zero(zero_array) if has_zero_part else None)
+
+        # Only the last rounding token of the right mask decides the digits, strings after it are appended
+        right_decimals = None
+        right_suffix = []
+        for index, token in enumerate(self.right_mask.tokens, 1):
+            if token.type == Mask.STRING and token.value != '  ':
+                right_suffix.append(token.value)
+            elif token.value in PADDING_VALUES:
+                right_suffix.append('  ')
             else:
-                left_value_array = list(left_value)
-                left_value_array_static =  list(left_value)
-            
-            new_left_value_array = []
-            counter:int = len(left_value_array) - 1
-            pos_counter:int = 0
-            for index, token in reversed(list(enumerate(self.left_mask.tokens))):
-                if token.value == '  ' or token.value == ' )' or token.value == ' -':
-                    token.value = ' '
-                if token.type == 1 and token.value:
-                    for char in left_value_array_static:
-                        try:
-                            new_left_value_array.append(left_value_array.pop())
-                        except:
-                            pass
-                        counter -= 1
-                    if index == len(self.left_mask.tokens) - 1:
-                        new_left_value_array.insert(0, token.value[::-1])
-                    else:
-                        new_left_value_array.append(token.value[::-1])
-                elif token.type == 2:
-                    if len(left_value_array) == 0 and token.value != '#' and counter >= 0:
-                        new_left_value_array.append(token.value)
-                    elif counter >= 0 and token.value != '?' and left_value != '0':
-                        new_left_value_array.append(left_value_array.pop())
-                        counter -= 1
-                    elif left_value == '0' and [token for token in self.left_mask.tokens if token.value == '0'] and token.value == '0':
-                        try:
-                            new_left_value_array.append(left_value_array.pop())
-                        except:
-                            pass
-                        counter -= 1
-                    elif token.value == '0' and len(value.split(".")[0]) < len([token for token in self.left_mask.tokens if "0" in token.value]):
-                        new_left_value_array.append(token.value)
-                        counter -= 1
-                    elif token.value == '?':
-                        new_left_value_array.append(' ')
-                        counter -= 1
-
-            
-            for char in left_value_array:
-                if counter >= 0:
-                    if self.left_mask.tokens != []:
-                        if not '0' in self.left_mask.tokens and float(''.join([s for s in left_value.strip('-') .split() if s.isdigit()])) == 0:
-                            pass
-                        else:
-                            new_left_value_array.append(left_value_array[counter])
-                            counter -= 1
-                    else:
-                        new_left_value_array.append(left_value_array[counter])
-                        counter -= 1
-
-            new_left_value = ''.join(new_left_value_array)[::-1]
-
-            # Right part
-            new_value_array = [new_left_value]
-            right_token_count: int = 0
-            if len(self.right_mask.tokens) > 0:
-                try:
-                    right_value = value.split(".")[1]
-                except:
-                    right_value = ''
-                last_token = [token for token in reversed(self.right_mask.tokens) if token.type == 2]
-
-                for index, token in enumerate(self.right_mask.tokens):
-                    right_token_count += 1
-                    if token.type == 2 and right_token_count > len(right_value):
-                        right_value = round(value, decimals=right_token_count, type=str).split(".")[1]
-                    if token.type == 1 and token.value != '  ':
-                        if '-' not in original_value:
-                            right_value += token.value.strip(')')
-                        else:
-                            right_value += token.value
-                    else:
-                        if token.value == '  '  or token.value == ' )' or token.value == ' -':
-                            right_value = right_value + '  '
-                        else:
-                            right_value = round(value, decimals=right_token_count, type=str).split(".")[1]
-                new_value_array.append('.')
-                new_value_array.append(right_value)
-
-        if self.extension_mask.tokens != []:
-            if '.' in original_value:
-                fraction = str(Fraction(float( "0." + original_value.split(".")[1])).limit_denominator())               
+                right_decimals = index
+                right_suffix = []
+        right_suffix_plain = ''.join(value if value == '  ' else value.strip(')') for value in right_suffix)
+        right_suffix_signed = ''.join(right_suffix)
+        # Trailing zeros of the decimals are spaces in "?" placeholders
+        right_placeholders = ''.join(token.value for token in self.right_mask.tokens if token.type == Mask.PH)
+        place_decimals = compile_decimals(right_placeholders) if '?' in right_placeholders else None
+
+        def formatter(value):
+            number = decompose(value)
+            original_value = value = fixed_string(number, None, scale)
+
+            if no_right:
+                value = fixed_string(number, 0, scale)
+
+            if strip_sign:
+                value = value.strip('-')
+
+            if has_zero_part and value == '0':
+                new_value_array = list(zero_array)
             else:
-                fraction = ''
-            for index, token in enumerate(self.extension_mask):
-                if token.value == '?' and len(fraction) < len(self.extension_mask) - 1:
-                    new_value_array.append(' ')
-                elif token.value == '/' and '.' in original_value:
-                    new_value_array.append(fraction)
-            if not '.' in original_value:
-                new_value_array.append('   ')
+                sign = '-' if value[:1] == '-' else ''
+                if right_decimals is not None:
+                    # The value is rounded once, carry included
+                    _, left_value, right_value = round_fixed(number, right_decimals, scale)
+                else:
+                    left_value, _, right_value = value.lstrip('-').partition('.')
+                # A zero integer part has no digits
+                new_value_array = [sign + place('' if left_value == '0' else left_value)]
 
-        try:
-            if float(''.join([s for s in ''.join(new_value_array).strip('-').split() if s.isdigit() or s == '.'])) == 0:
-                if '-0' in ''.join(new_value_array): 
-                    for index, token in enumerate(new_value_array):
-                        new_value_array.pop(index)
-                        token = token.removeprefix('-')
-                        new_value_array.insert(index, token)
-        except ValueError:
-            pass
+                if not no_right:
+                    if place_decimals is not None:
+                        right_value = place_decimals(right_value)
+                    right_value += right_suffix_signed if '-' in original_value else right_suffix_plain
+                    new_value_array.append('.')
+                    new_value_array.append(right_value)
+
+            return no_negative_zero(new_value_array)
 
-        token_count: int = 0
-        if self.part.currency is not None and self.part.currency != '':
-            if len([token for token in self.part.tokens if isinstance(token, LocaleCurrencyToken)]) == 0:
-                # find out where the currency is ment to go
-                for token in self.part.tokens:
-                    
-                    if isinstance(token, LocaleCurrencyToken):
-                        if token_count == len(self.part.tokens) - 2:
-                            return ''.join(new_value_array.append(self.part.currency))
-                        if token_count == 1:
-                            return ''.join(new_value_array.insert(0, self.part.currency))
-                    token_count += 1
+        return formatter
 
-        return ''.join(new_value_array)
+    def compile_zero_array(self):
+        """
+        Output of the zero section, the same for every zero.
 
+        :rtype: list[str]
+        """
+        new_value_array = []
+        next_value = iter(self.zero_mask.tokens)
+        for token in self.zero_mask.tokens:
+            if token.value == '?' and next(next_value).value == '?' and len(new_value_array) < len(self.zero_mask):
+                new_value_array.append('  ')
+            elif token.value == '#' or token.value == '?':
+                pass
+            else:
+                new_value_array.append(token.value)
+        return new_value_array
 
     def split_format(self):
         if DotDelimiter in self.part.unique_tokens:
@@ -243,6 +277,57 @@ class DigitHandler(BaseHandler):
         else:
             return self.tokens, []
 
+    def prepare_fraction(self, tokens):
+        """
+        Placeholders and strings of the fraction after the integer part.
+
+        :type tokens: list[formatcode.lexer.tokens.Token]
+        :return: Placeholders of the numerator and of the denominator, fixed denominator, strings
+            before the numerator and after the denominator
+        :rtype: (str, str, int | None, str, str)
+        """
+        numerator, denominator, prefix, suffix = [], [], [], []
+        slash = None
+        for token in tokens:
+            if isinstance(token, SlashSymbol) and slash is None:
+                slash = token
+            elif isinstance(token, DigitToken) and not suffix:
+                (numerator if slash is None else denominator).append(token.value)
+            else:
+                (prefix if slash is None else suffix).append(token)
+
+        divisor = slash.value or None
+        if slash.value == 0:
+            # Zeros after the slash are read as a divisor, as wide as the numerator
+            denominator = ['0'] * max(len(numerator), 1)
+        elif not divisor and not denominator:
+            denominator = ['?']
+        return (''.join(numerator), ''.join(denominator), divisor, self.prepare_line(prefix),
+                self.prepare_line(suffix))
+
+    def prepare_exponent(self):
+        """
+        Sign, placeholders and strings of the exponent.
+
+        :return: ``+`` or ``-``, placeholders, strings after the exponent
+        :rtype: (str, str, str)
+        """
+        tokens = self.extension_mask.tokens
+        placeholders = ''.join(token.value for token in tokens[1:]
+                               if token.type in (Mask.PH, Mask.E) and token.value in ('0', '#', '?'))
+        suffix = ''.join(token.value for token in tokens[1:] if token.type == Mask.STRING)
+        return tokens[0].value, placeholders, suffix
+
+    def prepare_line(self, tokens):
+        """
+        Output of tokens without placeholders.
+
+        :type tokens: list[formatcode.lexer.tokens.Token]
+        :rtype: str
+        """
+        return ''.join(' ' if token.value in PADDING_VALUES else token.value
+                       for token in self.prepare_left_mask(tokens).tokens if token.type == Mask.STRING)
+
     def get_last_digit_token_idx(self, tokens):
         for idx, token in enumerate(reversed(tokens), 1):
             if isinstance(token, DigitToken):
@@ -305,7 +390,20 @@ class DigitHandler(BaseHandler):
                 pass
             else:
                 IllegalPartToken(self.tokens)
-        return mask
+        return self.freeze_mask(mask)
+
+    def freeze_mask(self, mask):
+        """
+        Frozen mask, with its strings written so that the localization of the output gives them back.
+
+        :type mask: Mask
+        :rtype: Mask
+        """
+        if self.translation is not None:
+            inverse = self.translation[1]
+            mask.tokens = [MaskToken(token.value.translate(inverse), token.type) if token.type == Mask.STRING else token
+                           for token in mask.tokens]
+        return mask.freeze()
 
     def prepare_zero_mask(self, tokens):
         mask = Mask()
@@ -337,7 +435,7 @@ class DigitHandler(BaseHandler):
                 pass
             else:
                 IllegalPartToken(self.tokens)
-        return mask
+        return self.freeze_mask(mask)
 
     def prepare_right_masks(self, tokens):
         current_mask = mask = Mask()
@@ -350,6 +448,9 @@ class DigitHandler(BaseHandler):
             elif isinstance(token, SlashSymbol) and next(next_token).value == '?':
                 current_mask = extension_mask
                 current_mask.add('/', current_mask.SLASH)
+            elif isinstance(token, QToken) and current_mask is mask and DotDelimiter in self.part.unique_tokens:
+                # A decimal placeholder
+                current_mask.add(token.value, current_mask.PH)
             elif isinstance(token, QToken):
                 current_mask = extension_mask
                 current_mask.add(token.value, current_mask.E)
@@ -376,14 +477,16 @@ class DigitHandler(BaseHandler):
                 current_mask.add(token.value, current_mask.STRING)
             else:
                 IllegalPartToken(self.tokens)
-        return mask, extension_mask
+        return self.freeze_mask(mask), self.freeze_mask(extension_mask)
 
     def configure(self):
+        self.translation = get_number_translation(self.part.language_id, self.part.number_system)
         left, right = self.split_format()
 
         if PercentageSymbol in self.part.unique_tokens:
             n = self.part.token_types.count(PercentageSymbol)
             self.divisor /= (100 ** n)
+            self.scale += 2 * n
 
         if CommaDelimiter in self.part.unique_tokens:
             if SlashSymbol not in self.part.unique_tokens:
@@ -397,6 +500,7 @@ class DigitHandler(BaseHandler):
                 for token_type in token_types[last_digit_token_idx + 1:]:
                     if token_type == CommaDelimiter:
                         self.divisor *= 1000
+                        self.scale -= 3
                     else:
                         break
                 self.by_thousand = CommaDelimiter in token_types[:last_digit_token_idx]
@@ -407,40 +511,158 @@ class DigitHandler(BaseHandler):
             self.e_base = sum(isinstance(t, DigitToken) for t in left)
 
         self.prepare_fraction_attributes(right)
+        if SlashSymbol in self.part.unique_tokens and not {DotDelimiter, EToken} & self.part.unique_tokens:
+            self.fraction = self.prepare_fraction(right)
         self.left_mask = self.prepare_left_mask(left)
         self.right_mask, self.extension_mask = self.prepare_right_masks(right)
-        self.zero_mask = self.prepare_zero_mask(self.part.fc.else_part.tokens)
+        self.configure_siblings()
+
+    def configure_siblings(self):
+        self.strip_sign = bool(self.fc.neg_part.tokens)
+        self.has_zero_part = bool(self.fc.else_part.tokens)
+        # Kept for its id in siblings_key
+        self.zero_tokens = self.fc.else_part.tokens
+        self.zero_mask = self.prepare_zero_mask(self.zero_tokens)
+        self.kernel = classify(self)
+        self.formatter = self.compile()
+        if self.kernel != 'digits':
+            self.formatter = compile_kernel(self, self.kernel, self.formatter)
+        if self.translation is not None:
+            self.formatter = LocalizedFormatter(self.formatter, self.translation[0])
+
+    def siblings_key(self):
+        return bool(self.fc.neg_part.tokens), id(self.fc.else_part.tokens)
 
 
 class StringHandler(BaseHandler):
-    def format(self, v):
-        line = []
+    kernel = 'text'
+    # Text around the @ symbols
+    pieces = ()
+
+    def configure(self):
+        pieces = ['']
         for token in self.tokens:
             if isinstance(token, AtSymbol):
-                line.append(v)
+                pieces.append('')
             elif isinstance(token, LocaleCurrencyToken):
-                line.append(self.part.currency)
+                pieces[-1] += self.part.currency
             else:
-                line.append(token.value)
-        return ''.join(line)
+                pieces[-1] += token.value
+        self.pieces = tuple(pieces)
+        if len(self.pieces) == 1:
+            self.kernel = 'constant'
+        super(StringHandler, self).configure()
+
+    def format(self, v):
+        if len(self.pieces) == 1:
+            return self.pieces[0]
+        return text_type.join(v, self.pieces)
 
 
 class DateHandler(BaseHandler):
-    pass
+    kernel = 'date'
+    formatter = None
+    date_system = DATE_1900
+
+    def configure(self):
+        self.formatter = DateTimeFormatter(self.tokens)
+        self.date_system = get_date_system(self.fc.date1904)
+        super(DateHandler, self).configure()
+
+    def format(self, v):
+        # Numbers are serials of the date system of the format code
+        if type(v) in (int, float) or isinstance(v, Decimal) or isinstance(v, string_types) and is_number_string(v):
+            return self.format_serial(v)
+        try:
+            fields = temporal_fields(v, self.date_system)
+        except ValueError:
+            # NaT
+            return OUT_OF_RANGE
+        if fields is not None:
+            return self.formatter.format_fields(fields)
+        # Durations are serials as well, without float conversion
+        if isinstance(v, timedelta):
+            negative, units = timedelta_units(v, self.formatter.precision)
+            if negative and units:
+                return OUT_OF_RANGE
+            try:
+                fields = self.date_system.units_fields(units, self.formatter.precision)
+            except ValueError:
+                return OUT_OF_RANGE
+            return self.formatter.format_fields(fields)
+        return super(DateHandler, self).format(v)
+
+    def format_serial(self, v):
+        """
+        Format a serial, negative, non-finite and too large serials are shown as ``OUT_OF_RANGE``.
+
+        :type v: int | float | Decimal | str
+        :rtype: str
+        """
+        try:
+            fields = self.date_system.fields(v, self.formatter.precision)
+        except ValueError:
+            return OUT_OF_RANGE
+        return self.formatter.format_fields(fields)
+
+    def format_many(self, values):
+        format = self.format
+        format_serial = self.format_serial
+        return [format_serial(value) if type(value) in (int, float) else format(value) for value in values]
 
 
 class TimeDeltaHandler(BaseHandler):
-    pass
+    kernel = 'elapsed'
+    strip_sign = False
+    formatter = None
+
+    def configure_siblings(self):
+        self.strip_sign = self.fc.neg_part == self.part
+        self.formatter = ElapsedTimeFormatter(self.tokens, strip_sign=self.strip_sign)
+
+    def siblings_key(self):
+        return self.fc.neg_part == self.part
+
+    def format(self, v):
+        # Numbers are durations in days
+        if type(v) in (int, float) or isinstance(v, (Decimal, timedelta)) \
+                or isinstance(v, string_types) and is_number_string(v):
+            try:
+                return self.formatter(v)
+            except ValueError:
+                # Infinite or not a number
+                return OUT_OF_RANGE
+        return super(TimeDeltaHandler, self).format(v)
+
+    def format_many(self, values):
+        many = self.formatter.many
+        if all(type(value) in (int, float) or isinstance(value, timedelta) for value in values):
+            try:
+                return many(values)
+            except ValueError:
+                pass
+        return super(TimeDeltaHandler, self).format_many(values)
 
 
 class EmptyHandler(BaseHandler):
+    kernel = 'constant'
+
     def format(self, v):
         return self.part.currency
 
 
 class UnknownHandler(BaseHandler):
+    is_str_part = False
+
+    def configure_siblings(self):
+        self.is_str_part = self.fc.str_part == self.part
+        self.kernel = 'text' if self.is_str_part else 'constant'
+
+    def siblings_key(self):
+        return self.fc.str_part == self.part
+
     def format(self, v):
-        if self.fc.str_part == self.part:
+        if self.is_str_part:
             return v
         else:
             return '###'
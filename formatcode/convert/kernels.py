@@ -0,0 +1,177 @@
+# coding: utf-8
+
+"""
+Static analysis of configured digit sections.
+
+Common sections are formatted by a kernel specialized for their shape instead of the general
+formatter of ``DigitHandler``. Kernels give the same output as the general formatter.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+import re
+from decimal import Decimal
+
+from formatcode.convert.mask import Mask
+from formatcode.convert.placement import PADDING_VALUES, group_thousands
+from formatcode.convert.rounding import DecimalRounding, decompose, round_fixed
+
+
+def no_negative_zero(pieces):
+    """
+    Join the formatted pieces, without the sign of a negative zero.
+
+    :type pieces: list[str]
+    :rtype: str
+    """
+    line = ''.join(pieces)
+    if '-0' in line:
+        try:
+            if float(''.join([s for s in line.strip('-').split() if s.isdigit() or s == '.'])) == 0:
+                line = ''.join([piece.removeprefix('-') for piece in pieces])
+        except ValueError:
+            pass
+    return line
+
+
+def split_affixes(tokens):
+    """
+    Placeholders of the mask with a single string before and after them.
+
+    :type tokens: list[formatcode.convert.mask.MaskToken]
+    :rtype: (str, list[formatcode.convert.mask.MaskToken], str) | None
+    """
+    prefix = suffix = ''
+    if tokens and tokens[0].type == Mask.STRING:
+        prefix, tokens = tokens[0].value, tokens[1:]
+    if tokens and tokens[-1].type == Mask.STRING:
+        suffix, tokens = tokens[-1].value, tokens[:-1]
+    if not tokens or any(token.type not in (Mask.PH, Mask.COMMA) for token in tokens):
+        return None
+    return prefix, tokens, suffix
+
+
+def classify(handler):
+    """
+    Name of the kernel for the configured digit handler, ``'digits'`` for the general formatter.
+
+    :type handler: formatcode.convert.handlers.DigitHandler
+    :rtype: str
+    """
+    if handler.fraction is not None:
+        return 'fraction'
+
+    if handler.e_base is not None:
+        return 'scientific'
+
+    if handler.extension_mask.tokens:
+        return 'digits'
+
+    if not handler.right_mask.tokens and handler.has_zero_part and handler.part is handler.fc.else_part:
+        return 'constant'
+
+    left = split_affixes(handler.left_mask.tokens)
+    if left is None:
+        return 'digits'
+    prefix, tokens, suffix = left
+    placeholders = ''.join(token.value for token in tokens if token.type == Mask.PH)
+    if not re.match(r'#*0$', placeholders):
+        return 'digits'
+
+    right_tokens = handler.right_mask.tokens
+    if right_tokens:
+        if suffix:
+            return 'digits'
+        right_suffix = ''
+        if right_tokens[-1].type == Mask.STRING:
+            right_suffix, right_tokens = right_tokens[-1].value, right_tokens[:-1]
+        if not right_tokens or any(token.type != Mask.PH or token.value == '?' for token in right_tokens):
+            return 'digits'
+        suffix = right_suffix
+
+    if suffix.strip() == '%':
+        return 'percent'
+    return 'fixed' if right_tokens else 'integer'
+
+
+def compile_kernel(handler, name, general):
+    """
+    Formatter of the kernel, ``general`` formats the values the kernel does not cover.
+
+    :type handler: formatcode.convert.handlers.DigitHandler
+    :type name: str
+    :rtype: (str | float | int | Decimal) -> str
+    """
+    scale = handler.scale
+    strip_sign = handler.strip_sign
+    has_zero_part = handler.has_zero_part
+    zero_line = no_negative_zero(handler.compile_zero_array()) if has_zero_part else None
+
+    if name in ('fraction', 'scientific'):
+        # Compiled by FractionFormatter and ScientificFormatter
+        return general
+
+    if name == 'constant':
+        def constant(value):
+            if type(value) in (int, float) and value == 0 and (strip_sign or str(value)[0] != '-'):
+                return zero_line
+            return general(value)
+
+        return constant
+
+    prefix, tokens, suffix = split_affixes(handler.left_mask.tokens)
+    prefix = ' ' if prefix in PADDING_VALUES else prefix
+    suffix = ' ' if suffix in PADDING_VALUES else suffix
+    grouped = handler.by_thousand and any(token.type == Mask.COMMA for token in tokens)
+    decimals = len(handler.right_mask.tokens)
+
+    if not decimals:
+        round_decimal = DecimalRounding(0, scale)
+
+        def integer(value):
+            if isinstance(value, Decimal) and value.is_finite():
+                sign, digits, _ = round_decimal(value)
+            else:
+                sign, digits, _ = round_fixed(decompose(value), 0, scale)
+            if has_zero_part and digits == '0' and (strip_sign or not sign):
+                return zero_line
+            if strip_sign:
+                sign = ''
+            return no_negative_zero([prefix + sign + (group_thousands(digits) if grouped else digits) + suffix])
+
+        return integer
+
+    right_tokens = handler.right_mask.tokens
+    if right_tokens[-1].type == Mask.STRING:
+        decimals -= 1
+        right_suffix = right_tokens[-1].value
+        if right_suffix == '  ':
+            signed_suffix = plain_suffix = right_suffix
+        else:
+            signed_suffix, plain_suffix = right_suffix, right_suffix.strip(')')
+    else:
+        signed_suffix = plain_suffix = ''
+
+    round_decimal = DecimalRounding(decimals, scale)
+
+    def fixed(value):
+        if isinstance(value, Decimal) and value.is_finite():
+            negative = value.is_signed()
+            # The exponent of a zero is its adjusted exponent
+            plain_zero = value.is_zero() and value.adjusted() + scale >= 0
+            _, left_value, right_value = round_decimal(value)
+        else:
+            number = negative, coefficient, exponent = decompose(value)
+            plain_zero = not coefficient and exponent + scale >= 0
+            _, left_value, right_value = round_fixed(number, decimals, scale)
+
+        sign = '-' if negative and not strip_sign else ''
+        if has_zero_part and plain_zero and not sign:
+            # Formatted as a plain "0"
+            return zero_line
+
+        left_value = prefix + sign + (group_thousands(left_value) if grouped else left_value)
+        right_value += signed_suffix if negative else plain_suffix
+        return no_negative_zero([left_value, '.', right_value])
+
+    return fixed
@@ -0,0 +1,315 @@
+# coding: utf-8
+
+"""
+Built-in locale tables, keyed by the language id (LCID) of ``[$-409]``-style tokens.
+
+Tables are selected once when a section is compiled, formatting never reads or changes the
+locale of the process. Numbers are localized by a single ``str.translate`` of the output.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+from collections import namedtuple
+
+# Names of the months from index 1, of the days from Monday, and the AM/PM designators. Months
+# are written in the genitive after a day number in some languages.
+DateNames = namedtuple('DateNames', ('months', 'month_abbreviations', 'days', 'day_abbreviations', 'am', 'pm',
+                                     'genitive_months'))
+
+
+def date_names(months, month_abbreviations, days, day_abbreviations, am='AM', pm='PM', genitive_months=None):
+    """
+    :type months: str
+    :type month_abbreviations: str
+    :type days: str
+    :type day_abbreviations: str
+    :param str genitive_months: Months after a day number, the same as ``months`` if None
+    :rtype: DateNames
+    """
+    months = ('',) + tuple(months.split())
+    return DateNames(months, ('',) + tuple(month_abbreviations.split()), tuple(days.split()),
+                     tuple(day_abbreviations.split()), am, pm,
+                     ('',) + tuple(genitive_months.split()) if genitive_months else months)
+
+
+ENGLISH = date_names(
+    'January February March April May June July August September October November December',
+    'Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec',
+    'Monday Tuesday Wednesday Thursday Friday Saturday Sunday',
+    'Mon Tue Wed Thu Fri Sat Sun',
+)
+
+# Date names by primary language id, the low 10 bits of a language id
+DATE_NAMES = {
+    # English
+    0x09: ENGLISH,
+    # German
+    0x07: date_names(
+        'Januar Februar März April Mai Juni Juli August September Oktober November Dezember',
+        'Jan Feb Mär Apr Mai Jun Jul Aug Sep Okt Nov Dez',
+        'Montag Dienstag Mittwoch Donnerstag Freitag Samstag Sonntag',
+        'Mo Di Mi Do Fr Sa So',
+    ),
+    # French
+    0x0C: date_names(
+        'janvier février mars avril mai juin juillet août septembre octobre novembre décembre',
+        'janv. févr. mars avr. mai juin juil. août sept. oct. nov. déc.',
+        'lundi mardi mercredi jeudi vendredi samedi dimanche',
+        'lun. mar. mer. jeu. ven. sam. dim.',
+    ),
+    # Spanish
+    0x0A: date_names(
+        'enero febrero marzo abril mayo junio julio agosto septiembre octubre noviembre diciembre',
+        'ene feb mar abr may jun jul ago sep oct nov dic',
+        'lunes martes miércoles jueves viernes sábado domingo',
+        'lun mar mié jue vie sáb dom',
+        'a. m.', 'p. m.',
+    ),
+    # Italian
+    0x10: date_names(
+        'gennaio febbraio marzo aprile maggio giugno luglio agosto settembre ottobre novembre dicembre',
+        'gen feb mar apr mag giu lug ago set ott nov dic',
+        'lunedì martedì mercoledì giovedì venerdì sabato domenica',
+        'lun mar mer gio ven sab dom',
+    ),
+    # Portuguese
+    0x16: date_names(
+        'janeiro fevereiro março abril maio junho julho agosto setembro outubro novembro dezembro',
+        'jan fev mar abr mai jun jul ago set out nov dez',
+        'segunda-feira terça-feira quarta-feira quinta-feira sexta-feira sábado domingo',
+        'seg ter qua qui sex sáb dom',
+    ),
+    # Dutch
+    0x13: date_names(
+        'januari februari maart april mei juni juli augustus september oktober november december',
+        'jan feb mrt apr mei jun jul aug sep okt nov dec',
+        'maandag dinsdag woensdag donderdag vrijdag zaterdag zondag',
+        'ma di wo do vr za zo',
+    ),
+    # Swedish
+    0x1D: date_names(
+        'januari februari mars april maj juni juli augusti september oktober november december',
+        'jan feb mar apr maj jun jul aug sep okt nov dec',
+        'måndag tisdag onsdag torsdag fredag lördag söndag',
+        'mån tis ons tor fre lör sön',
+        'fm', 'em',
+    ),
+    # Polish
+    0x15: date_names(
+        'styczeń luty marzec kwiecień maj czerwiec lipiec sierpień wrzesień październik listopad grudzień',
+        'sty lut mar kwi maj cze lip sie wrz paź lis gru',
+        'poniedziałek wtorek środa czwartek piątek sobota niedziela',
+        'pon wt śr czw pt sob niedz',
+        genitive_months='stycznia lutego marca kwietnia maja czerwca lipca sierpnia września października '
+                        'listopada grudnia',
+    ),
+    # Russian
+    0x19: date_names(
+        'Январь Февраль Март Апрель Май Июнь Июль Август Сентябрь Октябрь Ноябрь Декабрь',
+        'янв фев мар апр май июн июл авг сен окт ноя дек',
+        'понедельник вторник среда четверг пятница суббота воскресенье',
+        'Пн Вт Ср Чт Пт Сб Вс',
+        genitive_months='января февраля марта апреля мая июня июля августа сентября октября ноября декабря',
+    ),
+    # Japanese
+    0x11: date_names(
+        '1月 2月 3月 4月 5月 6月 7月 8月 9月 10月 11月 12月',
+        '1月 2月 3月 4月 5月 6月 7月 8月 9月 10月 11月 12月',
+        '月曜日 火曜日 水曜日 木曜日 金曜日 土曜日 日曜日',
+        '月 火 水 木 金 土 日',
+        '午前', '午後',
+    ),
+    # Chinese
+    0x04: date_names(
+        '一月 二月 三月 四月 五月 六月 七月 八月 九月 十月 十一月 十二月',
+        '1月 2月 3月 4月 5月 6月 7月 8月 9月 10月 11月 12月',
+        '星期一 星期二 星期三 星期四 星期五 星期六 星期日',
+        '周一 周二 周三 周四 周五 周六 周日',
+        '上午', '下午',
+    ),
+    # Korean
+    0x12: date_names(
+        '1월 2월 3월 4월 5월 6월 7월 8월 9월 10월 11월 12월',
+        '1 2 3 4 5 6 7 8 9 10 11 12',
+        '월요일 화요일 수요일 목요일 금요일 토요일 일요일',
+        '월 화 수 목 금 토 일',
+        '오전', '오후',
+    ),
+}
+
+# Date names of language ids that differ from their primary language
+LOCALE_DATE_NAMES = {
+    # zh-TW
+    0x404: DATE_NAMES[0x04]._replace(day_abbreviations=('週一', '週二', '週三', '週四', '週五', '週六', '週日')),
+}
+
+
+def get_date_names(language_id=None):
+    """
+    Date names of a language id, English if None or unknown.
+
+    :type language_id: int | None
+    :rtype: DateNames
+    """
+    if language_id is None:
+        return ENGLISH
+    names = LOCALE_DATE_NAMES.get(language_id)
+    if names is None:
+        names = DATE_NAMES.get(language_id & 0x3ff, ENGLISH)
+    return names
+
+
+# Decimal and grouping separators by primary language id, "." and "," for the other languages
+NUMBER_SEPARATORS = {
+    0x05: (',', '\xa0'),  # Czech
+    0x06: (',', '.'),  # Danish
+    0x07: (',', '.'),  # German
+    0x08: (',', '.'),  # Greek
+    0x0A: (',', '.'),  # Spanish
+    0x0B: (',', '\xa0'),  # Finnish
+    0x0C: (',', '\u202f'),  # French
+    0x0E: (',', '\xa0'),  # Hungarian
+    0x10: (',', '.'),  # Italian
+    0x13: (',', '.'),  # Dutch
+    0x14: (',', '\xa0'),  # Norwegian
+    0x15: (',', '\xa0'),  # Polish
+    0x16: (',', '.'),  # Portuguese
+    0x19: (',', '\xa0'),  # Russian
+    0x1D: (',', '\xa0'),  # Swedish
+    0x1F: (',', '.'),  # Turkish
+    0x22: (',', '\xa0'),  # Ukrainian
+}
+
+# Separators of language ids that differ from their primary language
+LOCALE_NUMBER_SEPARATORS = {
+    0x807: ('.', "'"),  # de-CH
+    0x80A: ('.', ','),  # es-MX
+    0x810: ('.', "'"),  # it-CH
+    0x816: (',', '\xa0'),  # pt-PT
+    0xC0C: (',', '\xa0'),  # fr-CA
+}
+
+# Code point of the zero of the native digits by number system, the high byte of a locale token
+DIGIT_ZEROS = {
+    0x02: 0x0660,  # Arabic-Indic
+    0x03: 0x06F0,  # Extended Arabic-Indic
+    0x04: 0x0966,  # Devanagari
+    0x05: 0x09E6,  # Bengali
+    0x06: 0x0A66,  # Gurmukhi
+    0x07: 0x0AE6,  # Gujarati
+    0x08: 0x0B66,  # Oriya
+    0x09: 0x0BE6,  # Tamil
+    0x0A: 0x0C66,  # Telugu
+    0x0B: 0x0CE6,  # Kannada
+    0x0C: 0x0D66,  # Malayalam
+    0x0D: 0x0E50,  # Thai
+    0x0E: 0x0ED0,  # Lao
+    0x0F: 0x0F20,  # Tibetan
+    0x10: 0x1040,  # Myanmar
+    0x12: 0x17E0,  # Khmer
+    0x13: 0x1810,  # Mongolian
+}
+
+# Separators written with Arabic digits
+ARABIC_SEPARATORS = ('\u066b', '\u066c')
+
+
+def get_number_translation(language_id=None, number_system=None):
+    """
+    Translation tables of the numbers of a section, None if numbers are written as they are.
+
+    The first table localizes the output: separators and digits. The mapping is completed into a
+    permutation of the characters it uses, the second table is its inverse. Literal text of the
+    section is written with the inverse table once, the localization gives it back unchanged.
+
+    :type language_id: int | None
+    :type number_system: int | None
+    :return: Tables for ``str.translate``, localization and its inverse
+    :rtype: (dict[int, str], dict[int, str]) | None
+    """
+    separators = ('.', ',')
+    if language_id is not None:
+        separators = LOCALE_NUMBER_SEPARATORS.get(language_id) or NUMBER_SEPARATORS.get(language_id & 0x3ff,
+                                                                                         separators)
+    mapping = dict(zip('.,', separators))
+    zero = DIGIT_ZEROS.get(number_system)
+    if zero is not None:
+        if zero in (DIGIT_ZEROS[0x02], DIGIT_ZEROS[0x03]):
+            mapping.update(zip('.,', ARABIC_SEPARATORS))
+        mapping.update((digit, chr(zero + int(digit))) for digit in '0123456789')
+
+    mapping = {key: value for key, value in mapping.items() if key != value}
+    if not mapping:
+        return None
+    # Characters of the output not in the input are mapped back to the ones left
+    mapping.update(zip(sorted(set(mapping.values()) - set(mapping)), sorted(set(mapping) - set(mapping.values()))))
+    return str.maketrans(mapping), str.maketrans({value: key for key, value in mapping.items()})
+
+
+# Replaced characters above which a single translate is faster than replacing them one by one
+MAX_REPLACED = 6
+# Character standing for the first one of a cycle while the others are replaced
+CYCLE_MARK = '\uffff'
+
+
+def compile_translation(table):
+    """
+    Function translating a line with the table.
+
+    ``str.translate`` looks up every character of the line, a few separators are replaced faster
+    by ``str.replace``: the permutation is split into cycles, each replaced from its end.
+
+    :param dict[int, str] table: Translation table, a permutation of its characters
+    :rtype: (str) -> str
+    """
+    mapping = {chr(key): value for key, value in table.items()}
+    if len(mapping) > MAX_REPLACED:
+        return lambda line: line.translate(table)
+
+    replacements = []
+    left = dict(mapping)
+    while left:
+        first, _ = left.popitem()
+        cycle = [first]
+        while mapping[cycle[-1]] != first:
+            cycle.append(mapping[cycle[-1]])
+            del left[cycle[-1]]
+        replacements.append((cycle[-1], CYCLE_MARK))
+        replacements.extend((old, new) for old, new in zip(cycle[-2::-1], cycle[:0:-1]))
+        replacements.append((CYCLE_MARK, first))
+
+    def translate(line):
+        for old, new in replacements:
+            line = line.replace(old, new)
+        return line
+
+    return translate
+
+
+class LocalizedFormatter(object):
+    """
+    Formatter of a section with localized numbers, the output of the section formatter is
+    translated once, see ``compile_translation``.
+    """
+
+    def __init__(self, formatter, table):
+        """
+        :param formatter: Formatter of the section, with a ``many`` method or not
+        :param dict[int, str] table: Localization table, see ``get_number_translation``
+        """
+        self.formatter = formatter
+        self.translate = compile_translation(table)
+
+    def __call__(self, value):
+        return self.translate(self.formatter(value))
+
+    def many(self, values):
+        """
+        :rtype: list[str]
+        """
+        translate = self.translate
+        many = getattr(self.formatter, 'many', None)
+        if many is None:
+            formatter = self.formatter
+            return [translate(formatter(value)) for value in values]
+        return [translate(line) for line in many(values)]
@@ -2,11 +2,9 @@
 
 from __future__ import division, print_function, unicode_literals
 
+from collections import namedtuple
 
-class MaskToken(object):
-    def __init__(self, value, value_type):
-        self.value = value
-        self.type = value_type
+MaskToken = namedtuple('MaskToken', ['value', 'type'])
 
 
 class Mask(object):
@@ -25,9 +23,18 @@ class Mask(object):
 
     def add(self, value, value_type):
         if self.tokens and value_type == self.STRING and self[-1].type == value_type:
-            self[-1].value += value
+            self.tokens[-1] = MaskToken(self[-1].value + value, value_type)
         else:
             self.tokens.append(MaskToken(value, value_type))
 
+    def freeze(self):
+        """
+        Make the tokens read-only, masks of configured handlers are shared between threads.
+
+        :rtype: Mask
+        """
+        self.tokens = tuple(self.tokens)
+        return self
+
     def __len__(self):
         return len(self.tokens)
@@ -3,12 +3,16 @@
 from __future__ import division, print_function, unicode_literals
 
 from abc import ABC, abstractmethod
+from copy import copy
 from decimal import Decimal
 from operator import eq, ge, gt, le, lt, ne
+from threading import Lock
 
 from six import iteritems
 
 from formatcode.base.utils import cached_property, is_digit
+from formatcode.convert.cache import CompileCache
+from formatcode.convert.dates import seconds_fraction_size
 from formatcode.convert.errors import (ConditionError, DateDigitError, DuplicateFractionFormat, GeneralFormatError,
                                        IllegalPartToken)
 from formatcode.convert.handlers import (DateHandler, DigitHandler, EmptyHandler, GeneralHandler, StringHandler,
@@ -19,8 +23,14 @@ from formatcode.lexer.tokens import (AtSymbol, ColorToken, ConditionToken, DateT
 
 common_tokens = {ColorToken, LocaleCurrencyToken}
 
+# Token types of the parts, shared by parts of the same types
+shared_token_types = CompileCache(max_entries=4096)
+# Held while a part of a lazy format code configures its handler
+configure_lock = Lock()
+
 
 class FormatPart(ABC):
+    configured = False
     color = None
     currency = ''
     language_id = None
@@ -35,8 +45,10 @@ class FormatPart(ABC):
         self.tokens = tokens
         self.fc = fc
 
-        self.token_types = [t.__class__ for t in self.tokens or []]
-        self.unique_tokens = set(self.token_types) - common_tokens
+        token_types = tuple(t.__class__ for t in self.tokens or [])
+        self.token_types = shared_token_types.get(token_types, lambda: token_types)
+        unique_tokens = frozenset(self.token_types) - common_tokens
+        self.unique_tokens = shared_token_types.get(unique_tokens, lambda: unique_tokens)
 
         if ColorToken in self.token_types:
             self.color = self.get_token_by_type(ColorToken).value
@@ -87,9 +99,107 @@ class FormatPart(ABC):
         else:
             return EmptyHandler
 
+    @cached_property
+    def is_temporal(self):
+        """
+        Whether the part formats dates or durations, other parts format durations as numbers of days.
+
+        :rtype: bool
+        """
+        return issubclass(self.handler_class, (DateHandler, TimeDeltaHandler))
+
     def format(self, value):
+        if not self.configured:
+            self.configure_once()
         return self.handler.format(value)
 
+    def format_many(self, values):
+        """
+        Format values of this part together.
+
+        :rtype: list[str]
+        """
+        if not self.configured:
+            self.configure_once()
+        return self.handler.format_many(values)
+
+    @property
+    def kernel(self):
+        """
+        Name of the formatter of the configured handler, see ``formatcode.convert.kernels``.
+
+        :rtype: str
+        """
+        if not self.configured:
+            self.configure_once()
+        return self.handler.kernel
+
+    def configure(self):
+        """
+        Configure the handler, or use the configured handler of a structurally identical part.
+
+        A new handler is configured each time, configuration is not repeatable on a handler and a
+        handler may be shared already.
+        """
+        handler = self.handler_class(part=self)
+
+        def configured():
+            handler.configure()
+            return handler
+
+        self.handler = self.fc.shared_handlers.get(handler.shared_key(), configured)
+        self.configured = True
+
+    def configure_once(self):
+        """
+        Configure the handler on first use, only once whichever thread gets there first.
+        """
+        with configure_lock:
+            if not self.configured:
+                self.configure()
+
+    def configure_siblings(self):
+        """
+        Configure what the handler depends on in the other parts again, keeping the rest.
+        """
+        handler = copy(self.handler)
+        handler.part = self
+        handler.fc = self.fc
+
+        def configured():
+            handler.configure_siblings()
+            return handler
+
+        self.handler = self.fc.shared_handlers.get(handler.shared_key(), configured)
+
+    def siblings_changed(self):
+        """
+        Whether what the configured handler depends on in the other parts differs in the format
+        code of this part, as for a part kept by an edit.
+
+        :rtype: bool
+        """
+        handler = copy(self.handler)
+        handler.part = self
+        handler.fc = self.fc
+        return handler.siblings_key() != self.handler.siblings_key()
+
+    def bind(self, fc):
+        """
+        Copy of the part for another format code, sharing its handler once configured.
+
+        :type fc: formatcode.convert.fc.FormatCode
+        :rtype: FormatPart
+        """
+        part = copy(self)
+        part.fc = fc
+        # The checker may depend on the other parts
+        part.__dict__.pop('checker', None)
+        if not part.configured:
+            # An unconfigured handler still refers to this part and its format code
+            part.handler = part.handler_class(part=part)
+        return part
+
 
 class DigitPart(FormatPart):
     handlers = {
@@ -100,15 +210,17 @@ class DigitPart(FormatPart):
     def validate(self):
         super(DigitPart, self).validate()
 
-        if DateTimeToken in self.unique_tokens \
-                and TimeDeltaToken not in self.unique_tokens \
-                and any(isinstance(t, DigitToken) for t in self.tokens):
+        # Digits of a date section are only the fraction of its seconds, as "ss.00", and its
+        # slashes separate its fields
+        is_date = DateTimeToken in self.unique_tokens and TimeDeltaToken not in self.unique_tokens
+        if is_date and any(isinstance(t, DigitToken) and not seconds_fraction_size(self.tokens, i)
+                           for i, t in enumerate(self.tokens)):
             raise DateDigitError(self.tokens)
 
-        if DotDelimiter in self.unique_tokens and SlashSymbol in self.unique_tokens:
+        if not is_date and DotDelimiter in self.unique_tokens and SlashSymbol in self.unique_tokens:
             raise DuplicateFractionFormat(self.tokens)
 
-        if SlashSymbol in self.unique_tokens:
+        if not is_date and SlashSymbol in self.unique_tokens:
             if DotDelimiter in self.unique_tokens or EToken in self.unique_tokens:
                 raise DuplicateFractionFormat(self.tokens)
 
@@ -128,9 +240,6 @@ class DigitPart(FormatPart):
     def check_value(self, v):
         return isinstance(v, Decimal) and self.checker(v)
 
-    def format(self, value):
-        return self.handler.format(value)
-
 
 class ConditionFreePart(FormatPart):
     def validate(self):
@@ -0,0 +1,135 @@
+# coding: utf-8
+
+"""
+Placement of the integer digits of a number in the left mask of a digit section.
+
+A left mask is compiled once into a template: the strings before, between and after its
+placeholders, and the padding of the placeholders left without a digit, for every count of
+digits. Digits are grouped by thousands from a table of the three-digit groups and the output is
+joined once, the digits are never placed one by one.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+from formatcode.convert.mask import Mask
+
+# Paddings formatted as a single space on the left and as two spaces on the right
+PADDING_VALUES = ('  ', ' )', ' -')
+# Three-digit groups, "000" to "999"
+GROUPS = tuple('%03d' % group for group in range(1000))
+# Output of a placeholder without a digit
+PADDINGS = {'0': '0', '#': '', '?': ' '}
+# Output of a thousands separator after a placeholder without a digit
+SEPARATORS = {'0': ',', '#': '', '?': ' '}
+
+
+def group_thousands(digits):
+    """
+    Integer digits with a comma between each group of three.
+
+    :type digits: str
+    :rtype: str
+    """
+    if len(digits) < 4:
+        return digits
+    coefficient = int(digits)
+    groups = []
+    while coefficient >= 1000:
+        coefficient, group = divmod(coefficient, 1000)
+        groups.append(GROUPS[group])
+    groups.append(str(coefficient))
+    groups.reverse()
+    return ','.join(groups)
+
+
+def compile_placement(tokens, grouped=False):
+    """
+    Formatter of the integer digits in the left mask.
+
+    Digits fill the placeholders from the right, the digits left over go to the first placeholder.
+    Placeholders without a digit are formatted as ``0``, a space for ``?`` or nothing for ``#``.
+    Strings of the mask are kept where they are.
+
+    :param tokens: Tokens of the left mask
+    :type tokens: tuple[formatcode.convert.mask.MaskToken]
+    :param bool grouped: Separate the thousands with commas
+    :return: Formatter of the digits without sign, an empty string for a zero integer part
+    :rtype: (str) -> str
+    """
+    placeholders = []
+    # Strings of the mask with the number of placeholders to their right
+    strings = []
+    for token in tokens:
+        if token.type == Mask.PH:
+            placeholders.extend(token.value)
+        elif token.type == Mask.STRING and token.value:
+            strings.append((' ' if token.value in PADDING_VALUES else token.value, len(placeholders)))
+
+    size = len(placeholders)
+    prefix = ''.join(value for value, index in strings if index == 0)
+    suffix = ''.join(value for value, index in strings if index == size and size)
+    # Inner strings from the right, by their distance to the last placeholder
+    inner = tuple((value, size - index) for value, index in reversed(strings) if 0 < index < size)
+    # Padding of the placeholders left without a digit by the number of digits, placeholders are
+    # counted from the last one
+    paddings = [''] * (size + 1)
+    for position in range(size - 1, -1, -1):
+        placeholder = placeholders[size - 1 - position]
+        padding = PADDINGS[placeholder]
+        if grouped and position and not position % 3:
+            padding += SEPARATORS[placeholder]
+        paddings[position] = paddings[position + 1] + padding
+    paddings = tuple(paddings)
+
+    if not inner:
+        def place(digits):
+            count = len(digits)
+            return prefix + paddings[min(count, size)] + (group_thousands(digits) if grouped else digits) + suffix
+
+        return place
+
+    def place(digits):
+        count = len(digits)
+        body = paddings[min(count, size)] + (group_thousands(digits) if grouped else digits)
+        pieces = [suffix]
+        end = len(body)
+        for value, distance in inner:
+            if distance <= count:
+                # Digits and the separators between them
+                start = len(body) - distance - (grouped and (distance - 1) // 3)
+            else:
+                start = len(paddings[distance])
+            pieces.append(body[start:end])
+            pieces.append(value)
+            end = start
+        pieces.append(body[:end])
+        pieces.append(prefix)
+        pieces.reverse()
+        return ''.join(pieces)
+
+    return place
+
+
+def compile_decimals(placeholders):
+    """
+    Formatter of the fraction digits in the placeholders after the decimal point.
+
+    Trailing zeros in ``#`` placeholders are dropped, in ``?`` placeholders they are spaces.
+
+    :param str placeholders: Placeholders after the decimal point
+    :return: Formatter of as many digits as placeholders
+    :rtype: (str) -> str
+    """
+    # Digits up to the last "0" placeholder are always shown
+    shown = placeholders.rfind('0') + 1
+    size = len(placeholders)
+    if shown == size:
+        return lambda digits: digits
+    paddings = tuple(''.join(PADDINGS[placeholder] for placeholder in placeholders[length:])
+                     for length in range(size + 1))
+
+    def place(digits):
+        digits = digits[:shown] + digits[shown:].rstrip('0')
+        return digits + paddings[len(digits)]
+
+    return place
@@ -0,0 +1,171 @@
+# coding: utf-8
+
+"""
+Fractions of decimal numbers with a bounded or fixed denominator.
+
+Numbers are taken as exact ratios of integers from their decimal digits, the closest fraction is
+found with continued fractions in integer arithmetic.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+from math import gcd
+
+from formatcode.convert.kernels import no_negative_zero
+from formatcode.convert.mask import Mask, MaskToken
+from formatcode.convert.placement import compile_placement
+from formatcode.convert.rounding import decompose
+
+
+def limit_denominator(numerator, denominator, max_denominator):
+    """
+    Closest fraction to ``numerator / denominator`` with a denominator up to ``max_denominator``,
+    the one with the smaller denominator on a tie.
+
+    :type numerator: int
+    :type denominator: int
+    :type max_denominator: int
+    :return: Numerator and denominator, reduced
+    :rtype: (int, int)
+    """
+    divisor = gcd(numerator, denominator)
+    numerator //= divisor
+    denominator //= divisor
+    if denominator <= max_denominator:
+        return numerator, denominator
+
+    # Convergents p0/q0 and p1/q1 of the continued fraction
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    n, d = numerator, denominator
+    while True:
+        a = n // d
+        q2 = q0 + a * q1
+        if q2 > max_denominator:
+            break
+        p0, q0, p1, q1 = p1, q1, p0 + a * p1, q2
+        n, d = d, n - a * d
+
+    # Semiconvergent with the largest denominator allowed
+    k = (max_denominator - q0) // q1
+    p2, q2 = p0 + k * p1, q0 + k * q1
+    if abs(p1 * denominator - numerator * q1) * q2 <= abs(p2 * denominator - numerator * q2) * q1:
+        return p1, q1
+    return p2, q2
+
+
+class FractionFormatter(object):
+    """
+    Formatter of a fraction section, as ``# ?/?``, ``# ??/??`` or ``# ?/16``.
+
+    Compiled once per section. With placeholders for the integer part the fraction is mixed and
+    formatted as blanks when the fraction part is zero, otherwise the whole value is a fraction.
+    """
+
+    def __init__(self, place, numerator, denominator='', divisor=None, prefix='', suffix='', mixed=True, scale=0,
+                 strip_sign=False, zero_line=None):
+        """
+        :param place: Formatter of the integer digits in the left mask, see ``compile_placement``
+        :param str numerator: Placeholders of the numerator
+        :param str denominator: Placeholders of the denominator
+        :param int divisor: Fixed denominator
+        :param str prefix: Strings between the left mask and the numerator
+        :param str suffix: Strings after the denominator
+        :param bool mixed: Whether the integer part is formatted apart
+        :param int scale: Values are multiplied by ``10 ** scale``
+        :param bool strip_sign: Whether the sign is formatted by the section itself
+        :param str zero_line: Output for values formatted as zero
+        """
+        self.place = place
+        self.place_numerator = compile_placement(tuple(MaskToken(value, Mask.PH) for value in numerator))
+        self.divisor = divisor
+        # The denominator has as many digits as its placeholders, left aligned
+        self.max_denominator = 10 ** len(denominator) - 1
+        self.denominator_paddings = tuple(''.join(' ' for value in denominator[size:] if value == '?')
+                                          for size in range(len(denominator) + 1))
+        self.blank = ' ' * (len(numerator) + 1 + (len(str(divisor)) if divisor else len(denominator)))
+        self.prefix = prefix
+        self.suffix = suffix
+        self.mixed = mixed
+        self.scale = scale
+        self.strip_sign = strip_sign
+        self.zero_line = zero_line
+
+    def approximate(self, numerator, denominator):
+        """
+        Fraction of the section closest to ``numerator / denominator``.
+
+        :rtype: (int, int)
+        """
+        if self.divisor:
+            # Rounded half up to the fixed denominator, not reduced
+            return (2 * numerator * self.divisor + denominator) // (2 * denominator), self.divisor
+        if not numerator:
+            return 0, 1
+        return limit_denominator(numerator, denominator, self.max_denominator)
+
+    def __call__(self, value):
+        return self.format(value, self.approximate)
+
+    def many(self, values):
+        """
+        Format a sequence of values, the fraction of a repeated fraction part is only found once.
+
+        :rtype: list[str]
+        """
+        approximations = {}
+        approximate = self.approximate
+
+        def cached(numerator, denominator):
+            key = numerator, denominator
+            fraction = approximations.get(key)
+            if fraction is None:
+                fraction = approximations[key] = approximate(numerator, denominator)
+            return fraction
+
+        return [self.format(value, cached) for value in values]
+
+    def format(self, value, approximate):
+        """
+        :type value: int | float | Decimal | str
+        :param approximate: Fraction of the section closest to a ratio, as ``approximate``
+        :rtype: str
+        """
+        negative, coefficient, exponent = decompose(value)
+        exponent += self.scale
+        if exponent >= 0:
+            coefficient *= 10 ** exponent
+            unit = 1
+        else:
+            unit = 10 ** -exponent
+
+        if self.mixed:
+            integer, rest = divmod(coefficient, unit)
+        else:
+            integer, rest = 0, coefficient
+        numerator, denominator = approximate(rest, unit)
+        if self.mixed and numerator == denominator:
+            integer += 1
+            numerator = 0
+
+        is_zero = not integer and not numerator
+        if is_zero and self.zero_line is not None:
+            return self.zero_line
+        sign = '-' if negative and not self.strip_sign and not is_zero else ''
+
+        if not self.mixed:
+            digits = ''
+        elif integer:
+            digits = str(integer)
+        else:
+            # A zero is formatted when nothing else is
+            digits = '' if numerator else '0'
+
+        if numerator or not self.mixed:
+            denominator = str(denominator)
+            if not self.divisor:
+                denominator += self.denominator_paddings[len(denominator)]
+            fraction = self.place_numerator(str(numerator)) + '/' + denominator
+        else:
+            fraction = self.blank
+        line = sign + self.place(digits) + self.prefix + fraction + self.suffix
+        return no_negative_zero([line]) if is_zero else line
@@ -0,0 +1,160 @@
+# coding: utf-8
+
+"""
+Fixed-point rounding of numbers with integer arithmetic.
+
+A number is decomposed once into a sign, an integer coefficient and a power of ten, rounding and
+scaling are then integer operations on the coefficient.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, ROUND_HALF_UP, Context, Decimal, InvalidOperation
+from threading import local
+
+
+def decompose(value):
+    """
+    Decimal value of a number as ``(negative, coefficient, exponent)``, the value being
+    ``coefficient * 10 ** exponent``.
+
+    Floats are taken by their shortest representation, the digits they are displayed with.
+
+    :type value: int | float | Decimal | str
+    :rtype: (bool, int, int)
+    :raises ValueError: If the value is not a finite number
+    """
+    value_type = type(value)
+    if value_type is int:
+        return value < 0, abs(value), 0
+
+    if value_type is float:
+        line = repr(value)
+        # Not inf or nan: digits with a dot and an optional exponent, as "-12.5" or "1.25e-07"
+        if 'n' not in line:
+            mantissa, _, exponent = line.partition('e')
+            negative = mantissa[0] == '-'
+            int_part, _, frac_part = mantissa[negative:].partition('.')
+            return negative, int(int_part + frac_part), int(exponent or 0) - len(frac_part)
+    elif isinstance(value, Decimal):
+        # Plain notation of the exact value, faster than as_tuple()
+        line = format(value, 'f')
+    else:
+        line = value if isinstance(value, str) else str(value)
+
+    negative = line[:1] == '-'
+    int_part, dot, frac_part = line[negative:].partition('.')
+    digits = int_part + frac_part
+    if int_part and digits.isdigit() and digits.isascii() and (frac_part or not dot):
+        return negative, int(digits), -len(frac_part)
+
+    try:
+        value = Decimal(line)
+    except InvalidOperation:
+        raise ValueError('invalid number %r' % line)
+    if not value.is_finite():
+        raise ValueError('invalid number %r' % line)
+    sign, digits, exponent = value.as_tuple()
+    return bool(sign), int(''.join(map(str, digits))), exponent
+
+
+def round_fixed(number, decimals=None, scale=0):
+    """
+    Sign, integer digits and fraction digits of the decomposed number times ``10 ** scale``,
+    rounded half away from zero to ``decimals`` fraction digits, or exact if ``decimals`` is None.
+
+    The sign of a nonzero number rounded to zero is dropped, the sign of a zero is kept.
+
+    :type number: (bool, int, int)
+    :type decimals: int | None
+    :type scale: int
+    :rtype: (str, str, str)
+    """
+    negative, coefficient, exponent = number
+    exponent += scale
+    if decimals is None:
+        decimals = max(-exponent, 0)
+
+    shift = exponent + decimals
+    if shift >= 0:
+        coefficient *= 10 ** shift
+    else:
+        unit = 10 ** -shift
+        rounded, rest = divmod(coefficient, unit)
+        if rest * 2 >= unit:
+            rounded += 1
+        if not rounded and coefficient:
+            negative = False
+        coefficient = rounded
+
+    digits = str(coefficient)
+    sign = '-' if negative else ''
+    if decimals:
+        digits = digits.zfill(decimals + 1)
+        return sign, digits[:-decimals], digits[-decimals:]
+    return sign, digits, ''
+
+
+def fixed_string(number, decimals=None, scale=0):
+    """
+    Plain decimal notation of the decomposed number, see ``round_fixed``.
+
+    :type number: (bool, int, int)
+    :rtype: str
+    """
+    sign, int_digits, frac_digits = round_fixed(number, decimals, scale)
+    if frac_digits:
+        return sign + int_digits + '.' + frac_digits
+    return sign + int_digits
+
+
+class DecimalRounding(object):
+    """
+    Rounding of Decimals to a fixed number of decimals with Decimal arithmetic, exact whatever the
+    precision of the value.
+
+    Compiled once per section: the quantizer is computed here and each thread rounds with its own
+    context, contexts keep flags and are not shared between threads.
+    """
+
+    def __init__(self, decimals, scale=0):
+        """
+        :param int decimals: Number of fraction digits
+        :param int scale: Values are multiplied by ``10 ** scale`` before rounding
+        """
+        self.decimals = decimals
+        self.scale = scale
+        self.quantizer = Decimal(1).scaleb(-decimals)
+        self._local = local()
+
+    @property
+    def context(self):
+        """
+        :rtype: Context
+        """
+        context = getattr(self._local, 'context', None)
+        if context is None:
+            context = self._local.context = Context(prec=MAX_PREC, rounding=ROUND_HALF_UP, Emax=MAX_EMAX,
+                                                    Emin=MIN_EMIN, traps=[InvalidOperation])
+        return context
+
+    def __call__(self, value):
+        """
+        Same as ``round_fixed(decompose(value), decimals, scale)`` for a finite Decimal.
+
+        :type value: Decimal
+        :rtype: (str, str, str)
+        """
+        context = self.context
+        if self.scale:
+            value = value.scaleb(self.scale, context)
+        rounded = value.quantize(self.quantizer, context=context)
+
+        line = format(rounded, 'f')
+        if line[0] == '-':
+            line = line[1:]
+            sign = '' if rounded.is_zero() and not value.is_zero() else '-'
+        else:
+            sign = ''
+        int_digits, _, frac_digits = line.partition('.')
+        return sign, int_digits, frac_digits
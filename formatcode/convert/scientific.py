@@ -0,0 +1,196 @@
+# coding: utf-8
+
+"""
+Scientific notation of decimal numbers, as ``0.00E+00`` or ``##0.0E+0``.
+
+The exponent and the digits of the mantissa are found from the decimal digits of the number with
+integer arithmetic, the mantissa is rounded half away from zero. Sequences of floats are rounded on
+the digits of their shortest representation.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+from formatcode.convert.mask import Mask, MaskToken
+from formatcode.convert.placement import compile_decimals, compile_placement
+from formatcode.convert.rounding import decompose, round_fixed
+
+
+class ScientificFormatter(object):
+    """
+    Formatter of a scientific section, compiled once per section.
+
+    With only ``0`` placeholders before the decimal point the mantissa has as many integer digits
+    as placeholders. Otherwise the exponent is a multiple of the number of placeholders, as for
+    the engineering notation of ``##0.0E+0``.
+    """
+
+    def __init__(self, place, integer, decimals='', dot=True, decimal_suffix='', exponent_sign='+', exponent='0',
+                 suffix='', scale=0, strip_sign=False, zero_line=None):
+        """
+        :param place: Formatter of the integer digits in the left mask, see ``compile_placement``
+        :param str integer: Placeholders of the integer part of the mantissa
+        :param str decimals: Placeholders after the decimal point
+        :param bool dot: Whether the mantissa has a decimal point
+        :param str decimal_suffix: Strings between the decimals and the exponent
+        :param str exponent_sign: ``+`` to always show the sign of the exponent, ``-`` for negative
+            exponents only
+        :param str exponent: Placeholders of the exponent
+        :param str suffix: Strings after the exponent
+        :param int scale: Values are multiplied by ``10 ** scale``
+        :param bool strip_sign: Whether the sign is formatted by the section itself
+        :param str zero_line: Output for zero
+        """
+        self.place = place
+        self.width = max(len(integer), 1)
+        self.engineering = any(placeholder != '0' for placeholder in integer)
+        self.decimals = len(decimals)
+        self.place_decimals = compile_decimals(decimals)
+        self.dot = '.' if dot else ''
+        self.decimal_suffix = decimal_suffix
+        self.positive_sign = '+' if exponent_sign == '+' else ''
+        self.place_exponent = compile_placement(tuple(MaskToken(value, Mask.PH) for value in exponent or '0'))
+        self.suffix = suffix
+        self.scale = scale
+        self.strip_sign = strip_sign
+        self.zero_line = zero_line
+
+    def power(self, adjusted):
+        """
+        Exponent shown for a number with its first digit at ``10 ** adjusted``.
+
+        :type adjusted: int
+        :rtype: int
+        """
+        if self.engineering:
+            return adjusted // self.width * self.width
+        return adjusted - self.width + 1
+
+    def __call__(self, value):
+        return self.format(value)
+
+    def many(self, values):
+        """
+        Format a sequence of values.
+
+        The section is read once for the sequence and the exponent part of each power is built
+        once, a column mostly has a few powers. Floats and integers are rounded on the digits of
+        their shortest representation, the other values are formatted one by one.
+
+        :rtype: list[str]
+        :raises ValueError: If a value is not a finite number
+        """
+        power_of = self.power
+        scale = self.scale
+        decimals = self.decimals
+        place = self.place
+        place_decimals = self.place_decimals
+        dot = self.dot
+        strip_sign = self.strip_sign
+        # Exponent parts by power
+        tails = {}
+        zero_line = None
+
+        lines = []
+        append = lines.append
+        for value in values:
+            value_type = type(value)
+            if value_type is float:
+                line = repr(value)
+                if 'n' in line:
+                    # inf or nan
+                    append(self.format(value))
+                    continue
+                mantissa, _, exponent = line.partition('e')
+                negative = mantissa[0] == '-'
+                int_part, _, frac_part = mantissa[negative:].partition('.')
+                digits = (int_part + frac_part).lstrip('0')
+                exponent = int(exponent or 0) - len(frac_part)
+            elif value_type is int:
+                negative = value < 0
+                digits = str(abs(value)).lstrip('0')
+                exponent = 0
+            else:
+                append(self.format(value))
+                continue
+
+            if not digits:
+                if zero_line is None:
+                    zero_line = self.format(0)
+                append(zero_line)
+                continue
+
+            adjusted = len(digits) - 1 + exponent + scale
+            power = power_of(adjusted)
+            # Digits of the mantissa, rounded half away from zero
+            size = adjusted - power + 1 + decimals
+            if len(digits) > size:
+                kept = digits[:size]
+                if digits[size] >= '5':
+                    kept = str(int(kept) + 1)
+                    if len(kept) > size:
+                        # Rounded up to the next power of ten
+                        power = power_of(adjusted + 1)
+                        size = adjusted + 2 - power + decimals
+                        kept = '1'.ljust(size, '0')
+                digits = kept
+            else:
+                digits = digits.ljust(size, '0')
+
+            tail = tails.get(power)
+            if tail is None:
+                tail = tails[power] = self.tail(power)
+            line = place(digits[:size - decimals])
+            if dot:
+                line += dot + place_decimals(digits[size - decimals:])
+            append('-' + line + tail if negative and not strip_sign else line + tail)
+        return lines
+
+    def mantissa(self, coefficient, exponent):
+        """
+        Exponent and rounded mantissa digits of a non-zero number.
+
+        :param int coefficient: Decimal digits of the number, see ``decompose``
+        :param int exponent: Exponent of the last digit
+        :return: The power shown, the integer and the fraction digits of the mantissa
+        :rtype: (int, str, str)
+        """
+        exponent += self.scale
+        adjusted = len(str(coefficient)) - 1 + exponent
+        power = self.power(adjusted)
+        _, int_digits, frac_digits = round_fixed((False, coefficient, exponent - power), self.decimals)
+        if len(int_digits) > adjusted - power + 1:
+            # Rounded up to the next power of ten
+            power = self.power(adjusted + 1)
+            _, int_digits, frac_digits = round_fixed((False, coefficient, exponent - power), self.decimals)
+        return power, int_digits, frac_digits
+
+    def tail(self, power):
+        """
+        Exponent part of the output, with the strings around it.
+
+        :type power: int
+        :rtype: str
+        """
+        exponent_sign = '-' if power < 0 else self.positive_sign
+        return self.decimal_suffix + 'E' + exponent_sign + self.place_exponent(str(abs(power))) + self.suffix
+
+    def format(self, value):
+        """
+        :type value: int | float | Decimal | str
+        :rtype: str
+        """
+        negative, coefficient, exponent = decompose(value)
+        if not coefficient:
+            if self.zero_line is not None:
+                return self.zero_line
+            negative = False
+            power = 0
+            int_digits, frac_digits = '0', '0' * self.decimals
+        else:
+            power, int_digits, frac_digits = self.mantissa(coefficient, exponent)
+
+        sign = '-' if negative and not self.strip_sign else ''
+        line = sign + self.place(int_digits)
+        if self.dot:
+            line += self.dot + self.place_decimals(frac_digits)
+        return line + self.tail(power)
@@ -0,0 +1,204 @@
+# coding: utf-8
+
+"""
+Dates of spreadsheet serial numbers, in the 1900 and 1904 date systems.
+
+A serial is a number of days since the epoch of the system, its fraction the time of the day. The
+day and the time are rounded together to the shown precision of the seconds, with integer
+arithmetic on the decimal digits of the serial. Floats far enough from a rounding tie are scaled
+as floats, with the same result.
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+from formatcode.convert.general import GENERAL_WIDTH
+from formatcode.convert.rounding import decompose
+
+# Microseconds in a second
+MICROSECONDS = 10 ** 6
+# Days from 1970-01-01 to the day before serial 1 in the 1900 system, 1899-12-31
+EPOCH_1900 = -25568
+# Days from 1970-01-01 to serial 0 in the 1904 system, 1904-01-01
+EPOCH_1904 = -24107
+# Serial of the 29th of February 1900, a day that does not exist but that the 1900 system counts
+LEAP_BUG_SERIAL = 60
+# Days of the component cache of a date system, cleared when full
+MAX_CACHED_DAYS = 65536
+# Last year of the date systems
+MAX_YEAR = 9999
+# Shown for serials out of the date system, spreadsheets fill the cell with '#'
+OUT_OF_RANGE = '#' * GENERAL_WIDTH
+# Floats are rounded in float arithmetic below this many units, far from a tie by at least
+# FLOAT_TIE_MARGIN units, the other ones from their decimal digits
+MAX_FLOAT_UNITS = 2 ** 40
+FLOAT_TIE_MARGIN = 1e-3
+
+
+def civil_from_days(days):
+    """
+    Year, month and day of a number of days since 1970-01-01, in the proleptic Gregorian
+    calendar.
+
+    :type days: int
+    :rtype: (int, int, int)
+    """
+    days += 719468
+    era = days // 146097
+    day_of_era = days - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    # Months from March
+    shifted_month = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * shifted_month + 2) // 5 + 1
+    month = shifted_month + 3 if shifted_month < 10 else shifted_month - 9
+    return year_of_era + era * 400 + (month <= 2), month, day
+
+
+def serial_units(value, units_per_day):
+    """
+    Sign and magnitude of a serial in units of a fraction of a day, rounded half away from zero.
+
+    :type value: int | float | Decimal | str
+    :param int units_per_day: Units in a day, as 86400 for seconds
+    :rtype: (bool, int)
+    :raises ValueError: If the value is not a finite number
+    """
+    if type(value) is float:
+        scaled = abs(value) * units_per_day
+        if scaled < MAX_FLOAT_UNITS:
+            units = int(scaled)
+            rest = scaled - units - 0.5
+            if rest >= FLOAT_TIE_MARGIN:
+                return value < 0, units + 1
+            if rest <= -FLOAT_TIE_MARGIN:
+                return value < 0, units
+
+    negative, coefficient, exponent = decompose(value)
+    if exponent >= 0:
+        return negative, coefficient * 10 ** exponent * units_per_day
+    unit = 10 ** -exponent
+    units, rest = divmod(coefficient * units_per_day, unit)
+    if rest * 2 >= unit:
+        units += 1
+    return negative, units
+
+
+def days_from_civil(year, month, day):
+    """
+    Number of days since 1970-01-01 of a date of the proleptic Gregorian calendar, the inverse of
+    ``civil_from_days``.
+
+    :rtype: int
+    """
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month - 3 if month > 2 else month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+class DateSystem(object):
+    """
+    Dates of the serials of a date system.
+
+    The 1900 system counts the 29th of February 1900 and shows serial 0 as the 0th of January
+    1900, as the spreadsheets it comes from. Its weekdays are shifted the same way before March
+    1900. Components of the days are cached, the rows of a sheet often share their dates.
+    """
+
+    def __init__(self, epoch, leap_bug, first_weekday):
+        """
+        :param int epoch: Days from 1970-01-01 to serial 0, to serial 1 with ``leap_bug``
+        :param bool leap_bug: Whether the system counts the 29th of February 1900
+        :param int first_weekday: Weekday of serial 0, Monday being 0
+        """
+        self.epoch = epoch
+        self.leap_bug = leap_bug
+        self.first_weekday = first_weekday
+        self.days = {}
+
+    def date_fields(self, serial):
+        """
+        Year, month, day and weekday of a day.
+
+        :param int serial: Whole days of a serial
+        :rtype: (int, int, int, int)
+        :raises ValueError: If the day is after the last year
+        """
+        fields = self.days.get(serial)
+        if fields is None:
+            if self.leap_bug and serial <= LEAP_BUG_SERIAL:
+                if serial == LEAP_BUG_SERIAL:
+                    date = 1900, 2, 29
+                elif serial == 0:
+                    date = 1900, 1, 0
+                else:
+                    date = civil_from_days(self.epoch + serial)
+            else:
+                date = civil_from_days(self.epoch + serial - self.leap_bug)
+            if date[0] > MAX_YEAR:
+                raise ValueError('date serial %r after %d' % (serial, MAX_YEAR))
+            fields = date + ((self.first_weekday + serial) % 7,)
+            if len(self.days) >= MAX_CACHED_DAYS:
+                self.days.clear()
+            self.days[serial] = fields
+        return fields
+
+    def fields(self, value, precision=0):
+        """
+        Components of a serial, as ``formatcode.convert.dates.DateTimeFormatter`` takes them.
+
+        :type value: int | float | Decimal | str
+        :param int precision: Fraction digits of the seconds, the time is rounded to them
+        :rtype: (int, int, int, int, int, int, int, int)
+        :raises ValueError: If the value is not a finite positive number, or after the last year
+        """
+        negative, units = serial_units(value, 86400 * 10 ** precision)
+        if negative and units:
+            raise ValueError('invalid date serial %r' % (value,))
+        return self.units_fields(units, precision)
+
+    def units_fields(self, units, precision=0):
+        """
+        Components of a serial in units of the precision, see ``fields``.
+
+        :type units: int
+        :type precision: int
+        :rtype: (int, int, int, int, int, int, int, int)
+        :raises ValueError: If the day is after the last year
+        """
+        serial, units = divmod(units, 86400 * 10 ** precision)
+        seconds, fraction = divmod(units, 10 ** precision)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        year, month, day, weekday = self.date_fields(serial)
+        return year, month, day, hour, minute, second, weekday, fraction * (MICROSECONDS // 10 ** precision)
+
+    def serial(self, fields):
+        """
+        Serial of components, the inverse of ``fields``. Days before the epoch have negative
+        serials.
+
+        :param fields: Components of a value, see ``fields``
+        :type fields: (int, int, int, int, int, int, int, int)
+        :rtype: float
+        """
+        year, month, day, hour, minute, second, _, microsecond = fields
+        serial = days_from_civil(year, month, day) - self.epoch
+        # The days after the 29th of February 1900 of the 1900 system are one off
+        if self.leap_bug and serial >= LEAP_BUG_SERIAL and (year, month, day) != (1900, 2, 29):
+            serial += 1
+        return serial + (((hour * 60 + minute) * 60 + second) * MICROSECONDS + microsecond) / (86400 * MICROSECONDS)
+
+
+DATE_1900 = DateSystem(EPOCH_1900, leap_bug=True, first_weekday=5)
+DATE_1904 = DateSystem(EPOCH_1904, leap_bug=False, first_weekday=4)
+
+
+def get_date_system(date1904=False):
+    """
+    :param bool date1904: Whether serials count days from 1904, as workbooks made on old Macs
+    :rtype: DateSystem
+    """
+    return DATE_1904 if date1904 else DATE_1900
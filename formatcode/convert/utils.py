@@ -2,6 +2,8 @@
 
 from __future__ import division, print_function, unicode_literals
 
+from formatcode.base.utils import is_general
+
 
 def split_tokens(tokens, separator):
     """
@@ -14,3 +16,31 @@ def split_tokens(tokens, separator):
         else:
             out[-1].append(token)
     return out
+
+
+def tokens_key(tokens):
+    """
+    Hashable key of a tokens line, equal for lines of equal tokens.
+
+    :rtype: tuple | None
+    """
+    if tokens is None:
+        return None
+    key = []
+    for token in tokens:
+        key.append(token.__class__)
+        key.append(token.render())
+    return tuple(key)
+
+
+def expand_sections(line):
+    """
+    Line as it is compiled, a single section is used for negative numbers as well.
+
+    General is matched regardless of case, the way ``FormatCode.format`` does.
+
+    :rtype: str
+    """
+    if ";" not in line and not is_general(line.lower()):
+        return line + ";-" + line
+    return line
@@ -12,39 +12,82 @@ token_types = [GeneralToken, ZeroToken, SlashSymbol, QToken, HashToken, CommaDel
                PercentageSymbol, AtSymbol, AsteriskSymbol, UnderscoreSymbol, StringSymbol, EToken, ColorToken,
                ConditionToken, DateTimeToken, TimeDeltaToken, AmPmToken, LocaleCurrencyToken, BlockDelimiter, ForceNumberToken]
 
+# Some token types are unique to the block
+# (SlashSymbol removed from following list as it stops datetime formatting,
+# DotDelimiter may be repeated as well.)
+unique_token_types = (TimeDeltaToken, ConditionToken, ColorToken, LocaleCurrencyToken, EToken)
+
+
+def build_dispatch_table(types):
+    """
+    Group token types by the first character of their matches, keeping the priority order of ``types``.
+
+    :rtype: (dict[str, list[type]], list[type])
+    :return: Candidates by first character and candidates for any other character
+    """
+    any_char_types = [t for t in types if t.get_lead_chars() is None]
+    table = {}
+    for token_type in types:
+        for char in token_type.get_lead_chars() or '':
+            table.setdefault(char, [])
+    for char, candidates in table.items():
+        for token_type in types:
+            lead_chars = token_type.get_lead_chars()
+            if lead_chars is None or char in lead_chars:
+                candidates.append(token_type)
+    return table, any_char_types
+
+
+dispatch_table, fallback_types = build_dispatch_table(token_types)
+
 
 def to_tokens_line(line):
     tokens_line = []
-    block_tokens = []
-    previous_token = None
-    while line:
-        for token_type in token_types:
-            if previous_token == "_":
-                line = " " + line[1:]
-            end = token_type.match(line)                
-            if end:
-                token = token_type(value=line[:end])                                   
-                if previous_token == "_":
-                    tokens_line.append(StringSymbol(" "))
-                    previous_token = token_type
-                else:
-                    if token_type ==  UnderscoreSymbol:
-                        previous_token = "_"
-                    else:
-                        previous_token == token_type
-                        tokens_line.append(token)
-                    # Some token types are unique to the block
-                    # (SlashSymbol fromoved from following list as it stops datetime formatting.)
-                    if token_type in (TimeDeltaToken, ConditionToken, ColorToken, LocaleCurrencyToken,
-                                    DotDelimiter, EToken):   
-                        if token_type in block_tokens and token_type.symbol != '.':
-                            raise DuplicateUniqueToken(token, line)
-                        else:
-                            block_tokens.append(token_type)
-                    elif token_type == BlockDelimiter:
-                        block_tokens.clear()
-                line = line[end:]
+    pos = 0
+    while pos < len(line):
+        tokens, pos = to_tokens_block(line, pos)
+        tokens_line.extend(tokens)
+    return tokens_line
+
+
+def to_tokens_block(line, pos=0):
+    """
+    Lex one block of the line, up to and including its BlockDelimiter.
+
+    Lexing always starts afresh after a BlockDelimiter, so blocks can be lexed independently.
+
+    :rtype: (list[formatcode.lexer.tokens.Token], int)
+    :return: Tokens of the block and the position where the next block starts
+    """
+    tokens_line = []
+    block_tokens = set()
+    after_underscore = False
+    length = len(line)
+    while pos < length:
+        if after_underscore:
+            # The character after an underscore only reserves its width.
+            tokens_line.append(StringSymbol(" "))
+            after_underscore = False
+            pos += 1
+            continue
+
+        for token_type in dispatch_table.get(line[pos], fallback_types):
+            scanned = token_type.scan(line, pos)
+            if scanned:
                 break
         else:
-            raise MatchError(line)
-    return tokens_line
+            raise MatchError(line[pos:])
+
+        token, end = scanned
+        if token_type == UnderscoreSymbol:
+            after_underscore = True
+        else:
+            tokens_line.append(token)
+            if token_type in unique_token_types:
+                if token_type in block_tokens:
+                    raise DuplicateUniqueToken(token, line[pos:])
+                block_tokens.add(token_type)
+            elif token_type == BlockDelimiter:
+                return tokens_line, end
+        pos = end
+    return tokens_line, pos
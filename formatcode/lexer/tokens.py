@@ -3,187 +3,413 @@
 from __future__ import division, print_function, unicode_literals
 
 import re
+from decimal import Decimal
 
-from six import add_metaclass
+from six import add_metaclass, iteritems
 
-from formatcode.base.utils import cached_property, Singleton
+from formatcode.base.utils import Singleton
 from formatcode.lexer import locals
 
 
 class Token(object):
+    __slots__ = ()
+
+    # Characters a match can start with, None if any character can start one.
+    lead_chars = None
+
     def __init__(self, value):
         self.cleaned_data = self.clean(value)
 
 
     @classmethod
     def match(cls, line):
+        return cls.match_at(line, 0)
+
+    @classmethod
+    def match_at(cls, line, pos):
+        """
+        Match the token at ``pos`` without slicing the line.
+
+        :rtype: int | None
+        :return: End position of the match
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def scan(cls, line, pos):
+        """
+        Match the token at ``pos`` and build it from the same match.
+
+        :rtype: (Token, int) | None
+        :return: Token and end position of the match
+        """
         raise NotImplementedError
 
+    @classmethod
+    def get_lead_chars(cls):
+        return cls.lead_chars
+
     def clean(self, value):
         return value
 
+    def render(self):
+        """
+        Canonical spelling of the token, lexed back to an equal token.
+
+        :rtype: str
+        """
+        raise NotImplementedError
+
 
 @add_metaclass(Singleton)
 class SingleSymbolToken(Token):
+    __slots__ = ('cleaned_data',)
+
     symbol = None
 
     @classmethod
-    def match(cls, line):
+    def match_at(cls, line, pos):
+        if line.startswith(cls.symbol, pos):
+            return pos + len(cls.symbol)
 
-        # No-Case match for General.
-        if line.lower() == "general" and cls.symbol == "General":
-            return len(cls.symbol)
+    @classmethod
+    def scan(cls, line, pos):
+        end = cls.match_at(line, pos)
+        if end:
+            # Skip Singleton.__call__ once the instance exists.
+            token = Singleton._instances.get(cls)
+            if token is None:
+                token = cls(line[pos:end])
+            return token, end
 
-        if line.startswith(cls.symbol):
-            return len(cls.symbol)
+    @classmethod
+    def get_lead_chars(cls):
+        return cls.symbol[0]
 
     @property
     def value(self):
         return self.symbol
 
+    def render(self):
+        return self.symbol
+
 
 class GeneralToken(SingleSymbolToken):
+    __slots__ = ()
+
     symbol = locals.GENERAL
 
+    def clean(self, value):
+        # The singleton is shared by every spelling.
+        return self.symbol
+
+    @classmethod
+    def match_at(cls, line, pos):
+        end = pos + len(cls.symbol)
+
+        # No-Case match for General, only when it is the rest of the line.
+        if end == len(line) and line[pos:].lower() == cls.symbol.lower():
+            return end
+
+        return super(GeneralToken, cls).match_at(line, pos)
+
+    @classmethod
+    def get_lead_chars(cls):
+        return cls.symbol[0].upper() + cls.symbol[0].lower()
+
 
 class BlockDelimiter(SingleSymbolToken):
+    __slots__ = ()
+
     symbol = locals.BLOCK_DELIMITER
 
 
 class DigitToken(SingleSymbolToken):
-    pass
+    __slots__ = ()
 
 
 class ZeroToken(DigitToken):
+    __slots__ = ()
+
     symbol = locals.ZERO
 
 
 class QToken(DigitToken):
+    __slots__ = ()
+
     symbol = locals.QUESTION
 
 
 class HashToken(DigitToken):
+    __slots__ = ()
+
     symbol = locals.HASH
 
 
 class CommaDelimiter(SingleSymbolToken):
+    __slots__ = ()
+
     symbol = locals.COMMA
 
 
 class DotDelimiter(SingleSymbolToken):
+    __slots__ = ()
+
     symbol = locals.DOT
 
 
 class PercentageSymbol(SingleSymbolToken):
+    __slots__ = ()
+
     symbol = locals.PERCENT
 
 
 class AtSymbol(SingleSymbolToken):
+    __slots__ = ()
+
     symbol = locals.AT
 
 
 class UnderscoreSymbol(SingleSymbolToken):
+    __slots__ = ()
+
     symbol = locals.UNDERSCORE
 
 
 class RegexpToken(Token):
+    """
+    Named groups of ``regexp`` are stored in slots of the same name.
+    """
+    __slots__ = ()
+
     regexp = None
+    # Same pattern and groups as ``regexp``, anchored by ``match(line, pos)`` instead of ``^``
+    scan_regexp = None
+
+    def __init__(self, value):
+        self.set_fields(self.clean(value))
 
     @classmethod
-    def match(cls, line):
-        m = cls.regexp.search(line)
+    def match_at(cls, line, pos):
+        m = cls.scan_regexp.match(line, pos)
         if m:
             return m.end()
 
+    @classmethod
+    def scan(cls, line, pos):
+        m = cls.scan_regexp.match(line, pos)
+        if m:
+            return cls.from_groups(m.groupdict()), m.end()
+
+    @classmethod
+    def from_groups(cls, groups):
+        token = cls.__new__(cls)
+        token.set_fields(cls.clean_groups(groups))
+        return token
+
+    @classmethod
+    def clean_groups(cls, groups):
+        return groups
+
     def clean(self, value):
-        return self.regexp.search(value).groupdict()
+        return self.clean_groups(self.regexp.search(value).groupdict())
+
+    def set_fields(self, data):
+        for name, value in iteritems(data):
+            setattr(self, name, value)
 
-    def __getattr__(self, item):
-        return self.cleaned_data[item]
+    @property
+    def cleaned_data(self):
+        return {name: getattr(self, name) for name in self.regexp.groupindex}
 
 
 class SlashSymbol(RegexpToken):
+    __slots__ = ('value',)
+
     regexp = re.compile(r'(?P<value>(?<=^/)[0-9]*)')
+    scan_regexp = re.compile(r'/(?P<value>[0-9]*)')
+    lead_chars = '/'
 
-    def clean(self, value):
-        m = super(SlashSymbol, self).clean(value)
-        m['value'] = int(m['value']) if m['value'] else None
-        return m
+    @classmethod
+    def clean_groups(cls, groups):
+        groups['value'] = int(groups['value']) if groups['value'] else None
+        return groups
+
+    def render(self):
+        return '/%d' % self.value if self.value is not None else '/'
 
 
 class AsteriskSymbol(RegexpToken):
+    __slots__ = ('value',)
+
     regexp = re.compile(r'(?P<value>(?<=^\*).)')
+    scan_regexp = re.compile(r'\*(?P<value>.)')
+    lead_chars = '*'
+
+    def render(self):
+        return '*' + self.value
 
 
 class StringSymbol(RegexpToken):
+    __slots__ = ('value',)
+
     regexp = re.compile(r'(?P<value>(^[$£€¥+\-():!^&\'~{}<>= ]|(?<=^\\).|^"[^"]*"))')
+    scan_regexp = re.compile(r'(\\)?(?P<value>(?(1).|([$£€¥+\-():!^&\'~{}<>= ]|"[^"]*")))')
+    lead_chars = '$£€¥+-():!^&\'~{}<>= \\"'
+    # Characters written without quotes or escape
+    bare_chars = '$£€¥+-():!^&\'~{}<>= '
 
-    def clean(self, value):
-        m = super(StringSymbol, self).clean(value)
-        if m['value'].startswith('"') and len(m['value']) > 1:
-            m['value'] = m['value'].strip('"')
-        return m
+    @classmethod
+    def clean_groups(cls, groups):
+        if groups['value'].startswith('"') and len(groups['value']) > 1:
+            groups['value'] = groups['value'].strip('"')
+        return groups
+
+    def render(self):
+        value = self.value
+        if len(value) == 1 and value in self.bare_chars:
+            return value
+        if len(value) == 1 and value != '\n':
+            return '\\' + value
+        return '"%s"' % value
 
 
 class EToken(RegexpToken):
+    __slots__ = ('value',)
+
     regexp = re.compile(r'(?P<value>(?<=^[Ee])[+-])')
+    scan_regexp = re.compile(r'[Ee](?P<value>[+-])')
+    lead_chars = 'Ee'
+
+    def render(self):
+        return 'E' + self.value
 
 
 class ColorToken(RegexpToken):
-    regexp = re.compile(r'^\[(?P<value>(Black|Green|White|Blue|Magenta|Yellow|Cyan|Red|'
+    __slots__ = ('value',)
+
+    regexp = re.compile(r'(?i)^\[(?P<value>(Black|Green|White|Blue|Magenta|Yellow|Cyan|Red|'
                         r'Color([1-9]|[1-4][0-9]|5[0-6])))]')
+    scan_regexp = re.compile(r'(?i)' + regexp.pattern[5:])
+    lead_chars = '['
+
+    @classmethod
+    def clean_groups(cls, groups):
+        # Colors are case-insensitive, [RED] is [Red]
+        groups['value'] = groups['value'].capitalize()
+        return groups
+
+    def render(self):
+        return '[%s]' % self.value
 
 
 class ConditionToken(RegexpToken):
+    __slots__ = ('op', 'value')
+
     regexp = re.compile(r'^\[(?P<op>(<|>|>=|<=|=|<>))(?P<value>([-+]?[0-9]+(\.[0-9]+)?))]')
+    scan_regexp = re.compile(regexp.pattern[1:])
+    lead_chars = '['
 
-    def clean(self, value):
-        m = super(ConditionToken, self).clean(value)
-        m['value'] = float(m['value'])
-        return m
+    @classmethod
+    def clean_groups(cls, groups):
+        groups['value'] = float(groups['value'])
+        return groups
+
+    def render(self):
+        # Fixed point, a condition has no exponent
+        value = '%d' % self.value if self.value.is_integer() else format(Decimal(repr(self.value)), 'f').rstrip('0')
+        return '[%s%s]' % (self.op, value)
 
 
 class DateTimeToken(RegexpToken):
+    __slots__ = ('value',)
+
     regexp = re.compile(r'(?i)^(?P<value>((yy){1,2}|m{1,5}|d{1,4}|h{1,2}|s{1,2}))')
+    scan_regexp = re.compile(r'(?i)(?P<value>((yy){1,2}|m{1,5}|d{1,4}|h{1,2}|s{1,2}))')
+    lead_chars = 'yYmMdDhHsS'
+
+    def render(self):
+        # Case is significant for date formatting, the value is kept as written.
+        return self.value
 
 
 class TimeDeltaToken(RegexpToken):
+    __slots__ = ('value',)
+
     regexp = re.compile(r'^\[(?P<value>[hms]+)]')
+    scan_regexp = re.compile(regexp.pattern[1:])
+    lead_chars = '['
+
+    def render(self):
+        return '[%s]' % self.value
 
 
 class AmPmToken(RegexpToken):
+    __slots__ = ('value',)
+
     regexp = re.compile(r'^(?P<value>(AM/PM|A/P))')
+    scan_regexp = re.compile(regexp.pattern[1:])
+    lead_chars = 'A'
+
+    def render(self):
+        return self.value
 
 
 class LocaleCurrencyToken(RegexpToken):
+    __slots__ = ('curr', 'info', 'language_id', 'calendar_type', 'number_system')
+
     regexp = re.compile(r'^\[\$(?P<curr>[^-|\]]*)(-(?P<info>[0-9A-Fa-f]{1,8}))?]')
+    scan_regexp = re.compile(regexp.pattern[1:])
+    lead_chars = '['
+
+    @classmethod
+    def clean_groups(cls, groups):
+        if groups['info']:
+            groups['info'] = int(groups['info'], 16)
+        return groups
+
+    def set_fields(self, data):
+        super(LocaleCurrencyToken, self).set_fields(data)
+
+        info = self.info
+        self.language_id = info & 0xffff if info is not None else None
+        self.calendar_type = info >> 16 & 0xff if info is not None else None
+        self.number_system = info >> 24 & 0xff if info is not None else None
+
+    def render(self):
+        return '[$%s%s]' % (self.curr, '-%X' % self.info if self.info is not None else '')
 
-    def clean(self, value):
-        m = super(LocaleCurrencyToken, self).clean(value)
-        if m['info']:
-            m['info'] = int(m['info'], 16)
-        return m
-
-    @cached_property
-    def language_id(self):
-        info = self.cleaned_data['info']
-        return info & 0xffff if info is not None else None
-
-    @cached_property
-    def calendar_type(self):
-        info = self.cleaned_data['info']
-        return info >> 16 & 0xff if info is not None else None
-
-    @cached_property
-    def number_system(self):
-        info = self.cleaned_data['info']
-        return info >> 24 & 0xff if info is not None else None
 
 class ForceNumberToken(RegexpToken):
+    __slots__ = ('value',)
+
     regexp = re.compile(r'(?P<value>([1-9*$]|(?<=^\\)))')
+    scan_regexp = re.compile(r'[1-9*$]')
 
-    def clean(self, value):
-        m = super(ForceNumberToken, self).clean(value)
-        if m['value'].startswith('"') and len(m['value']) > 1:
-            m['value'] = m['value'].strip('"')
-        return m
\ No newline at end of file
+    @classmethod
+    def scan(cls, line, pos):
+        end = cls.match_at(line, pos)
+        if end:
+            return cls(line[pos:end]), end
+
+    @classmethod
+    def match_at(cls, line, pos):
+        # ``regexp`` is searched, not anchored: everything up to the first forced character is consumed.
+        if line.startswith('\\', pos):
+            end = pos + 1
+            if cls.scan_regexp.match(line, end):
+                end += 1
+            return end
+
+        m = cls.scan_regexp.search(line, pos)
+        if m:
+            return m.end()
+
+    @classmethod
+    def clean_groups(cls, groups):
+        if groups['value'].startswith('"') and len(groups['value']) > 1:
+            groups['value'] = groups['value'].strip('"')
+        return groups
+
+    def render(self):
+        return self.value
\ No newline at end of file
@@ -4,7 +4,7 @@ from __future__ import division, print_function, unicode_literals
 
 from six import add_metaclass
 
-from formatcode.base.utils import cached_property, Singleton, is_digit
+from formatcode.base.utils import cached_property, Singleton, is_digit, is_number_string
 
 
 def test_singleton():
@@ -57,3 +57,11 @@ def test_is_digit():
     assert is_digit('-') is False
     assert is_digit(type) is False
     assert is_digit('') is False
+
+
+def test_is_number_string():
+    for value in ('0', '-1234', '2751.59', '-0.5', '1.5E-3', '2E+20', '1e5'):
+        assert is_number_string(value) is True
+
+    for value in ('', '-', '+1', '.5', '5.', '1,234', ' 1', '1 ', '1.2.3', 'E5', 'nan', 'inf', '1E', '1\n'):
+        assert is_number_string(value) is False
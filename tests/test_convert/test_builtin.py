@@ -0,0 +1,28 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+import pytest
+
+from formatcode.convert.builtin import BUILTIN_FORMATS, LOCALE_BUILTIN_FORMATS, builtin_format
+from formatcode.convert.errors import BuiltinFormatError
+
+
+def test_builtin_format():
+    assert builtin_format(0) == 'General'
+    assert builtin_format(49) == '@'
+    assert builtin_format(14, 0x409) == 'm/d/yyyy'
+    assert builtin_format(14, 0x407) == 'dd.mm.yyyy'
+    assert builtin_format(31, 0x411) == 'yyyy"年"m"月"d"日"'
+    assert builtin_format(3, 0x411) == '#,##0'
+
+    for num_fmt_id in (23, 50, -1):
+        with pytest.raises(BuiltinFormatError):
+            builtin_format(num_fmt_id)
+
+
+@pytest.mark.parametrize('language_id', [None] + sorted(LOCALE_BUILTIN_FORMATS))
+def test_builtin_format_ids(language_id):
+    ids = set(BUILTIN_FORMATS) | set(LOCALE_BUILTIN_FORMATS.get(language_id, ()))
+    assert all(0 <= num_fmt_id < 50 for num_fmt_id in ids)
+    assert set(range(23)) | set(range(37, 50)) <= ids
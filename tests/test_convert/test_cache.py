@@ -0,0 +1,131 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+from threading import Thread
+
+import pytest
+
+from formatcode.convert.cache import CompileCache
+
+
+def test_lru_entries():
+    cache = CompileCache(max_entries=2)
+    assert cache.get('a', lambda: 1) == 1
+    assert cache.get('b', lambda: 2) == 2
+    assert cache.get('a', lambda: 0) == 1
+
+    cache.get('c', lambda: 3)
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+
+    info = cache.info()
+    assert (info.hits, info.misses, info.evictions, info.entries) == (1, 3, 1, 2)
+
+    cache.resize(max_entries=1)
+    assert len(cache) == 1
+    assert cache.info().evictions == 2
+
+    cache.clear()
+    assert cache.info()[:5] == (0, 0, 0, 0, 0)
+
+
+def test_lru_size():
+    cache = CompileCache(max_entries=None, max_size=10, sizeof=len)
+    cache.get('a', lambda: 'xxxx')
+    cache.get('b', lambda: 'xxxx')
+    assert cache.info().size == 8
+
+    cache.get('c', lambda: 'xxxx')
+    assert 'a' not in cache
+    assert cache.info().size == 8
+
+    # Values bigger than the whole cache are returned, not kept
+    assert cache.get('d', lambda: 'x' * 20) == 'x' * 20
+    assert len(cache) == 0
+
+
+def test_resize():
+    cache = CompileCache(max_entries=3, max_size=10, sizeof=len)
+    for key in 'abc':
+        cache.get(key, lambda: 'xxx')
+
+    # Bounds not given are kept
+    cache.resize(max_entries=2)
+    assert (cache.max_entries, cache.max_size) == (2, 10)
+    assert len(cache) == 2
+    cache.resize(max_size=3)
+    assert (cache.max_entries, cache.max_size) == (2, 3)
+    assert len(cache) == 1
+
+    cache.resize(max_entries=None, max_size=None)
+    assert (cache.max_entries, cache.max_size) == (None, None)
+    for key in 'abcd':
+        cache.get(key, lambda: 'xxx')
+    assert len(cache) == 4
+
+
+def test_factory_error():
+    cache = CompileCache()
+
+    def factory():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        cache.get('a', factory)
+    assert 'a' not in cache
+    assert cache.info().misses == 1
+
+
+def test_threads():
+    cache = CompileCache(max_entries=8)
+    results = []
+
+    def worker():
+        results.extend(cache.get(i % 16, lambda: object()) for i in range(1000))
+
+    threads = [Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    info = cache.info()
+    assert len(results) == 8000
+    assert info.hits + info.misses == 8000
+    assert info.entries == 8
+
+
+def test_failures():
+    cache = CompileCache(errors=(KeyError,), max_failures=2)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        raise KeyError('bad', 1)
+
+    for _ in range(3):
+        with pytest.raises(KeyError) as e:
+            cache.get('a', factory)
+        assert e.value.args == ('bad', 1)
+    assert len(calls) == 1
+    assert 'a' not in cache
+    assert cache.get('a', factory, fallback=lambda: 0) == 0
+
+    info = cache.info()
+    assert (info.misses, info.failure_hits, info.failures) == (1, 3, 1)
+
+    (failure,) = cache.failures()
+    assert failure.key == 'a'
+    assert failure.error is KeyError
+    assert failure.message == str(KeyError('bad', 1))
+    assert failure.hits == 3
+
+    with pytest.raises(KeyError):
+        cache.get('b', factory)
+    cache.get('c', factory, fallback=lambda: 0)
+    assert [failure.key for failure in cache.failures()] == ['b', 'c']
+
+    cache.clear()
+    assert cache.failures() == []
@@ -0,0 +1,58 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+import pytest
+
+from formatcode.convert.canonical import canonical_line, collapse_stats
+from formatcode.convert.errors import PartsCountError
+from formatcode.convert.fc import FormatCode
+from formatcode.lexer.errors import DuplicateUniqueToken, MatchError
+
+
+@pytest.mark.parametrize(['lines', 'result'], [
+    (['0.00', '0.00;-0.00', '0.00;\\-0.00', '0.00;"-"0.00'], '0.00;-0.00'),
+    (['#,##0;[Red]\\-#,##0', '#,##0;[RED]"-"#,##0', '#,##0;[red]-#,##0'], '#,##0;[Red]-#,##0'),
+    (['"$"#,##0_)', '\\$#,##0_)', '$#,##0\\ '], '$#,##0 ;-$#,##0 '),
+    (['General', 'general', 'GENERAL'], 'General'),
+    (['0 "general"'], None),
+    (['0;General', '0;general'], '0;General'),
+    (['[$€-401]0.00;[$€-0401]0.00'], '[$€-401]0.00;[$€-401]0.00'),
+    (['dd/MM/YYYY'], 'dd/MM/YYYY;-dd/MM/YYYY'),
+])
+def test_canonical_line(lines, result):
+    for line in lines:
+        canonical = canonical_line(line)
+        assert canonical == (result or line)
+        assert canonical_line(canonical) == canonical
+
+
+@pytest.mark.parametrize('line, error', [
+    ('0;0;0;0;0', PartsCountError),
+    ('[Red][Blue]0', DuplicateUniqueToken),
+    ('[Rouge]0', MatchError),
+])
+def test_canonical_line_invalid(line, error):
+    with pytest.raises(error):
+        FormatCode(canonical_line(line))
+
+
+def test_canonical_line_keeps_output():
+    for line in ['0.00', '#,##0;[RED]\\(#,##0\\)', '"$"#,##0.00_);"-"?', '0.0%;"n/a";"zero"', '0 "general"']:
+        fc = FormatCode(line)
+        canonical = FormatCode(canonical_line(line))
+        for value in (0, 1, -1, 1234.5, -0.25):
+            assert canonical.format(value) == fc.format(value)
+
+
+def test_collapse_stats():
+    stats = collapse_stats(['0.00', '0.00', '0.00;-0.00', '0.00;\\-0.00', '#,##0', '[Rouge]0'])
+    assert stats == (6, 5, 3, 3)
+
+
+def test_get_shares_spellings():
+    FormatCode.cache.clear()
+    fc = FormatCode.get('#,##0;[Red]\\-#,##0')
+    assert FormatCode.get('#,##0;[RED]"-"#,##0') is fc
+    assert fc.source_line == '#,##0;[Red]-#,##0'
+    assert FormatCode.cache.info().entries == 1
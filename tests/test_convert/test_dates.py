@@ -0,0 +1,153 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+from datetime import date, datetime, time, timedelta
+from threading import Thread
+
+import pytest
+
+from formatcode.convert.dates import DateTimeFormatter, date_fields, is_datetime64, is_minute, seconds_fraction_size
+from formatcode.convert.errors import IllegalPartToken
+from formatcode.convert.fc import FormatCode
+from formatcode.lexer.lexer import to_tokens_line
+
+
+@pytest.mark.parametrize('line, value, result', (
+    ('yyyy-mm-dd', datetime(2018, 6, 5, 14, 1, 1), '2018-06-05'),
+    ('YYYY-MM-DD', datetime(2018, 6, 5, 14, 1, 1), '2018-06-05'),
+    ('m/d/yy', datetime(2008, 1, 2), '1/2/08'),
+    ('dd/mm/yyyy hh:mm:ss', datetime(2018, 6, 5, 14, 1, 1), '05/06/2018 14:01:01'),
+    ('h:mm AM/PM', datetime(2018, 6, 5, 14, 1, 1), '2:01 PM'),
+    ('h:mm AM/PM', datetime(2018, 6, 5, 0, 30), '12:30 AM'),
+    ('hh:mm:ss A/P', datetime(2018, 6, 5, 9, 5, 7), '09:05:07 AM'),
+    ('ddd d mmm', datetime(2018, 6, 5), 'Tue 5 Jun'),
+    ('mmmm yyyy', datetime(2018, 6, 5), 'June 2018'),
+    ('mm:ss', datetime(2018, 6, 5, 14, 1, 1), '01:01'),
+    ('h "h" m "min"', datetime(2018, 6, 5, 14, 1, 1), '14 h 1 min'),
+    ('yyyy"%"mm', datetime(2018, 6, 5), '2018%06'),
+    ('[$-409]mmm-yy', datetime(2018, 6, 5), 'Jun-18'),
+    ('[$-407]dddd d mmmm yyyy', datetime(2018, 6, 5), 'Dienstag 5 Juni 2018'),
+    ('[$-40C]ddd d mmm', datetime(2018, 6, 5), 'mar. 5 juin'),
+    ('[$-419]d mmmm yyyy', datetime(2018, 6, 5), '5 июня 2018'),
+    ('[$-419]mmmm yyyy', datetime(2018, 6, 5), 'Июнь 2018'),
+    ('[$-411]h:mm AM/PM', datetime(2018, 6, 5, 14, 1, 1), '2:01 午後'),
+    ('[$-C07]mmmm', datetime(2018, 3, 5), 'März'),
+    ('mmmmm', datetime(2018, 6, 5), 'J'),
+    ('dddd, mmmm d, yyyy', datetime(2018, 6, 5), 'Tuesday, June 5, 2018'),
+    ('[Blue]D.M.YY', datetime(2018, 6, 5), '5.6.18'),
+    ('HH:mm:SS', datetime(2018, 6, 5, 14, 1, 1), '14:01:01'),
+    ('HH:MM:SS', datetime(2018, 6, 5, 14, 7, 9), '14:07:09'),
+    ('Yyyy-Mm-Dd', datetime(2018, 6, 5, 14, 7, 9), '2018-06-05'),
+    ('M/D/YY H:MM', datetime(2018, 6, 5, 14, 7, 9), '6/5/18 14:07'),
+    ('Mmm dDDd', datetime(2018, 6, 5), 'Jun Tuesday'),
+    ('hh:mm:ss.000', datetime(2018, 6, 5, 14, 1, 1, 987654), '14:01:01.987'),
+))
+def test_datetime_format(line, value, result):
+    assert FormatCode(line).format(value) == result
+
+
+def test_datetime_formatter():
+    formatter = DateTimeFormatter(to_tokens_line('yyyy-mm-dd hh:mm'))
+    assert formatter.template == '%d-%02d-%02d %02d:%02d'
+    assert formatter.format_fields((2018, 6, 5, 14, 1, 1, 1, 0)) == '2018-06-05 14:01'
+    assert formatter.many([datetime(2018, 6, 5), datetime(1999, 12, 31, 23, 59)]) == ['2018-06-05 00:00',
+                                                                                     '1999-12-31 23:59']
+    assert DateTimeFormatter(to_tokens_line('ss.00')).precision == 2
+    with pytest.raises(IllegalPartToken):
+        DateTimeFormatter(to_tokens_line('yyyy 0'))
+    with pytest.raises(IllegalPartToken):
+        DateTimeFormatter(to_tokens_line('mm.00'))
+
+
+def test_is_minute():
+    tokens = to_tokens_line('yyyy-mm-dd hh:mm')
+    assert not is_minute(tokens, 2)
+    assert is_minute(tokens, 8)
+    assert not is_minute(to_tokens_line('mm'), 0)
+
+
+def test_seconds_fraction_size():
+    tokens = to_tokens_line('h:mm:ss.00 AM/PM')
+    assert seconds_fraction_size(tokens, 6) == 2
+    assert seconds_fraction_size(tokens, 7) == 2
+    assert not seconds_fraction_size(tokens, 8)
+    assert not seconds_fraction_size(to_tokens_line('dd.00'), 2)
+    assert not seconds_fraction_size(to_tokens_line('ss.#'), 2)
+
+
+@pytest.mark.parametrize('line, value, result', (
+    ('dddd yyyy-mm-dd hh:mm', date(2018, 6, 5), 'Tuesday 2018-06-05 00:00'),
+    ('[$-407]d mmmm yyyy', date(2020, 2, 29), '29 Februar 2020'),
+    ('h:mm:ss.00 AM/PM', time(14, 1, 1, 250000), '2:01:01.25 PM'),
+    ('yyyy-mm-dd hh:mm', time(9, 30), '1900-01-00 09:30'),
+    ('hh:mm', timedelta(hours=5, minutes=3), '05:03'),
+    ('d hh:mm', timedelta(days=3, hours=1), '3 01:00'),
+))
+def test_temporal_format(line, value, result):
+    assert FormatCode(line).format(value) == result
+
+
+@pytest.mark.parametrize('line, value, result', (
+    ('0.00', date(2020, 1, 1), '43831.00'),
+    ('General', datetime(2020, 1, 1, 12), '43831.5'),
+    ('General', time(6), '0.25'),
+    ('0', datetime(1900, 3, 1), '61'),
+    ('0.00;-0.00', date(1899, 12, 30), '-1.00'),
+    ('[h]:mm', time(1, 30), '1:30'),
+    ('[<40000]"old "0;[>=40000]yyyy', date(2000, 1, 1), 'old 36526'),
+    ('[<40000]"old "0;[>=40000]yyyy', date(2020, 1, 1), '2020'),
+    ('yyyy-mm-dd;@', date(1850, 1, 1), '1850-01-01'),
+))
+def test_temporal_serial_format(line, value, result):
+    assert FormatCode(line).format(value) == result
+    assert FormatCode(line).format_many([value]) == [result]
+
+
+def test_temporal_format_1904():
+    assert FormatCode('dddd yyyy-mm-dd', date1904=True).format(time(1)) == 'Friday 1904-01-01'
+    assert FormatCode('yyyy-mm-dd', date1904=True).format(timedelta(days=1)) == '1904-01-02'
+    assert date_fields(date(2018, 6, 5)) == (2018, 6, 5, 0, 0, 0, 1, 0)
+    assert not is_datetime64(datetime(2018, 6, 5))
+
+
+def test_temporal_format_many():
+    fc = FormatCode('yyyy-mm-dd hh:mm')
+    values = [date(2018, 6, 5), time(9, 30), None, datetime(2018, 6, 5, 1, 2), timedelta(days=61.5)]
+    assert fc.format_many(values) == ['2018-06-05 00:00', '1900-01-00 09:30', None, '2018-06-05 01:02',
+                                      '1900-03-01 12:00']
+
+
+def test_datetime64_format():
+    numpy = pytest.importorskip('numpy')
+    fc = FormatCode('yyyy-mm-dd hh:mm:ss.000')
+    assert fc.format(numpy.datetime64('2018-06-05T14:01:01.123456789')) == '2018-06-05 14:01:01.123'
+    assert fc.format(numpy.datetime64('1899-12-31T23:59:59', 's')) == '1899-12-31 23:59:59.000'
+    assert fc.format(numpy.datetime64('2018-06', 'M')) == '2018-06-01 00:00:00.000'
+    assert FormatCode('ddd d mmm').format(numpy.datetime64('2018-06-05')) == 'Tue 5 Jun'
+    assert fc.format(numpy.datetime64('NaT')) == ''
+    assert FormatCode('0.00').format(numpy.datetime64('NaT')) == ''
+    assert FormatCode('0.00').format(numpy.datetime64('2020-01-01T12:00')) == '43831.50'
+
+
+def test_datetime_format_many():
+    fc = FormatCode('yyyy-mm-dd')
+    assert fc.format_many([datetime(2018, 6, 5), None, datetime(2020, 2, 29)]) == ['2018-06-05', None, '2020-02-29']
+
+
+def test_locales_concurrent():
+    values = [datetime(2018, month, 1) for month in range(1, 13)] * 50
+    expected = {line: FormatCode(line).format_many(values) for line in ('[$-407]mmmm', '[$-40C]mmmm', 'mmmm')}
+    results = {}
+
+    def run(line):
+        fc = FormatCode(line)
+        results[line] = [fc.format(value) for value in values]
+
+    threads = [Thread(target=run, args=(line,)) for line in expected]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == expected
+    assert expected['[$-40C]mmmm'][:2] == ['janvier', 'février']
@@ -0,0 +1,82 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+from datetime import timedelta
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from formatcode.convert.elapsed import ElapsedTimeFormatter, timedelta_days, timedelta_units
+from formatcode.convert.errors import IllegalPartToken
+from formatcode.convert.fc import FormatCode
+from formatcode.lexer.lexer import to_tokens_line
+from tests.examples import examples
+
+
+@pytest.mark.parametrize('value, result, line', [example for example in examples if example[2].startswith('[')
+                                                 and example[2][1] in 'hms'])
+def test_elapsed_examples(value, result, line):
+    assert FormatCode(line).format(value) == result
+
+
+@pytest.mark.parametrize('line, value, result', (
+    ('[h]:mm:ss', 1.5 + 1 / 86400, '36:00:01'),
+    ('[h]:mm:ss', -0.25, '-6:00:00'),
+    ('[hh]:mm', 0.25, '06:00'),
+    ('[h]:mm', 0.99999, '23:59'),
+    ('[m]', 0.5, '720'),
+    ('[m];-[m]', -0.5, '-720'),
+    ('[mm]:ss.0', '0.0006', '00:51.8'),
+    ('[ss].000', Decimal('0.00000000578704'), '00.001'),
+    ('[h] "h" mm "min"', 2, '48 h 00 min'),
+    ('[h]:mm:ss', 1e-7, '0:00:00'),
+))
+def test_elapsed_format(line, value, result):
+    assert FormatCode(line).format(value) == result
+
+
+def test_elapsed_timedelta():
+    fc = FormatCode('[h]:mm:ss.00')
+    assert fc.pos_part.format(timedelta(days=2, seconds=5, microseconds=125000)) == '48:00:05.13'
+    assert fc.neg_part.format(timedelta(seconds=-90)) == '-0:01:30.00'
+    assert ElapsedTimeFormatter(to_tokens_line('[mm]:ss'))(timedelta(hours=-1, seconds=-1)) == '-60:01'
+    assert timedelta_units(timedelta(microseconds=-1500), 3) == (True, 2)
+    assert timedelta_units(timedelta(days=1), 0) == (False, 86400)
+
+
+def test_elapsed_formatter():
+    formatter = ElapsedTimeFormatter(to_tokens_line('[h]:mm:ss.00'))
+    assert formatter.template == '%01d:%02d:%02d.%02d'
+    assert formatter.precision == 2
+    assert formatter.many([1, 0.5, timedelta(hours=30), '0.25']) == ['24:00:00.00', '12:00:00.00', '30:00:00.00',
+                                                                    '6:00:00.00']
+    assert ElapsedTimeFormatter(to_tokens_line('[h]:mm'), strip_sign=True)(-1) == '24:00'
+
+    with pytest.raises(IllegalPartToken):
+        ElapsedTimeFormatter(to_tokens_line('[h]:mm.00'))
+    with pytest.raises(IllegalPartToken):
+        ElapsedTimeFormatter(to_tokens_line('[h] yyyy'))
+    with pytest.raises(ValueError):
+        formatter(float('inf'))
+
+
+def test_elapsed_format_many():
+    fc = FormatCode('[h]:mm')
+    values = [1, None, 0.25, -0.5, '2']
+    assert fc.format_many(values) == ['24:00', None, '6:00', '-12:00', '48:00']
+    assert fc.pos_part.format_many([1, timedelta(minutes=90), 'x']) == ['24:00', '1:30', 'x']
+    assert fc.kernels()[:2] == ['elapsed', 'elapsed']
+
+
+def test_timedelta_format():
+    assert FormatCode('[h]:mm:ss').format(timedelta(days=1, seconds=61)) == '24:01:01'
+    assert FormatCode('[h]:mm:ss').format(timedelta(seconds=-61)) == '-0:01:01'
+    assert FormatCode('[h]:mm;[Red]-[h]:mm;"zero"').format(timedelta(0)) == 'zero'
+    assert FormatCode('[>=1][h]"h";[<1][mm]"m";0').format(timedelta(hours=25)) == '25h'
+    assert FormatCode('[>=1][h]"h";[<1][mm]"m";0').format(timedelta(hours=2)) == '120m'
+    assert FormatCode('0.000').format(timedelta(hours=-12)) == '-0.500'
+    assert FormatCode('[h]:mm').format_many([timedelta(hours=1), timedelta(hours=-2), 0.5, None]) == [
+        '1:00', '-2:00', '12:00', None]
+    assert timedelta_days(timedelta(hours=-6, microseconds=1)) == Fraction(-21599999999, 86400000000)
@@ -2,11 +2,14 @@
 
 from __future__ import division, print_function, unicode_literals
 
+from threading import Thread
+
 import pytest
 
-from formatcode.convert.errors import PartsCountError
+from formatcode.convert.errors import BuiltinFormatError, PartsCountError
 from formatcode.convert.fc import FormatCode
 from formatcode.convert.parts import NegativePart, PositivePart, StringPart, ZeroPart
+from formatcode.lexer.errors import DuplicateUniqueToken
 
 
 def test_parts_from_tokens():
@@ -32,3 +35,218 @@ def test_parts_from_tokens():
     assert fc.parts[1].tokens is None
     assert fc.parts[2].tokens is None
     assert fc.parts[3].tokens is None
+
+
+@pytest.mark.parametrize(['line', 'start', 'end', 'text'], [
+    (r'"£"#,##0.00;[Red]\-"£"#,##0.00', 10, 10, '0'),
+    (r'"£"#,##0.00;[Red]\-"£"#,##0.00;"-"', 31, 34, '0.00'),
+    (r'"$"#,##0.00_);[Red]\("$"#,##0.00\);"-";"Hello, "@', 45, 45, 'World'),
+    (r'0;[Red]0', 1, 2, ''),
+    (r'0.00;"x"', 5, 5, ';'),
+    (r'0.00', 4, 4, '0'),
+    (r'0.00;0', 4, 6, ''),
+    (r'0.00;-0.00;"zero"', 10, 17, ''),
+])
+def test_edit(line, start, end, text):
+    fc = FormatCode(line)
+    edited = fc.edit(start, end, text)
+    expected = FormatCode(line[:start] + text + line[end:])
+
+    assert edited.format_string == expected.format_string
+    for part, expected_part in zip(edited.parts, expected.parts):
+        assert part.fc is edited
+        assert part.__class__ == expected_part.__class__
+        # Configured handlers are shared by identical parts
+        assert part.handler is expected_part.handler
+    for value in (0, 1, 1234.5):
+        assert edited.format(value) == expected.format(value)
+
+    # The previous format code is left untouched
+    assert fc.format_string == FormatCode(line).format_string
+    assert all(part.fc is fc for part in fc.parts)
+
+
+@pytest.mark.parametrize(['line', 'start', 'end', 'text'], [
+    (r'0.00;-0.00;"zero"', 10, 17, ''),
+    (r'0.00;-0.00', 10, 10, ';"zero"'),
+    (r'"$"#,##0.00_);[Red]\("$"#,##0.00\);"-";"Hello, "@', 45, 45, 'World'),
+    (r'# ?/8;-0.0;0', 10, 12, ''),
+])
+def test_edit_lazy(line, start, end, text):
+    # Parts of a lazy format code are configured after the edit, with the sections of the edited one
+    edited = FormatCode(line, lazy=True).edit(start, end, text)
+    expected = FormatCode(line[:start] + text + line[end:])
+    assert all(part.fc is edited and part.handler.part is part for part in edited.parts)
+    for value in (0, 1, -1, 1234.5, -0.25):
+        assert edited.format(value) == expected.format(value)
+    # A part configured again gets a new handler
+    part = edited.pos_part
+    handler = part.handler
+    FormatCode.shared_handlers.clear()
+    part.configure()
+    assert part.handler is not handler
+    assert edited.format(1234.5) == expected.format(1234.5)
+
+
+@pytest.mark.parametrize(['line', 'start', 'end', 'text'], [
+    (r'[>-5]0.00;;0', 10, 10, '0'),
+    (r'[>-5]0.00;0;0', 10, 11, ''),
+    (r'0.00;;"zero"', 5, 5, '[Red]0.0'),
+    (r'#,##0;(#,##0)', 6, 13, ''),
+])
+def test_edit_negative_section(line, start, end, text):
+    # Kept parts are configured again when the negative section they depend on changes
+    edited = FormatCode(line).edit(start, end, text)
+    expected = FormatCode(line[:start] + text + line[end:])
+    for value in (0, 1.5, -1.5, -1234.5, -10):
+        assert edited.format(value) == expected.format(value)
+
+
+def test_edit_relexes_touched_sections_only():
+    fc = FormatCode(r'"£"#,##0.00;[Red]\-"£"#,##0.00;"-";@')
+    edited = fc.edit(0, 3, '"$"')
+
+    assert edited.pos_part.tokens is not fc.pos_part.tokens
+    assert edited.neg_part.tokens is fc.neg_part.tokens
+    assert edited.else_part.tokens is fc.else_part.tokens
+    assert edited.str_part.tokens is fc.str_part.tokens
+    assert edited.format(1234.5) == '$1,234.50'
+
+    with pytest.raises(PartsCountError):
+        fc.edit(0, 0, '0;')
+
+
+def test_get():
+    FormatCode.cache.clear()
+    fc = FormatCode.get('0.00;[Red]\\-0.00')
+    assert FormatCode.get('0.00;[Red]\\-0.00') is fc
+    assert FormatCode.get('0.00;[Red]\\-0.00', asterisk_repeat_count=2) is not fc
+    assert FormatCode('0.00;[Red]\\-0.00') is not fc
+
+    info = FormatCode.cache.info()
+    assert (info.hits, info.misses, info.entries) == (1, 2, 2)
+    assert info.size > 0
+
+    with pytest.raises(PartsCountError):
+        FormatCode.get('0;0;0;0;0')
+
+
+def test_get_failure():
+    FormatCode.cache.clear()
+    for _ in range(2):
+        with pytest.raises(PartsCountError):
+            FormatCode.get('0;0;0;0;0')
+    assert FormatCode.cache.info().failure_hits == 1
+
+    fc = FormatCode.get('0;0;0;0;0', fallback='0.00')
+    assert fc is FormatCode.get('0.00')
+    assert FormatCode.get('[Red][Blue]0', fallback='0.00') is fc
+    assert [failure.error for failure in FormatCode.cache.failures()] == [PartsCountError, DuplicateUniqueToken]
+
+
+def test_builtin():
+    fc = FormatCode.builtin(4)
+    assert FormatCode.builtin(4) is fc
+    assert fc.format(1234.5) == '1,234.50'
+    assert FormatCode.builtin(0).format(1.5) == '1.5'
+
+    assert FormatCode.builtin(14).source_line == 'm/d/yyyy;-m/d/yyyy'
+    assert FormatCode.builtin(14, language_id=0x809).source_line == 'dd/mm/yyyy;-dd/mm/yyyy'
+    assert FormatCode.builtin(14, language_id=0x419) is FormatCode.builtin(14)
+    assert FormatCode.builtin(4, language_id=0x809) is fc
+
+    # The date system is part of the shared format
+    assert FormatCode.builtin(14, date1904=True) is not FormatCode.builtin(14)
+    assert FormatCode.builtin(14, date1904=True) is FormatCode.builtin(14, date1904=True)
+    assert FormatCode.builtin(14, date1904=True).format(1) == '1/2/1904'
+    assert FormatCode.builtin(14).format(1) == '1/1/1900'
+
+    with pytest.raises(BuiltinFormatError):
+        FormatCode.builtin(27)
+
+
+def test_shared_sections():
+    fc_1 = FormatCode('#,##0.00;[Red]\\-"£"#,##0.00')
+    fc_2 = FormatCode('0%;[Red]\\-"£"#,##0.00')
+    assert fc_1.neg_part.tokens is fc_2.neg_part.tokens
+    assert fc_1.neg_part.handler is fc_2.neg_part.handler
+    assert fc_1.neg_part is not fc_2.neg_part
+    assert fc_1.neg_part.token_types is fc_2.neg_part.token_types
+
+    # The same section depends on whether there is a zero section
+    fc_3 = FormatCode('0%;[Red]\\-"£"#,##0.00;"-"')
+    assert fc_3.neg_part.tokens is fc_2.neg_part.tokens
+    assert fc_3.neg_part.handler is not fc_2.neg_part.handler
+
+    assert FormatCode('0', asterisk_repeat_count=2).pos_part.handler is not FormatCode('0').pos_part.handler
+    assert fc_2.format(-1234.5) == '-£1,234.50'
+    assert fc_3.format(0) == '-'
+
+
+def test_lazy():
+    line = '#,##0.00_);[Red]\\(#,##0.00\\);"zero";"Text: "@'
+    fc = FormatCode(line, lazy=True)
+    assert not any(part.configured for part in fc.parts)
+    assert fc.format(1234.5) == FormatCode(line).format(1234.5)
+    assert [part.configured for part in fc.parts] == [True, False, False, False]
+    assert fc.pos_part.handler is FormatCode(line).pos_part.handler
+
+    edited = fc.edit(0, 0, '"$"')
+    assert edited.lazy
+    assert edited.format(-1) == FormatCode('"$"' + line).format(-1)
+
+    with pytest.raises(PartsCountError):
+        FormatCode('0;0;0;0;0', lazy=True)
+
+
+def test_lazy_threads():
+    fc = FormatCode('0.000;-0.000', lazy=True)
+    results = []
+
+    def worker():
+        results.append([fc.format(value) for value in (1.5, -2, 3)])
+
+    threads = [Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [['1.500', '-2.000', '3.000']] * 8
+
+
+def test_shared_threads():
+    codes = [FormatCode(line) for line in ('#,##0.00_);(#,##0.00)', '0%', '# ?/?', '0.0E+00', '$#,##0;-$#,##0;"-"')]
+    values = [0, 1, -1, 0.5, 1234.5678, -1234.5678, 99.995]
+    expected = [fc.format(value) for fc in codes for value in values]
+    results = []
+
+    def worker():
+        for _ in range(20):
+            results.append([fc.format(value) for fc in codes for value in values])
+
+    threads = [Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [expected] * 160
+
+
+@pytest.mark.parametrize('line, value, result', (
+    ('#,##0.00', '2751.59', '2,751.59'),
+    ('#,##0.00', '-2751.595', '-2,751.60'),
+    ('0.00', '12345678901234567890.125', '12345678901234567890.13'),
+    ('0.0%', '1.5E-3', '0.2%'),
+    ('0;-0;"zero";@', '-0.000', 'zero'),
+    ('0;(0)', '-12', '(12)'),
+    ('[>=100]0.0;0', '100', '100.0'),
+    ('General', '2751.59', '2751.59'),
+))
+def test_format_number_string(line, value, result):
+    assert FormatCode(line).format(value) == result
+
+
+def test_format_many():
+    fc = FormatCode('#,##0.00;(#,##0.00)')
+    assert fc.format_many(['1234.5', -2, 0.125, None]) == ['1,234.50', '(2.00)', '0.13', None]
+    assert fc.format_many(iter([])) == []
@@ -0,0 +1,71 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+from decimal import Decimal
+
+import pytest
+
+from formatcode.convert.fc import FormatCode
+from formatcode.convert.general import GeneralFormatter
+
+
+@pytest.mark.parametrize('value, result', (
+    (0, '0'),
+    (-0.0, '0'),
+    (12.0, '12'),
+    (-2751.59, '-2751.59'),
+    (0.1 + 0.2, '0.3'),
+    (1 / 3, '0.333333333'),
+    (-100 / 3, '-33.33333333'),
+    (1234567890.5, '1234567891'),
+    (12345678901, '12345678901'),
+    (9.9999999999, '10'),
+    (99999999999.6, '1E+11'),
+    (123456789012, '1.23457E+11'),
+    (0.0001, '0.0001'),
+    (0.000123456789, '0.000123457'),
+    (1e-05, '1E-05'),
+    (-1.5e-07, '-1.5E-07'),
+    (1e100, '1E+100'),
+    (1.23456789e-100, '1.2346E-100'),
+    (Decimal('1E+3'), '1000'),
+    (Decimal('0.1000000000000000000001'), '0.1'),
+    ('007', '7'),
+    ('2751.59', '2751.59'),
+))
+def test_general_formatter(value, result):
+    assert GeneralFormatter()(value) == result
+
+
+def test_general_formatter_options():
+    assert GeneralFormatter(strip_sign=True)(-2751.59) == '2751.59'
+    assert GeneralFormatter(strip_sign=True)(Decimal('-1E+20')) == '1E+20'
+    assert GeneralFormatter(width=6)(1234.5678) == '1234.6'
+    assert GeneralFormatter().many([1 / 3, -5, 1e20]) == ['0.333333333', '-5', '1E+20']
+
+    with pytest.raises(ValueError):
+        GeneralFormatter()(float('nan'))
+
+
+@pytest.mark.parametrize('strip_sign', (False, True))
+def test_general_many(strip_sign):
+    formatter = GeneralFormatter(strip_sign=strip_sign)
+    values = [0, -0.0, 12.0, -2751.59, 1 / 3, 99999999999.5, 9999999999.95, 1e-4, 1e-05, 1e20, -12345678901,
+              123456789012, -99999999999, 10 ** 11, Decimal('-1.5'), '2.5']
+    assert formatter.many(values) == [formatter(value) for value in values]
+
+
+def test_general_format():
+    fc = FormatCode('General')
+    assert fc.general is not None
+    assert fc.format(-1234.5) == '-1234.5'
+    assert fc.format(12345678901234567890) == '1.23457E+19'
+    assert fc.format('text') == 'text'
+    assert fc.format_many([1 / 3, 'text', None, '1.5E-3']) == ['0.333333333', 'text', None, '0.0015']
+
+    fc = FormatCode('0;General')
+    assert fc.general is None
+    assert fc.format(-1 / 3) == '0.333333333'
+    assert FormatCode('0 "general"').format(5) == '5 general'
+    assert FormatCode('0;-0').edit(0, 4, 'General').general is not None
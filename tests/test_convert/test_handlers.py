@@ -122,3 +122,45 @@ def test_digit_handler():
     assert len(neg_h.left_mask) == 2
     assert len(neg_h.right_mask) == 1
     assert len(neg_h.extension_mask) == 2
+
+
+def test_digit_handler_compile():
+    fc = FormatCode('#,##0.00_);(#,##0.00);"zero"')
+    h = fc.pos_part.handler
+    left_values = [token.value for token in h.left_mask.tokens]
+
+    assert h.formatter is not None
+    assert h.format(1234.567) == '1,234.57 '
+    assert h.format(0.5) == '0.50 '
+    assert fc.neg_part.handler.format(-1234.567) == '(1,234.57)'
+    assert fc.format(0) == 'zero'
+    # Masks are read at compile time only
+    assert [token.value for token in h.left_mask.tokens] == left_values
+
+    # A new formatter is compiled with the zero section
+    start = fc.source_line.index('"zero"')
+    edited = fc.edit(start, len(fc.source_line), '0')
+    assert edited.pos_part.handler.formatter is not h.formatter
+
+
+@pytest.mark.parametrize('value, result', [
+    (44.398, ' 44.398'),
+    (102.65, '102.65 '),
+    (2.8, '  2.8  '),
+    (0.5, '   .5  '),
+])
+def test_digit_handler_question_decimals(value, result):
+    assert FormatCode('???.???').format(value) == result
+
+
+def test_digit_handler_scale():
+    assert FormatCode('0%').format(0.5) == '50%'
+    assert FormatCode('0.0%').format(0.1234) == '12.3%'
+    assert FormatCode('#,##0,').format(1234567) == '1,235'
+    assert FormatCode('0.0,,').format(1234567) == '1.2'
+    assert FormatCode('# ?/?%').pos_part.handler.scale == 2
+
+    # Rounding carries into the integer digits
+    assert FormatCode('0.00').format(999.999) == '1000.00'
+    assert FormatCode('#,##0.0').format(999999.96) == '1,000,000.0'
+    assert FormatCode('0.00').format(1e-05) == '0.00'
@@ -0,0 +1,64 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+from decimal import Decimal
+
+import pytest
+
+from formatcode.convert.fc import FormatCode
+from formatcode.convert.kernels import no_negative_zero
+
+
+def test_no_negative_zero():
+    assert no_negative_zero(['-0']) == '0'
+    assert no_negative_zero(['-0', '.', '00']) == '-0.00'
+    assert no_negative_zero(['-12']) == '-12'
+
+
+@pytest.mark.parametrize('line, kernels', (
+    ('#,##0', ['integer', 'integer', 'constant', 'text']),
+    ('#,##0.00_);(#,##0.00);"-"', ['fixed', 'fixed', 'constant', 'text']),
+    ('0.00%', ['percent', 'percent', 'constant', 'text']),
+    ('# ?/?', ['fraction', 'fraction', 'constant', 'text']),
+    ('0.0E+00', ['scientific', 'scientific', 'constant', 'text']),
+    (';;;', ['constant', 'constant', 'constant', 'constant']),
+    ('0;0;0;"text"', ['integer', 'integer', 'constant', 'constant']),
+    ('General', ['general', 'constant', 'constant', 'text']),
+))
+def test_kernels(line, kernels):
+    assert FormatCode(line).kernels() == kernels
+    assert FormatCode(line, lazy=True).kernels() == kernels
+
+
+@pytest.mark.parametrize('line', (
+    '0', '#,##0', '$#,##0_);($#,##0)', '0.00', '#,##0.00;[Red]-#,##0.00', '0%', '0.0%', '0;-0;"zero"', '0.00 "USD"',
+    '#,##0_);(#,##0);"-"',
+))
+def test_kernel_output(line):
+    values = [0, 0.0, -0.0, 1, -1, 0.5, -0.5, 2.5, 999.999, -0.004, 1234.5678, -1234.5678, 1e-05, 1e16,
+              Decimal('-0.001'), Decimal('1E+3'), float('nan'), 12345678901234567890]
+    for part in FormatCode(line).parts:
+        handler = part.handler
+        if part.kernel in ('integer', 'fixed', 'percent', 'constant') and hasattr(handler, 'compile'):
+            general = handler.compile()
+            for value in values:
+                try:
+                    expected = general(value)
+                except ValueError:
+                    with pytest.raises(ValueError):
+                        handler.format(value)
+                else:
+                    assert handler.format(value) == expected
+
+
+def test_text_kernel():
+    assert FormatCode('0;-0;0;"Hello, "@"!"').format('world') == 'Hello, world!'
+    assert FormatCode('0;-0;0;@@').format('ab') == 'abab'
+    assert FormatCode('0;-0;0;"text"').format('ab') == 'text'
+    fc = FormatCode('0;-0;0;"Hello, "@"!"')
+    assert fc.format_many(['world', 1.5, '2', None]) == ['Hello, world!', '2', '2', None]
+    # Without a text section text is shown as it is
+    assert FormatCode('@').format('abc') == 'abc'
+    assert FormatCode('0.00;[>5]0').format('abc') == 'abc'
+    assert FormatCode('0.00').format_many(['abc', 1]) == ['abc', '1.00']
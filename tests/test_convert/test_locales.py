@@ -0,0 +1,71 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+import pytest
+
+from formatcode.convert.fc import FormatCode
+from formatcode.convert.locales import (DATE_NAMES, ENGLISH, compile_translation, get_date_names,
+                                       get_number_translation)
+
+
+def test_get_date_names():
+    assert get_date_names() is ENGLISH
+    assert get_date_names(0x409) is ENGLISH
+    assert get_date_names(0x407) is DATE_NAMES[0x07]
+    # de-AT falls back to German, unknown languages to English
+    assert get_date_names(0xC07) is DATE_NAMES[0x07]
+    assert get_date_names(0x42B) is ENGLISH
+    assert get_date_names(0x404).day_abbreviations[0] == '週一'
+
+
+def test_date_names_tables():
+    for names in DATE_NAMES.values():
+        assert len(names.months) == len(names.month_abbreviations) == len(names.genitive_months) == 13
+        assert len(names.days) == len(names.day_abbreviations) == 7
+    assert DATE_NAMES[0x19].genitive_months[6] == 'июня'
+    assert DATE_NAMES[0x07].genitive_months is DATE_NAMES[0x07].months
+
+
+def test_get_number_translation():
+    assert get_number_translation() is None
+    assert get_number_translation(0x409) is None
+    assert get_number_translation(0x401, 0) is None
+
+    table, inverse = get_number_translation(0x407)
+    assert '1,234.5'.translate(table) == '1.234,5'
+    table, inverse = get_number_translation(0x419)
+    assert '1,234.5'.translate(table) == '1\xa0234,5'
+    assert 'p.a.'.translate(inverse).translate(table) == 'p.a.'
+    table, inverse = get_number_translation(0x401, 0x02)
+    assert '1,234.5'.translate(table) == '\u0661\u066c\u0662\u0663\u0664\u066b\u0665'
+    assert 'No.1'.translate(inverse).translate(table) == 'No.1'
+
+
+@pytest.mark.parametrize('language_id, number_system', ((0x407, None), (0x419, None), (0x807, None), (0x401, 0x02)))
+def test_compile_translation(language_id, number_system):
+    table, inverse = get_number_translation(language_id, number_system)
+    translate = compile_translation(table)
+    for line in ('', '-1,234,567.89 \u20ac', '1\xa0234,5', "1'234.5", '\u0661\u066c\u0662.,'):
+        assert translate(line) == line.translate(table)
+        assert translate(line.translate(inverse)) == line
+
+
+@pytest.mark.parametrize('line, value, result', (
+    ('#,##0.00 [$€-407]', 1234567.891, '1.234.567,89 €'),
+    ('#,##0.00 "p.a." [$-407]', -1234.5, '-1.234,50 p.a. '),
+    ('#,##0.00 [$€-401]', 1234.5, '1,234.50 €'),
+    ('[$-807]#,##0.00', 1234567.5, "1'234'567.50"),
+    ('[$-40C]#,##0', 1234567, '1\u202f234\u202f567'),
+    ('[$-4000439]0.0%', 0.1234, '\u0967\u0968.\u0969%'),
+    ('[$-2010401]#,##0.00 "No.1"', 1234.5, '\u0661\u066c\u0662\u0663\u0664\u066b\u0665\u0660 No.1'),
+    ('[$-407]0.00E+00" m."', 12345, '1,23E+04 m.'),
+    ('[$-407]# ?/?', 1.5, '1 1/2'),
+    ('[$-407]General', 1234.5, '1234,5'),
+    ('0.0;[$-407]General', -1234.5, '1234,5'),
+    ('[$-2000401]General', 1234.5, '\u0661\u0662\u0663\u0664\u066b\u0665'),
+))
+def test_localized_format(line, value, result):
+    fc = FormatCode(line)
+    assert fc.format(value) == result
+    assert fc.format_many([value]) == [result]
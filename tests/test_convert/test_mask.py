@@ -2,6 +2,8 @@
 
 from __future__ import division, print_function, unicode_literals
 
+import pytest
+
 from formatcode.convert.mask import Mask
 
 
@@ -25,3 +27,16 @@ def test_mask():
     assert len(mask) == 3
     assert mask[0].value == '#'
     assert mask[0].type == mask.PH
+
+
+def test_mask_freeze():
+    mask = Mask()
+    mask.add('#', mask.PH)
+    mask.add('one', mask.STRING)
+    assert mask.freeze() is mask
+    assert mask.tokens == (('#', mask.PH), ('one', mask.STRING))
+
+    with pytest.raises(AttributeError):
+        mask[0].value = ' '
+    with pytest.raises(AttributeError):
+        mask.add(',', mask.COMMA)
@@ -0,0 +1,53 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+import pytest
+
+from formatcode.convert.fc import FormatCode
+from formatcode.convert.placement import compile_decimals, compile_placement, group_thousands
+
+
+def test_group_thousands():
+    assert group_thousands('') == ''
+    assert group_thousands('5') == '5'
+    assert group_thousands('999') == '999'
+    assert group_thousands('1000') == '1,000'
+    assert group_thousands('1234567') == '1,234,567'
+    assert group_thousands('100000001') == '100,000,001'
+
+
+@pytest.mark.parametrize('line, results', (
+    ('#,##0', ['0', '5', '1,234', '1,234,567']),
+    ('0,000', ['0,000', '0,005', '1,234', '1,234,567']),
+    ('?,??0', ['    0', '    5', '1,234', '1,234,567']),
+    ('#,###', ['', '5', '1,234', '1,234,567']),
+    ('00000', ['00000', '00005', '01234', '1234567']),
+    ('"$"#,##0', ['$0', '$5', '$1,234', '$1,234,567']),
+    ('(000) 000-0000', ['(000) 000-0000', '(000) 000-0005', '(000) 000-1234', '(000) 123-4567']),
+    ('0" "000', ['0 000', '0 005', '1 234', '1234 567']),
+))
+def test_compile_placement(line, results):
+    handler = FormatCode(line).pos_part.handler
+    place = compile_placement(handler.left_mask.tokens, handler.by_thousand)
+    assert [place(digits) for digits in ('', '5', '1234', '1234567')] == results
+
+
+@pytest.mark.parametrize('line, value, result', (
+    ('0,000.00', 5, '0,005.00'),
+    ('?,??0.0', 1234567.25, '1,234,567.3'),
+    ('#.00', -0.5, '-.50'),
+    ('"0"#', 0, '0'),
+    ('(000) 000-0000', 5551234567, '(555) 123-4567'),
+))
+def test_placement_format(line, value, result):
+    assert FormatCode(line).format(value) == result
+
+
+def test_compile_decimals():
+    assert compile_decimals('00')('50') == '50'
+    assert compile_decimals('##')('50') == '5'
+    assert compile_decimals('##')('00') == ''
+    assert compile_decimals('??')('50') == '5 '
+    assert compile_decimals('0#?')('000') == '0 '
+    assert compile_decimals('0#?')('123') == '123'
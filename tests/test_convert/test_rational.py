@@ -0,0 +1,60 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+import random
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from formatcode.convert.fc import FormatCode
+from formatcode.convert.rational import limit_denominator
+
+
+def test_limit_denominator():
+    assert limit_denominator(314159, 100000, 9) == (22, 7)
+    assert limit_denominator(314159, 100000, 99) == (311, 99)
+    assert limit_denominator(314159, 100000, 999) == (355, 113)
+    assert limit_denominator(50, 100, 9) == (1, 2)
+    assert limit_denominator(999, 1000, 9) == (1, 1)
+    assert limit_denominator(0, 1000, 9) == (0, 1)
+
+    rnd = random.Random(0)
+    for _ in range(1000):
+        denominator = 10 ** rnd.randint(1, 8)
+        numerator = rnd.randint(0, denominator)
+        max_denominator = rnd.choice((9, 99, 999))
+        fraction = Fraction(numerator, denominator).limit_denominator(max_denominator)
+        assert limit_denominator(numerator, denominator, max_denominator) == (fraction.numerator,
+                                                                             fraction.denominator)
+
+
+@pytest.mark.parametrize('line, value, result', (
+    ('# ?/?', 0.25, ' 1/4'),
+    ('# ?/?', 3.14159, '3 1/7'),
+    ('# ?/?', -2.75, '-2 3/4'),
+    ('# ?/?', 5, '5    '),
+    ('# ?/?', 0, '0    '),
+    ('# ?/?', 0.999, '1    '),
+    ('# ??/??', 0.25, '  1/4 '),
+    ('# ??/??', 3.14159, '3 14/99'),
+    ('# ???/???', 3.14159, '3  16/113'),
+    ('?/?', 1.5, '3/2'),
+    ('?/?;(?/?)', -2.75, '(11/4)'),
+    ('# ?/16', 0.25, ' 4/16'),
+    ('# ?/16', 0.999, '1     '),
+    ('# ?/4" in"', 1.5, '1 2/4 in'),
+    ('#,##0 ?/?', 12345.5, '12,345 1/2'),
+    ('# ?/?', Decimal('0.3333333333333333333333'), ' 1/3'),
+    ('# ?/?', '2.125', '2 1/8'),
+))
+def test_fraction_format(line, value, result):
+    assert FormatCode(line).format(value) == result
+
+
+def test_fraction_format_many():
+    fc = FormatCode('# ??/??;(# ??/??);"zero"')
+    values = [0.25, -1.5, 0, 0.25, 3.14159, '2.125', None]
+    assert fc.format_many(values) == ['  1/4 ', '(1  1/2 )', 'zero', '  1/4 ', '3 14/99', '2  1/8 ', None]
+    assert fc.pos_part.handler.formatter.many([0.25, 0.25]) == ['  1/4 ', '  1/4 ']
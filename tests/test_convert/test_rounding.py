@@ -0,0 +1,72 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+from decimal import Decimal
+
+import pytest
+
+from formatcode.convert.fc import FormatCode
+from formatcode.convert.rounding import DecimalRounding, decompose, fixed_string, round_fixed
+
+
+@pytest.mark.parametrize('value, result', (
+    (0, (False, 0, 0)),
+    (-1234, (True, 1234, 0)),
+    (0.5, (False, 5, -1)),
+    (-0.0, (True, 0, -1)),
+    (1234.5678, (False, 12345678, -4)),
+    (1e-05, (False, 1, -5)),
+    (1e16, (False, 1, 16)),
+    (Decimal('1.50'), (False, 150, -2)),
+    (Decimal('-1E+3'), (True, 1000, 0)),
+    (Decimal('0.000'), (False, 0, -3)),
+    ('-2.5', (True, 25, -1)),
+))
+def test_decompose(value, result):
+    assert decompose(value) == result
+
+
+@pytest.mark.parametrize('value', (float('nan'), float('inf'), Decimal('NaN'), True, None, 'abc', '1.2.3'))
+def test_decompose_error(value):
+    with pytest.raises(ValueError):
+        decompose(value)
+
+
+@pytest.mark.parametrize('value, decimals, result', (
+    ('0.125', 2, '0.13'),
+    ('2.5', 0, '3'),
+    ('-2.5', 0, '-3'),
+    ('999.999', 2, '1000.00'),
+    ('5', 2, '5.00'),
+    ('-0.4', 0, '0'),
+    ('-0.004', 2, '0.00'),
+    ('-0.0', 0, '-0'),
+    ('-0.0', 2, '-0.00'),
+    ('12345678901234567890.5', 0, '12345678901234567891'),
+    ('1.50', None, '1.50'),
+    (2.675, 2, '2.68'),
+    (1e16, 1, '10000000000000000.0'),
+))
+def test_fixed_string(value, decimals, result):
+    assert fixed_string(decompose(value), decimals) == result
+
+
+def test_round_fixed_scale():
+    assert round_fixed(decompose(0.125), 1, 2) == ('', '12', '5')
+    assert round_fixed(decompose(-1234567), 0, -3) == ('-', '1235', '')
+    assert round_fixed(decompose(499), 0, -3) == ('', '0', '')
+
+
+@pytest.mark.parametrize('decimals, scale', ((0, 0), (2, 0), (1, 2), (0, -3)))
+def test_decimal_rounding(decimals, scale):
+    rounding = DecimalRounding(decimals, scale)
+    for value in ('0.125', '-0.004', '-0', '0E+3', '999.995', '-2.5', '1E+30', '12345678901234567890.125'):
+        value = Decimal(value)
+        assert rounding(value) == round_fixed(decompose(value), decimals, scale)
+
+
+def test_decimal_rounding_exact():
+    assert DecimalRounding(2)(Decimal('12345678901234567890.125')) == ('', '12345678901234567890', '13')
+    assert DecimalRounding(0, -3)(Decimal('-1E+40')) == ('-', '1' + '0' * 37, '')
+    assert FormatCode('#,##0.00').format(Decimal('1234567890123456789.005')) == '1,234,567,890,123,456,789.01'
@@ -0,0 +1,48 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+from decimal import Decimal
+
+import pytest
+
+from formatcode.convert.fc import FormatCode
+
+
+@pytest.mark.parametrize('line, value, result', (
+    ('0.0E+00', 12, '1.2E+01'),
+    ('0.0E+00', 0.12, '1.2E-01'),
+    ('0.0E+00', 0, '0.0E+00'),
+    ('0.0E+00', -1234.5, '-1.2E+03'),
+    ('0.0E+00', 9.95, '1.0E+01'),
+    ('0.0E-?0', 12, '1.2E 1'),
+    ('0.0E-#0', 0.12, '1.2E-1'),
+    ('0.00E+00', 1e-300, '1.00E-300'),
+    ('0.00E+00', Decimal('1.5E+400'), '1.50E+400'),
+    ('0.00E+00', '2751.59', '2.75E+03'),
+    ('0E+0', 2.5, '3E+0'),
+    ('##0.0E+0', 12345, '12.3E+3'),
+    ('##0.0E+0', 0.12, '120.0E-3'),
+    ('##0.0E+0', 999.96, '1.0E+3'),
+    ('00.0E+0', 1234, '12.3E+2'),
+    ('#.##E+00', 12, '1.2E+01'),
+    ('0.00E+00;(0.00E+00);"zero"', -1234.5, '(1.23E+03)'),
+    ('0.00E+00;(0.00E+00);"zero"', 0, 'zero'),
+    ('0.0E+00" m"', 1500, '1.5E+03 m'),
+))
+def test_scientific_format(line, value, result):
+    assert FormatCode(line).format(value) == result
+
+
+def test_scientific_format_many():
+    fc = FormatCode('0.00E+00')
+    values = [1.5e-07, -2.5e12, 0, '6.02214076E+23', None]
+    assert fc.format_many(values) == ['1.50E-07', '-2.50E+12', '0.00E+00', '6.02E+23', None]
+
+
+@pytest.mark.parametrize('line', ('0.00E+00', '##0.0E+0', '0E-0', '00.0E+00%', '#.##E+00;(#.##E+00);"zero"'))
+def test_scientific_many(line):
+    fc = FormatCode(line)
+    values = [9.995, -99.95, 999.96, 0.5, 2.5, 1e-300, 123456789012345678901234567890, -0.0, 0, 1.5e-07, 0.0015,
+              Decimal('-2.55'), '6.02214076E+23', 10 ** 6 - 1, 7.0]
+    assert fc.format_many(values) == [fc.format(value) for value in values]
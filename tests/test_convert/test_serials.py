@@ -0,0 +1,91 @@
+# coding: utf-8
+
+from __future__ import division, print_function, unicode_literals
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from formatcode.convert.fc import FormatCode
+from formatcode.convert.serials import DATE_1900, DATE_1904, OUT_OF_RANGE, civil_from_days, get_date_system
+from tests.examples import examples
+
+
+def test_civil_from_days():
+    epoch = date(1970, 1, 1)
+    for days in range(-719162, 2932896, 997):
+        day = epoch + timedelta(days=days)
+        assert civil_from_days(days) == (day.year, day.month, day.day)
+
+
+@pytest.mark.parametrize('value, fields', (
+    (0, (1900, 1, 0, 0, 0, 0, 5, 0)),
+    (1, (1900, 1, 1, 0, 0, 0, 6, 0)),
+    (59, (1900, 2, 28, 0, 0, 0, 1, 0)),
+    (60, (1900, 2, 29, 0, 0, 0, 2, 0)),
+    (61, (1900, 3, 1, 0, 0, 0, 3, 0)),
+    (43256.584039351852, (2018, 6, 5, 14, 1, 1, 1, 0)),
+    ('43256.25', (2018, 6, 5, 6, 0, 0, 1, 0)),
+    (Decimal('43256.75'), (2018, 6, 5, 18, 0, 0, 1, 0)),
+    (2958465, (9999, 12, 31, 0, 0, 0, 4, 0)),
+    # Rounded to the second, up to the next day
+    (1.999999, (1900, 1, 2, 0, 0, 0, 0, 0)),
+    (1.99999, (1900, 1, 1, 23, 59, 59, 6, 0)),
+))
+def test_fields_1900(value, fields):
+    assert DATE_1900.fields(value) == fields
+    if not isinstance(value, str):
+        assert DATE_1900.serial(fields) == round(float(value) * 86400) / 86400
+
+
+def test_fields():
+    assert DATE_1904.fields(0) == (1904, 1, 1, 0, 0, 0, 4, 0)
+    assert DATE_1904.fields(43256.5) == (2022, 6, 6, 12, 0, 0, 0, 0)
+    assert get_date_system(True) is DATE_1904
+    assert DATE_1904.serial((1903, 12, 31, 18, 0, 0, 3, 0)) == -0.25
+    assert get_date_system() is DATE_1900
+
+    # Just over half a millisecond is rounded up
+    assert DATE_1900.fields(Decimal('1.00000000578704'), 3) == (1900, 1, 1, 0, 0, 0, 6, 1000)
+    assert DATE_1900.fields(Decimal('1.00000000578703'), 3) == (1900, 1, 1, 0, 0, 0, 6, 0)
+    assert DATE_1900.fields(1.5 + 1.25 / 86400, 1) == (1900, 1, 1, 12, 0, 1, 6, 300000)
+    with pytest.raises(ValueError):
+        DATE_1900.fields(-1)
+    with pytest.raises(ValueError):
+        DATE_1900.fields(float('nan'))
+    with pytest.raises(ValueError):
+        DATE_1900.fields(2958466)
+
+
+@pytest.mark.parametrize('value, result, line', [example for example in examples
+                                                 if isinstance(example[0], (int, float))
+                                                 and any(symbol in example[2] for symbol in 'ymdhs')
+                                                 and '[' not in example[2]])
+def test_serial_format(value, result, line):
+    assert FormatCode(line).format(value) == result
+
+
+def test_serial_format_1904():
+    assert FormatCode('yyyy-mm-dd', date1904=True).format(0) == '1904-01-01'
+    assert FormatCode.get('yyyy-mm-dd', date1904=True).format(0) == '1904-01-01'
+    assert FormatCode.get('yyyy-mm-dd').format(0) == '1900-01-00'
+    assert FormatCode('yyyy-mm-dd', date1904=True).edit(4, 5, '/').format(1) == '1904/01-02'
+
+
+def test_serial_format_many():
+    fc = FormatCode('dd/mm/yyyy hh:mm:ss.0')
+    values = [43256.584039351852, None, 61, '1.5', 1.99999999]
+    assert fc.format_many(values) == ['05/06/2018 14:01:01.0', None, '01/03/1900 00:00:00.0',
+                                      '01/01/1900 12:00:00.0', '02/01/1900 00:00:00.0']
+    assert fc.format_many(values) == [fc.format(value) for value in values]
+
+
+def test_serial_out_of_range():
+    assert OUT_OF_RANGE == '###########'
+    assert FormatCode('mm-dd-yy').format(-1234.5) == OUT_OF_RANGE
+    assert FormatCode.builtin(14).format(-1) == OUT_OF_RANGE
+    assert FormatCode('yyyy-mm-dd').format(2958466) == OUT_OF_RANGE
+    assert FormatCode('hh:mm').format(timedelta(hours=-1)) == OUT_OF_RANGE
+    assert FormatCode('mm-dd-yy').format_many([1, -1, float('inf'), '2']) == ['01-01-00', OUT_OF_RANGE, OUT_OF_RANGE,
+                                                                             '01-02-00']
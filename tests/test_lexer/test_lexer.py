@@ -4,7 +4,7 @@ from __future__ import division, print_function, unicode_literals
 
 import pytest
 
-from formatcode.lexer.lexer import DuplicateUniqueToken, MatchError, to_tokens_line
+from formatcode.lexer.lexer import DuplicateUniqueToken, MatchError, to_tokens_block, to_tokens_line
 from formatcode.lexer.tokens import (AmPmToken, AsteriskSymbol, AtSymbol, BlockDelimiter, ColorToken, CommaDelimiter,
                                      ConditionToken, DateTimeToken, DotDelimiter, EToken, GeneralToken, HashToken,
                                      LocaleCurrencyToken, PercentageSymbol, QToken, SlashSymbol, StringSymbol,
@@ -93,3 +93,36 @@ def test_to_tokens_line_with_error():
         to_tokens_line('[ss][mm]')
     with pytest.raises(DuplicateUniqueToken):
         to_tokens_line('[$$-409][$$-409]0.0')
+
+
+def test_to_tokens_line_positional_rules():
+    # Underscore reserves the width of the next character.
+    assert to_classes(to_tokens_line('0_)')) == [ZeroToken, StringSymbol]
+    assert to_tokens_line('0_)')[1].value == ' '
+
+    # General is case-insensitive only when it is the rest of the line.
+    assert to_classes(to_tokens_line('0general')) == [ZeroToken, GeneralToken]
+
+    # Duplicated unique tokens are allowed in different blocks, dots may repeat.
+    assert len(to_tokens_line('[Red]0;[Red]0')) == 5
+    assert to_classes(to_tokens_line('0.0.0')) == [ZeroToken, DotDelimiter] * 2 + [ZeroToken]
+
+
+def test_to_tokens_line_long():
+    section = '[Red]\\-"£"#,##0.00_);'
+    tokens = to_tokens_line(section * 500)
+    assert len(tokens) == len(to_tokens_line(section)) * 500
+
+
+def test_to_tokens_block():
+    line = '[Red]0.0;[Red]#_;;@'
+    tokens, pos = to_tokens_block(line)
+    assert to_classes(tokens) == [ColorToken, ZeroToken, DotDelimiter, ZeroToken, BlockDelimiter]
+    assert pos == 9
+
+    # The delimiter after an underscore does not end the block
+    tokens, pos = to_tokens_block(line, pos)
+    assert to_classes(tokens) == [ColorToken, HashToken, StringSymbol, BlockDelimiter]
+    assert pos == len(line) - 1
+
+    assert to_classes(to_tokens_block(line, pos)[0]) == [AtSymbol]
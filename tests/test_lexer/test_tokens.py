@@ -215,3 +215,49 @@ def test_locale_currency():
 
     assert LocaleCurrencyToken.match('[$$-fffffffff]') is None
     assert LocaleCurrencyToken.match('[-fffffffff]') is None
+
+
+def test_compact_tokens():
+    token = ConditionToken('[>=-12.5]')
+    assert not hasattr(token, '__dict__')
+    assert token.cleaned_data == {'op': '>=', 'value': -12.5}
+
+    token = LocaleCurrencyToken('[$USD-409]')
+    assert token.cleaned_data == {'curr': 'USD', 'info': 0x409}
+
+    assert not hasattr(ZeroToken('0'), '__dict__')
+    assert StringSymbol('"hello"').cleaned_data == {'value': 'hello'}
+
+
+@pytest.mark.parametrize(['token_type', 'line'], [
+    (StringSymbol, '"hello"'), (StringSymbol, '\\-'), (StringSymbol, ' '), (LocaleCurrencyToken, '[$USD-409]'),
+    (ColorToken, '[Red]'), (ConditionToken, '[>=100]'), (EToken, 'E+'), (SlashSymbol, '/16'), (AsteriskSymbol, '*x'),
+    (DateTimeToken, 'yyyy'), (TimeDeltaToken, '[hh]'), (AmPmToken, 'A/P'), (ZeroToken, '0'), (GeneralToken, 'General'),
+])
+def test_scan(token_type, line):
+    token, end = token_type.scan('#' + line + '#', 1)
+    assert end == len(line) + 1
+    assert token.cleaned_data == token_type(line).cleaned_data
+    assert token_type.scan('#' + line, 0) is None
+
+
+@pytest.mark.parametrize(['line', 'value'], [('[RED]', 'Red'), ('[red]', 'Red'), ('[color12]', 'Color12')])
+def test_color_case(line, value):
+    assert ColorToken.match(line) == len(line)
+    assert ColorToken(line).value == value
+
+
+@pytest.mark.parametrize(['token_type', 'line', 'result'], [
+    (StringSymbol, '"hello"', '"hello"'), (StringSymbol, '\\-', '-'), (StringSymbol, '"-"', '-'),
+    (StringSymbol, '"x"', '\\x'), (StringSymbol, '\\"', '\\"'), (StringSymbol, '""', '""'),
+    (LocaleCurrencyToken, '[$usd-0409]', '[$usd-409]'), (LocaleCurrencyToken, '[$USD]', '[$USD]'),
+    (ColorToken, '[RED]', '[Red]'), (ConditionToken, '[>=+100.0]', '[>=100]'), (ConditionToken, '[<-0.5]', '[<-0.5]'),
+    (ConditionToken, '[<0.00001]', '[<0.00001]'), (ConditionToken, '[>=-0.0000001250]', '[>=-0.000000125]'),
+    (ConditionToken, '[>100000000000000000000.5]', '[>100000000000000000000]'),
+    (EToken, 'e+', 'E+'), (SlashSymbol, '/16', '/16'), (SlashSymbol, '/', '/'), (AsteriskSymbol, '*x', '*x'),
+    (DateTimeToken, 'YYYY', 'YYYY'), (TimeDeltaToken, '[hh]', '[hh]'), (AmPmToken, 'A/P', 'A/P'),
+    (ZeroToken, '0', '0'), (GeneralToken, 'General', 'General'),
+])
+def test_render(token_type, line, result):
+    assert token_type(line).render() == result
+    assert token_type(result).cleaned_data == token_type(line).cleaned_data